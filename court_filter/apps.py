@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CourtFilterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'court_filter'
+
+    def ready(self):
+        import court_filter.signals
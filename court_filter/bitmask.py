@@ -0,0 +1,22 @@
+"""
+Sets of Province/Facility ids packed into one BigIntegerField.
+
+Bit n-1 stands for id n, so ids 1..63 fit in a signed 64-bit column. An id past
+that has no bit: filters on it must fall back to the M2M join (see fits()).
+"""
+MAX_ID = 63
+
+
+def fits(pk):
+    return 0 < pk <= MAX_ID
+
+
+def bit(pk):
+    return 1 << (pk - 1) if fits(pk) else 0
+
+
+def mask(pks):
+    value = 0
+    for pk in pks:
+        value |= bit(pk)
+    return value
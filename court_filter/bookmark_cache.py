@@ -0,0 +1,59 @@
+"""
+Per-user set of bookmarked court ids, shared between workers through the cache.
+
+The set is read from the database once and stored together with the user's
+bookmark version (search_cache.bookmarks_version_name). Every bookmark write
+bumps that version after it commits (toggle_bookmark, sync, signals for admin
+edits and cascades), so a stored set with any other version is a miss and is
+read again. Search marks `is_bookmarked` and filters `bookmarked_only` with a
+lookup in this set, without querying Bookmark as long as nothing changed.
+sync_token() lets offline clients ask whether the set changed since they last
+saw it.
+
+The set is never patched in place: the cache backend has no compare-and-swap,
+so two writers patching the same set could drop one change while the version
+still matched. The version is read before the database, so a set loaded while
+a write was in flight is stamped with the older version and thrown away.
+"""
+from django.core.cache import cache
+
+from .models import Bookmark
+from .search_cache import bookmarks_version_name, invalidate_user_bookmarks
+from .versioning import get_version
+
+BOOKMARK_SET_TIMEOUT = 60 * 60  # 1 hour
+
+
+def _key(user_id):
+    return f'bookmark_ids_{user_id}'
+
+
+def get_bookmarked_ids(user_id):
+    """
+    Returns: frozenset of the court ids (UUID) the user bookmarked, empty for anonymous users
+    """
+    if user_id is None:
+        return frozenset()
+    key = _key(user_id)
+    version = get_version(bookmarks_version_name(user_id))
+    cached = cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    ids = frozenset(Bookmark.objects.filter(user_id=user_id).values_list('court_id', flat=True))
+    cache.set(key, (version, ids), BOOKMARK_SET_TIMEOUT)
+    return ids
+
+
+def sync_token(user_id):
+    """
+    Opaque token for the current state of the user's bookmarks: the bookmark
+    version counter every write bumps. A token that doesn't match (old, or the
+    counter was evicted) just means "send the full set again".
+    """
+    return str(get_version(bookmarks_version_name(user_id)))
+
+
+def bookmarks_changed(user_id):
+    """Call after a bookmark write has committed: outdates the user's cached set and search results."""
+    invalidate_user_bookmarks(user_id)
+    cache.delete(_key(user_id))
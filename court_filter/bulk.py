@@ -0,0 +1,59 @@
+"""
+Small bulk-write helpers shared by seeding and the search read model.
+"""
+from .versioning import model_version_name, touch_version
+
+
+def chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def ensure_named(model, names, batch_size=500):
+    """
+    Returns: {name: instance} for every name, creating the missing ones in bulk
+    """
+    names = set(names)
+    existing = {obj.name: obj for obj in model.objects.filter(name__in=names)}
+    missing = [model(name=name) for name in sorted(names - existing.keys())]
+    if missing:
+        model.objects.bulk_create(missing, batch_size=batch_size, ignore_conflicts=True)
+        touch_version(model_version_name(model))  # bulk_create tidak mengirim post_save
+        existing.update(
+            (obj.name, obj) for obj in model.objects.filter(name__in=[obj.name for obj in missing])
+        )
+    return existing
+
+
+def sync_through(through, source_field, target_field, desired, batch_size=500):
+    """
+    Bring an M2M through table in line with desired = {source_id: {target_id, ...}}
+    for the sources in `desired` only.
+    Returns: set of source ids whose links changed
+    """
+    existing = {}
+    stale = []
+    for source_ids in chunks(desired, batch_size):
+        rows = through.objects.filter(**{f'{source_field}__in': source_ids}).values_list(
+            'id', source_field, target_field
+        )
+        for row_id, source_id, target_id in rows:
+            if target_id in desired[source_id]:
+                existing.setdefault(source_id, set()).add(target_id)
+            else:
+                stale.append((row_id, source_id))
+
+    for rows in chunks(stale, batch_size):
+        through.objects.filter(id__in=[row_id for row_id, _ in rows]).delete()
+
+    new_links = [
+        through(**{source_field: source_id, target_field: target_id})
+        for source_id, targets in desired.items()
+        for target_id in targets - existing.get(source_id, set())
+    ]
+    through.objects.bulk_create(new_links, batch_size=batch_size)
+
+    changed = {source_id for _, source_id in stale}
+    changed.update(getattr(link, source_field) for link in new_links)
+    return changed
@@ -0,0 +1,87 @@
+"""
+Conditional GET (ETag / Last-Modified) for read-only pages and APIs.
+
+The validators are built from version counters only (versioning.py), so a
+client whose If-None-Match still matches gets its 304 before the view runs:
+no query, no serialization. Whatever writes the data touches the counters
+(signals.py for single saves, bulk.ensure_named and seeding for bulk writes).
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Court, Province, Facility
+from .versioning import get_version, model_version_name, touch_version
+
+PROVINCES_VERSION = model_version_name(Province)
+FACILITIES_VERSION = model_version_name(Facility)
+# Disentuh oleh tulis massal (seed/import) yang tidak mengirim signal per court
+COURTS_VERSION = model_version_name(Court)
+
+
+def court_version_name(key):
+    """key: court pk or slug, both are touched when the court changes"""
+    return f'court_{key}'
+
+
+def touch_court(court):
+    touch_version(court_version_name(court.pk))
+    if court.slug:
+        touch_version(court_version_name(court.slug))
+
+
+def user_version_name(user_pk):
+    """Touched on every save of the user (the navbar shows its name and photo)"""
+    return f'user_{user_pk}'
+
+
+def court_detail_versions(slug=None, court_id=None):
+    return [court_version_name(slug or court_id), COURTS_VERSION, PROVINCES_VERSION, FACILITIES_VERSION]
+
+
+def versioned(version_names, per_user=False):
+    """
+    View decorator answering If-None-Match / If-Modified-Since from version counters.
+    version_names: list of counter names, or callable(**view_kwargs) returning one
+    per_user: the body depends on the logged-in user, so the ETag includes the
+    user id and the user's version, and no Last-Modified is sent
+    """
+    def names(kwargs):
+        return version_names(**kwargs) if callable(version_names) else version_names
+
+    def etag(request, *args, **kwargs):
+        parts = [str(get_version(name)) for name in names(kwargs)]
+        if per_user:
+            user_pk = request.user.pk
+            parts.append(f'{user_pk}:{get_version(user_version_name(user_pk))}' if user_pk else 'anonymous')
+        return hashlib.sha1(':'.join(parts).encode()).hexdigest()[:20]
+
+    def last_modified(request, *args, **kwargs):
+        if per_user:
+            return None
+        # Nilai counter dari touch_version() adalah waktu (ms) perubahan terakhir
+        latest = max(get_version(name) for name in names(kwargs))
+        return datetime.fromtimestamp(latest / 1000, tz=dt_timezone.utc)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                # 404/500 jangan sampai divalidasi ulang jadi 304
+                for header in ('ETag', 'Last-Modified'):
+                    if response.has_header(header):
+                        del response[header]
+            # Boleh disimpan, tapi selalu divalidasi ulang (murah berkat 304)
+            if per_user:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
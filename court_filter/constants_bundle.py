@@ -0,0 +1,87 @@
+"""
+One immutable JSON bundle of everything the Flutter app needs for its forms and
+filters: provinces and facilities of both apps, sport types, court types and
+location types.
+
+Each worker builds the bundle once and keeps the encoded bytes in memory. It only
+rebuilds when one of the province/facility version counters moved (see
+conditional.py / signals.py); a deploy starts with empty workers, so changed
+choice lists are picked up too. The bundle's version is a hash of its content,
+so clients can cache /constants/<version>/ forever and only ask the cheap
+/constants/version/ endpoint whether a newer one exists.
+"""
+import hashlib
+import json
+import threading
+
+from manage_court import models as manage_models
+
+from .models import Court, Province, Facility
+from .versioning import get_version, model_version_name
+
+VERSION_LENGTH = 16
+SOURCE_MODELS = [Province, Facility, manage_models.Province, manage_models.Facility]
+
+
+def _choices(choices):
+    return [{'value': value, 'label': str(label)} for value, label in choices]
+
+
+class ConstantsBundle:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data_versions = None
+        self._version = None
+        self._content = None
+        self._body = None
+
+    def _build_content(self):
+        return {
+            # court_filter: dipakai filter search (berdasarkan nama)
+            'provinces': list(Province.objects.order_by('name').values('id', 'name')),
+            'facilities': list(Facility.objects.order_by('name').values('id', 'name')),
+            # manage_court: pk untuk form create/edit court
+            'manage_court': {
+                'provinces': list(manage_models.Province.objects.order_by('name').values('pk', 'name')),
+                'facilities': list(manage_models.Facility.objects.order_by('name').values('pk', 'name')),
+            },
+            'sport_types': _choices(manage_models.Court.SPORT_TYPES),
+            'court_types': _choices(Court.COURT_TYPES),
+            'location_types': _choices(Court.LOCATION_TYPES),
+        }
+
+    def _current(self):
+        data_versions = [get_version(model_version_name(model)) for model in SOURCE_MODELS]
+        with self._lock:
+            if self._body is None or self._data_versions != data_versions:
+                content = self._build_content()
+                encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+                self._version = hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:VERSION_LENGTH]
+                self._body = json.dumps(
+                    {'version': self._version, **content}, ensure_ascii=False, separators=(',', ':')
+                ).encode('utf-8')
+                self._content = content
+                self._data_versions = data_versions
+            return self._version, self._content, self._body
+
+    def version(self):
+        return self._current()[0]
+
+    def content(self):
+        """The bundle as a dict (shared between requests, don't modify)"""
+        return self._current()[1]
+
+    def body(self):
+        """
+        Returns: (version, encoded JSON bytes)
+        """
+        version, _, body = self._current()
+        return version, body
+
+    def reset(self):
+        with self._lock:
+            self._data_versions = self._version = self._content = self._body = None
+
+
+constants_bundle = ConstantsBundle()
@@ -0,0 +1,110 @@
+"""
+Streaming export of courts and bookmarks as NDJSON or CSV.
+
+Rows are read with QuerySet.iterator(chunk_size=...) (provinces/facilities are
+prefetched per chunk) and encoded one line at a time, so the memory used does
+not grow with the number of rows. CSV columns use the same names and "|"
+separated lists that import_courts reads back.
+"""
+import csv
+import json
+
+from .models import Court, Bookmark
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+DEFAULT_CHUNK_SIZE = 2000
+
+COURT_COLUMNS = [
+    'id', 'osm_id', 'name', 'address', 'latitude', 'longitude', 'court_type', 'location_type',
+    'price_per_hour', 'phone_number', 'description', 'is_active', 'provinces', 'facilities',
+    'created_at', 'updated_at',
+]
+BOOKMARK_COLUMNS = ['id', 'user_id', 'court_id', 'court_name', 'created_at']
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def court_records(chunk_size=DEFAULT_CHUNK_SIZE):
+    queryset = (
+        Court.objects.order_by('pk')
+        .prefetch_related('provinces', 'facilities')
+        .iterator(chunk_size=chunk_size)
+    )
+    for court in queryset:
+        yield {
+            'id': str(court.id),
+            'osm_id': court.osm_id,
+            'name': court.name,
+            'address': court.address,
+            'latitude': str(court.latitude),
+            'longitude': str(court.longitude),
+            'court_type': court.court_type,
+            'location_type': court.location_type,
+            'price_per_hour': str(court.price_per_hour),
+            'phone_number': court.phone_number,
+            'description': court.description,
+            'is_active': court.is_active,
+            'provinces': [province.name for province in court.provinces.all()],
+            'facilities': [facility.name for facility in court.facilities.all()],
+            'created_at': court.created_at.isoformat(),
+            'updated_at': court.updated_at.isoformat(),
+        }
+
+
+def bookmark_records(chunk_size=DEFAULT_CHUNK_SIZE):
+    queryset = (
+        Bookmark.objects.order_by('pk')
+        .values_list('id', 'user_id', 'court_id', 'court__name', 'created_at')
+        .iterator(chunk_size=chunk_size)
+    )
+    for bookmark_id, user_id, court_id, court_name, created_at in queryset:
+        yield {
+            'id': bookmark_id,
+            'user_id': user_id,
+            'court_id': str(court_id),
+            'court_name': court_name,
+            'created_at': created_at.isoformat(),
+        }
+
+
+EXPORTS = {
+    'courts': (court_records, COURT_COLUMNS),
+    'bookmarks': (bookmark_records, BOOKMARK_COLUMNS),
+}
+
+
+def to_ndjson(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def to_csv(records, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for record in records:
+        yield writer.writerow([
+            '|'.join(value) if isinstance(value, list) else ('' if value is None else value)
+            for value in (record[column] for column in columns)
+        ])
+
+
+def export_lines(kind, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    kind: 'courts' or 'bookmarks'; fmt: 'ndjson' or 'csv'
+    Returns: generator of text lines
+    """
+    records_fn, columns = EXPORTS[kind]
+    records = records_fn(chunk_size=chunk_size)
+    if fmt == 'csv':
+        return to_csv(records, columns)
+    return to_ndjson(records)
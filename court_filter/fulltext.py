@@ -0,0 +1,180 @@
+"""
+Ranked full-text search and name autocomplete over CourtSearchEntry.
+
+- PostgreSQL: a generated tsvector column (name weighted A, address B,
+  description C) with a GIN index.
+- SQLite: an FTS5 external-content table over the entries table, kept in step
+  by triggers, with prefix indexes for autocomplete.
+Both are created by migration 0005 (which holds the SQL) and only queried here
+with raw SQL, so the model itself doesn't know about them. Other databases fall
+back to icontains.
+
+The SQLite FTS rows are keyed by the entries' implicit rowid, which VACUUM may
+renumber: run rebuild_court_search after a VACUUM.
+"""
+import re
+import uuid
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length, Lower
+
+from .models import CourtSearchEntry
+
+FTS_TABLE = 'court_filter_courtsearch_fts'
+ENTRY_TABLE = CourtSearchEntry._meta.db_table
+TS_CONFIG = 'simple'  # PostgreSQL tidak punya config bahasa Indonesia bawaan di semua versi
+
+MAX_MATCHES = 1000
+MAX_TOKENS = 8
+MIN_PREFIX = 2
+TOKEN = re.compile(r'\w+')
+
+# bm25: kolom name paling berat, lalu address, lalu description
+SQLITE_WEIGHTS = (10.0, 4.0, 1.0)
+
+
+def tokens(text):
+    return TOKEN.findall(str(text).casefold())[:MAX_TOKENS]
+
+
+def normalize_query(text):
+    return ' '.join(tokens(text))
+
+
+def _sqlite_match(words):
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def search(text, queryset=None, limit=None):
+    """
+    queryset: CourtSearchEntry rows to search in (the other filters), active
+    entries by default; applied inside the full-text query, so `limit`
+    (default MAX_MATCHES) counts only rows that pass them
+    Returns: [(entry_id, relevance), ...] best match first (every token must match)
+    """
+    words = tokens(text)
+    if not words:
+        return []
+    if queryset is None:
+        queryset = CourtSearchEntry.objects.filter(is_active=True)
+    if limit is None:
+        limit = MAX_MATCHES
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        within, within_params = _id_subquery(queryset)
+        sql = (
+            f'SELECT e.id, -bm25({FTS_TABLE}, %s, %s, %s) AS relevance '
+            f'FROM {FTS_TABLE} JOIN {ENTRY_TABLE} e ON e.rowid = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND e.id IN ({within}) ORDER BY relevance DESC LIMIT %s'
+        )
+        params = [*SQLITE_WEIGHTS, _sqlite_match(words), *within_params, limit]
+    elif vendor == 'postgresql':
+        within, within_params = _id_subquery(queryset)
+        sql = (
+            f'SELECT id, ts_rank(search_vector, query) AS relevance '
+            f'FROM {ENTRY_TABLE}, to_tsquery(%s, %s) query '
+            f'WHERE search_vector @@ query AND id IN ({within}) ORDER BY relevance DESC LIMIT %s'
+        )
+        params = [TS_CONFIG, ' & '.join(words), *within_params, limit]
+    else:
+        return _search_fallback(words, queryset, limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(_uuid(entry_id), relevance) for entry_id, relevance in cursor.fetchall()]
+
+
+def matching(queryset, text):
+    """
+    `queryset` narrowed to the rows matching every word of text, unranked and
+    without a cap, for searches ordered by something else (e.g. distance)
+    """
+    words = tokens(text)
+    if not words:
+        return queryset
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        sql = (
+            f'SELECT e.id FROM {FTS_TABLE} JOIN {ENTRY_TABLE} e ON e.rowid = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s'
+        )
+        return queryset.filter(id__in=RawSQL(sql, [_sqlite_match(words)]))
+    if vendor == 'postgresql':
+        sql = f'SELECT id FROM {ENTRY_TABLE} WHERE search_vector @@ to_tsquery(%s, %s)'
+        return queryset.filter(id__in=RawSQL(sql, [TS_CONFIG, ' & '.join(words)]))
+    return _fallback_filter(queryset, words)
+
+
+def _id_subquery(queryset):
+    """SQL and params selecting the ids of `queryset`, to embed in the raw queries."""
+    query = queryset.order_by().values('id').query
+    return query.get_compiler(connection=connection).as_sql()
+
+
+def autocomplete(text, limit=10):
+    """
+    Active courts whose name has words starting with every typed word (the last one may be partial).
+    Returns: [(entry_id, name, source, source_id), ...] shortest name first
+    """
+    words = tokens(text)
+    if not words or len(''.join(words)) < MIN_PREFIX:
+        return []
+    # Diurutkan di SQL atas semua baris yang cocok: cukup sort panjang nama, tanpa skor bm25/ts_rank
+    # (yang terlalu lambat untuk prefix pendek di 100k court)
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        match = _sqlite_match(words[:-1]) + f' "{words[-1]}"*'
+        sql = (
+            f'SELECT e.id, e.name, e.source, e.source_id '
+            f'FROM {FTS_TABLE} JOIN {ENTRY_TABLE} e ON e.rowid = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND e.is_active '
+            f'ORDER BY length(e.name), lower(e.name), e.id LIMIT %s'
+        )
+        params = [f'{{name}} : ({match.strip()})', limit]
+    elif vendor == 'postgresql':
+        query = ' & '.join([f'{word}:A' for word in words[:-1]] + [f'{words[-1]}:*A'])
+        sql = (
+            f'SELECT id, name, source, source_id FROM {ENTRY_TABLE} '
+            f'WHERE search_vector @@ to_tsquery(%s, %s) AND is_active '
+            f'ORDER BY length(name), lower(name), id LIMIT %s'
+        )
+        params = [TS_CONFIG, query, limit]
+    else:
+        queryset = CourtSearchEntry.objects.filter(is_active=True)
+        for word in words:
+            queryset = queryset.filter(name__icontains=word)
+        return list(
+            queryset.order_by(Length('name'), Lower('name'), 'id')
+            .values_list('id', 'name', 'source', 'source_id')[:limit]
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(_uuid(row[0]), *row[1:]) for row in cursor.fetchall()]
+
+
+def _uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+
+
+def _fallback_filter(queryset, words):
+    for word in words:
+        condition = Q()
+        for field in ('name', 'address', 'description'):
+            condition |= Q(**{f'{field}__icontains': word})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def _search_fallback(words, queryset, limit):
+    queryset = _fallback_filter(queryset, words)
+    return [(entry_id, 0.0) for entry_id in queryset.order_by('name').values_list('id', flat=True)[:limit]]
+
+
+def rebuild_index():
+    """Re-read every entry into the SQLite FTS table (PostgreSQL keeps its column up to date itself)."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
@@ -0,0 +1,189 @@
+"""
+Offline gazetteer: resolves common Indonesian province and city names to
+coordinates without leaving the process.
+
+Place names are kept in a character trie keyed on the normalized name, loaded
+from data/gazetteer.json (generated by `manage.py build_gazetteer`). geocode_address
+asks the gazetteer first and only goes to Nominatim when it has no answer.
+
+data/reference_places.json holds curated coordinates for every province (its
+capital) and the major cities; build_gazetteer keeps those as they are and only
+adds the places they don't cover from court addresses.
+"""
+import json
+import threading
+from pathlib import Path
+
+from .utils import normalize_address, haversine_distance
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.json'
+REFERENCE_PATH = Path(__file__).resolve().parent / 'data' / 'reference_places.json'
+
+# Awalan administratif yang tidak ikut menentukan nama tempat
+ADMIN_PREFIXES = ('provinsi ', 'kabupaten ', 'kab. ', 'kab ', 'kota ', 'kotamadya ')
+
+# Nama yang sama di beberapa tempat dianggap satu tempat kalau jaraknya sedekat ini
+AMBIGUITY_KM = 25
+
+
+def normalize_place(name):
+    name = normalize_address(name)
+    for prefix in ADMIN_PREFIXES:
+        if name.startswith(prefix) and len(name) > len(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def load_places(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['places']
+
+
+def merge_places(reference, derived):
+    """
+    Reference places first, then the derived places they don't already cover:
+    no derived provinces, and no city whose name is a reference place in the
+    same province (or either has no province).
+    """
+    known = {}
+    for place in reference:
+        known.setdefault(normalize_place(place['name']), set()).add(place.get('province'))
+    places = list(reference)
+    for place in derived:
+        if place['kind'] == 'province':
+            continue
+        provinces = known.get(normalize_place(place['name']), set())
+        if None in provinces or place.get('province') in provinces or (provinces and place.get('province') is None):
+            continue
+        places.append(place)
+    return places
+
+
+class _Node:
+    __slots__ = ('children', 'places')
+
+    def __init__(self):
+        self.children = {}
+        self.places = None
+
+
+class PlaceTrie:
+    """
+    Character trie of normalized place names, each name holding a list of
+    {'name', 'kind', 'province', 'latitude', 'longitude'} places
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, name, place):
+        node = self._root
+        for char in normalize_place(name):
+            node = node.children.setdefault(char, _Node())
+        if node.places is None:
+            node.places = []
+        node.places.append(place)
+        self._size += 1
+
+    def _find(self, key):
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def lookup(self, name):
+        """Returns: every place stored under exactly this name"""
+        node = self._find(normalize_place(name))
+        return list(node.places) if node is not None and node.places else []
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns: up to `limit` places whose name starts with prefix, shortest names first
+        """
+        node = self._find(normalize_place(prefix))
+        if node is None:
+            return []
+        results = []
+        level = [node]
+        while level and len(results) < limit:
+            next_level = []
+            for current in level:
+                if current.places:
+                    results.extend(current.places)
+                next_level.extend(child for _, child in sorted(current.children.items()))
+            level = next_level
+        return results[:limit]
+
+
+class Gazetteer:
+
+    def __init__(self, places=()):
+        self.trie = PlaceTrie()
+        for place in places:
+            self.trie.insert(place['name'], place)
+
+    def __len__(self):
+        return len(self.trie)
+
+    @classmethod
+    def from_file(cls, path=GAZETTEER_PATH):
+        try:
+            return cls(load_places(path))
+        except FileNotFoundError:
+            return cls()
+
+    def resolve(self, address):
+        """
+        Resolve an address whose most specific part is a known place name,
+        e.g. "Bandung", "Kota Bandung, Jawa Barat" or "Provinsi Bali".
+        Anything more specific than a city ("Monas, Jakarta") is left to the network geocoder.
+
+        Returns: {'latitude': float, 'longitude': float} or None on a miss
+        """
+        parts = [part for part in normalize_address(address).split(', ') if part]
+        if not parts:
+            return None
+
+        places = self.trie.lookup(parts[0])
+        if not places:
+            return None
+
+        # Bagian alamat setelahnya dipakai untuk memilih di antara nama yang kembar
+        context = {normalize_place(part) for part in parts[1:]}
+        if context:
+            narrowed = [
+                place for place in places
+                if place.get('province') and normalize_place(place['province']) in context
+            ]
+            if narrowed:
+                places = narrowed
+
+        first = places[0]
+        for place in places[1:]:
+            distance = haversine_distance(
+                first['latitude'], first['longitude'], place['latitude'], place['longitude']
+            )
+            if distance > AMBIGUITY_KM:
+                return None
+
+        return {'latitude': first['latitude'], 'longitude': first['longitude']}
+
+
+_lock = threading.Lock()
+_gazetteer = None
+
+
+def get_gazetteer():
+    """Process-wide Gazetteer, loaded from disk on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.from_file()
+    return _gazetteer
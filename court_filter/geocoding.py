@@ -0,0 +1,161 @@
+"""
+Async Nominatim client shared by the sync and async geocoding paths.
+
+- One pooled requests.Session per process, so lookups reuse keep-alive connections.
+- A process-wide cap on concurrent upstream requests.
+- A circuit breaker: after repeated upstream errors every lookup fails fast
+  with GeocoderUnavailable until a cooldown has passed, instead of each request
+  waiting out its own timeout.
+
+The HTTP call itself runs in a worker thread (asyncio.to_thread), so awaiting
+a lookup never blocks the event loop.
+"""
+import asyncio
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+USER_AGENT = 'CourtFinder/1.0'
+
+
+class GeocoderUnavailable(Exception):
+    """Nominatim is failing, overloaded, or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half-open once `reset_timeout` seconds have passed, letting a single
+    trial call through; its outcome closes or re-opens the breaker.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Returns: True if a call may go upstream now"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+    def reset(self):
+        self.record_success()
+
+
+class NominatimClient:
+
+    def __init__(self, max_concurrency=4, queue_timeout=2, timeout=(3, 5),
+                 failure_threshold=5, reset_timeout=30):
+        self.timeout = timeout  # (connect, read) dalam detik
+        self.queue_timeout = queue_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pool_size = max_concurrency
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers['User-Agent'] = USER_AGENT
+                    self._session = session
+        return self._session
+
+    async def lookup(self, address):
+        """
+        Returns: {'latitude': float, 'longitude': float}, or None when Nominatim has no match
+        Raises: GeocoderUnavailable when the upstream call fails or is refused
+        """
+        # Gagal cepat tanpa pindah thread kalau breaker sedang terbuka
+        if self.breaker.state == CircuitBreaker.OPEN:
+            raise GeocoderUnavailable('Nominatim circuit breaker is open')
+        return await asyncio.to_thread(self._lookup_blocking, address)
+
+    def _lookup_blocking(self, address):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise GeocoderUnavailable('Too many concurrent geocoding requests')
+        try:
+            if not self.breaker.allow():
+                raise GeocoderUnavailable('Nominatim circuit breaker is open')
+            params = {
+                'q': ' '.join(str(address).split()) + ', Indonesia',  # Force Indonesia search
+                'format': 'json',
+                'limit': 1,
+                'countrycodes': 'id',  # Restrict to Indonesia
+            }
+            response = self.session.get(NOMINATIM_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            coords = _parse_results(response.json())
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            self.breaker.record_failure()
+            raise GeocoderUnavailable(str(e)) from e
+        finally:
+            self._slots.release()
+
+        self.breaker.record_success()
+        return coords
+
+
+def _parse_results(results):
+    from .utils import is_in_indonesia
+
+    if results:
+        result = results[0]
+        lat = float(result['lat'])
+        lon = float(result['lon'])
+
+        # Validate coordinates are in Indonesia
+        if is_in_indonesia(lat, lon):
+            return {'latitude': lat, 'longitude': lon}
+    return None
+
+
+geocoder = NominatimClient()
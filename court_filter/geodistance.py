@@ -0,0 +1,104 @@
+"""
+Vectorized haversine distances with NumPy.
+
+Coordinates live in contiguous float64 arrays (already in radians), so the
+distance from one origin to N courts, or from M origins to N courts, is a
+single batched computation instead of N calls to utils.haversine_distance.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+
+def _as_radians(values):
+    return np.radians(np.ascontiguousarray(values, dtype=np.float64))
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    # All inputs in radians; shapes broadcast against each other
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_many(latitude, longitude, latitudes, longitudes):
+    """
+    Distance in km from one origin to every point
+    Returns: float64 array with shape (N,)
+    """
+    return _haversine(
+        np.radians(float(latitude)), np.radians(float(longitude)),
+        _as_radians(latitudes), _as_radians(longitudes),
+    )
+
+
+def haversine_matrix(origin_latitudes, origin_longitudes, latitudes, longitudes):
+    """
+    Distance in km from every origin to every point
+    Returns: float64 array with shape (M, N)
+    """
+    origin_lat = _as_radians(origin_latitudes)[:, np.newaxis]
+    origin_lon = _as_radians(origin_longitudes)[:, np.newaxis]
+    return _haversine(origin_lat, origin_lon, _as_radians(latitudes), _as_radians(longitudes))
+
+
+class CoordinateArray:
+    """
+    Court IDs plus their coordinates as contiguous float64 radian arrays.
+    """
+
+    def __init__(self, ids, latitudes, longitudes):
+        self.ids = list(ids)
+        self.lat = _as_radians(latitudes)
+        self.lon = _as_radians(longitudes)
+        if not (len(self.ids) == len(self.lat) == len(self.lon)):
+            raise ValueError('ids, latitudes and longitudes must have the same length')
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_queryset(cls, queryset, lat_field='latitude', lon_field='longitude'):
+        """Build from any queryset of rows with an id and coordinates (rows without coordinates are skipped)."""
+        rows = [
+            (pk, lat, lon)
+            for pk, lat, lon in queryset.values_list('pk', lat_field, lon_field).iterator()
+            if lat is not None and lon is not None
+        ]
+        count = len(rows)
+        return cls(
+            [row[0] for row in rows],
+            np.fromiter((row[1] for row in rows), dtype=np.float64, count=count),
+            np.fromiter((row[2] for row in rows), dtype=np.float64, count=count),
+        )
+
+    def distances_from(self, latitude, longitude):
+        """Returns: float64 array of km from the origin, aligned with self.ids"""
+        return _haversine(np.radians(float(latitude)), np.radians(float(longitude)), self.lat, self.lon)
+
+    def distance_matrix(self, origin_latitudes, origin_longitudes):
+        """Returns: (M, N) float64 array of km, rows follow the origins, columns follow self.ids"""
+        origin_lat = _as_radians(origin_latitudes)[:, np.newaxis]
+        origin_lon = _as_radians(origin_longitudes)[:, np.newaxis]
+        return _haversine(origin_lat, origin_lon, self.lat, self.lon)
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """
+        Returns: [(id, distance_km), ...] within the radius, nearest first
+        """
+        distances = self.distances_from(latitude, longitude)
+        hits = np.flatnonzero(distances <= radius_km)
+        hits = hits[np.argsort(distances[hits], kind='stable')]
+        return [(self.ids[i], float(distances[i])) for i in hits]
+
+    def nearest(self, latitude, longitude, k):
+        """
+        Returns: the k closest [(id, distance_km), ...], nearest first
+        """
+        if k <= 0 or not self.ids:
+            return []
+        distances = self.distances_from(latitude, longitude)
+        k = min(k, len(distances))
+        # argpartition finds the k smallest in O(N); only those k get sorted
+        closest = np.argpartition(distances, k - 1)[:k]
+        closest = closest[np.argsort(distances[closest], kind='stable')]
+        return [(self.ids[i], float(distances[i])) for i in closest]
@@ -0,0 +1,330 @@
+"""
+Streaming court import: parse -> validate -> dedupe -> chunked bulk writes.
+
+Every stage is a generator over one record at a time, so memory use depends
+on the chunk size, not on the size of the input file. Rejected records are
+handed to a callback together with the reason instead of stopping the import.
+
+Supported inputs:
+- CSV with a header row of Court field names
+- NDJSON, one court (or one GeoJSON Feature) per line
+- GeoJSON FeatureCollection, e.g. an Overpass/OSM export of sport pitches
+`provinces` and `facilities` are JSON lists or "|"/";" separated names.
+"""
+import csv
+import json
+import re
+from decimal import Decimal, InvalidOperation
+
+from .models import Court
+from .seeding import seed_courts, SeedResult
+from .utils import is_in_indonesia
+
+FORMATS = ('csv', 'ndjson', 'geojson')
+READ_CHUNK_SIZE = 64 * 1024
+
+# Nilai tag `sport` OSM -> court_type; 'soccer' dipakai oleh data yang sudah ada
+COURT_TYPES = {value for value, _ in Court.COURT_TYPES} | {'soccer'}
+SPORT_ALIASES = {
+    'beachvolleyball': 'volleyball',
+    'american_football': 'football',
+    'table_tennis': 'other',
+    'multi': 'other',
+}
+LOCATION_TYPES = {value for value, _ in Court.LOCATION_TYPES}
+LIST_SEPARATORS = re.compile(r'\s*[|;]\s*')
+OSM_ID_MAX_LENGTH = Court._meta.get_field('osm_id').max_length
+
+
+class RejectedRecord(Exception):
+    """A record that failed validation; the message is the reason."""
+
+
+def detect_format(path):
+    lower = str(path).lower()
+    if lower.endswith('.csv'):
+        return 'csv'
+    if lower.endswith(('.geojson', '.json')):
+        return 'geojson'
+    if lower.endswith(('.ndjson', '.jsonl', '.geojsonl', '.geojsons')):
+        return 'ndjson'
+    raise ValueError(f'Cannot tell the format of {path}, pass --format')
+
+
+# --- Parse -----------------------------------------------------------------
+
+def read_csv(f):
+    for number, record in enumerate(csv.DictReader(f), start=1):
+        yield number, record
+
+
+def read_ndjson(f):
+    for number, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, {'_error': f'Invalid JSON: {e}', '_raw': line}
+            continue
+        if isinstance(record, dict) and record.get('type') == 'Feature':
+            record = feature_to_record(record)
+        yield number, record
+
+
+def read_geojson(f):
+    for number, feature in enumerate(iter_json_array(f, 'features'), start=1):
+        yield number, feature_to_record(feature)
+
+
+def iter_json_array(f, key, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the items of the top-level array `key` of a JSON document one by one,
+    keeping only the item being decoded (plus one read chunk) in memory.
+    """
+    decoder = json.JSONDecoder()
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    buf = ''
+    eof = False
+
+    def read_more():
+        nonlocal buf, eof
+        data = f.read(chunk_size)
+        eof = not data
+        buf += data
+
+    while True:
+        match = start.search(buf)
+        if match:
+            buf = buf[match.end():]
+            break
+        if eof:
+            raise ValueError(f'No "{key}" array found')
+        # Sisakan ekor buffer, siapa tahu nama key terpotong di batas chunk
+        buf = buf[-(len(key) + 16):]
+        read_more()
+
+    while True:
+        buf = buf.lstrip(' \t\r\n,')
+        while not buf and not eof:
+            read_more()
+            buf = buf.lstrip(' \t\r\n,')
+        if not buf:
+            raise ValueError(f'Unterminated "{key}" array')
+        if buf[0] == ']':
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+        yield item
+        buf = buf[end:]
+
+
+def _point(geometry):
+    """(lat, lon) of a Point, or the vertex average of a (Multi)Polygon's outer ring."""
+    kind = geometry.get('type')
+    coordinates = geometry.get('coordinates')
+    if not coordinates:
+        return None, None
+    if kind == 'Point':
+        return coordinates[1], coordinates[0]
+    if kind == 'MultiPolygon':
+        coordinates = coordinates[0]
+        kind = 'Polygon'
+    if kind == 'Polygon':
+        ring = coordinates[0][:-1] or coordinates[0]
+        return sum(p[1] for p in ring) / len(ring), sum(p[0] for p in ring) / len(ring)
+    return None, None
+
+
+def feature_to_record(feature):
+    """Flatten a GeoJSON Feature (OSM tags as properties) into a court record."""
+    props = dict(feature.get('properties') or {})
+    lat, lon = _point(feature.get('geometry') or {})
+    record = {key: value for key, value in props.items() if not key.startswith(('@', 'addr:'))}
+    record.setdefault('latitude', lat)
+    record.setdefault('longitude', lon)
+
+    osm_id = props.get('osm_id') or props.get('@id') or feature.get('id')
+    if osm_id:
+        record['osm_id'] = str(osm_id).rsplit('/', 1)[-1]  # "way/123" -> "123"
+    if 'court_type' not in record and props.get('sport'):
+        record['court_type'] = str(props['sport']).split(';')[0]
+    if 'location_type' not in record:
+        indoor = props.get('indoor') in ('yes', 'room') or props.get('building') not in (None, 'no')
+        record['location_type'] = 'indoor' if indoor else 'outdoor'
+    if 'phone_number' not in record:
+        record['phone_number'] = props.get('phone') or props.get('contact:phone') or ''
+    if 'address' not in record:
+        street = ' '.join(filter(None, [props.get('addr:street'), props.get('addr:housenumber')]))
+        parts = [street, props.get('addr:city'), props.get('addr:province') or props.get('addr:state')]
+        record['address'] = ', '.join(part for part in parts if part)
+    for tag in ('sport', 'indoor', 'building', 'phone', 'contact:phone', 'leisure', 'surface'):
+        record.pop(tag, None)
+    return record
+
+
+PARSERS = {'csv': read_csv, 'ndjson': read_ndjson, 'geojson': read_geojson}
+
+
+def parse(f, fmt):
+    return PARSERS[fmt](f)
+
+
+# --- Validate --------------------------------------------------------------
+
+def _decimal(value, label):
+    """label: the Court DecimalField the value is stored in"""
+    try:
+        value = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise RejectedRecord(f'{label} is not a number: {value!r}')
+    if not value.is_finite():
+        raise RejectedRecord(f'{label} is not a number: {value!r}')
+    # Nilai yang tidak muat di kolom DecimalField membuat seluruh chunk gagal ditulis
+    field = Court._meta.get_field(label)
+    limit = Decimal(10) ** (field.max_digits - field.decimal_places)
+    if abs(value) >= limit or abs(value.quantize(Decimal(1).scaleb(-field.decimal_places))) >= limit:
+        raise RejectedRecord(f'{label} does not fit in {field.max_digits} digits: {value!r}')
+    return value
+
+
+def _name_list(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [name for name in LIST_SEPARATORS.split(value.strip()) if name]
+    return [str(name).strip() for name in value if str(name).strip()]
+
+
+def validate_record(record):
+    """
+    Returns: a row for seed_courts
+    Raises: RejectedRecord
+    """
+    if not isinstance(record, dict):
+        raise RejectedRecord('Record is not an object')
+    if '_error' in record:
+        raise RejectedRecord(record['_error'])
+
+    name = str(record.get('name') or '').strip()
+    if not name:
+        raise RejectedRecord('Missing name')
+    if len(name) > 255:
+        raise RejectedRecord('Name is longer than 255 characters')
+
+    address = str(record.get('address') or '').strip()
+    if not address:
+        raise RejectedRecord('Missing address')
+
+    if record.get('latitude') in (None, '') or record.get('longitude') in (None, ''):
+        raise RejectedRecord('Missing coordinates')
+    latitude = _decimal(record['latitude'], 'latitude')
+    longitude = _decimal(record['longitude'], 'longitude')
+    if not is_in_indonesia(latitude, longitude):
+        raise RejectedRecord('Coordinates are outside Indonesia')
+
+    court_type = str(record.get('court_type') or 'other').strip().lower()
+    court_type = SPORT_ALIASES.get(court_type, court_type)
+    if court_type not in COURT_TYPES:
+        raise RejectedRecord(f'Unknown court_type {court_type!r}')
+
+    location_type = str(record.get('location_type') or 'outdoor').strip().lower()
+    if location_type not in LOCATION_TYPES:
+        raise RejectedRecord(f'Unknown location_type {location_type!r}')
+
+    price = _decimal(record.get('price_per_hour') or 0, 'price_per_hour')
+    if price < 0:
+        raise RejectedRecord('price_per_hour is negative')
+
+    phone = str(record.get('phone_number') or '').strip()
+    if len(phone) > 20:
+        raise RejectedRecord('phone_number is longer than 20 characters')
+
+    row = {
+        'name': name,
+        'address': address,
+        'latitude': latitude,
+        'longitude': longitude,
+        'court_type': court_type,
+        'location_type': location_type,
+        'price_per_hour': price,
+        'phone_number': phone,
+        'description': str(record.get('description') or '').strip() or None,
+        'provinces': _name_list(record.get('provinces')),
+        'facilities': _name_list(record.get('facilities')),
+    }
+    osm_id = str(record.get('osm_id') or '').strip()
+    if len(osm_id) > OSM_ID_MAX_LENGTH:
+        raise RejectedRecord(f'osm_id is longer than {OSM_ID_MAX_LENGTH} characters')
+    if osm_id:
+        row['osm_id'] = osm_id
+    return row
+
+
+def validate(records, reject):
+    for number, record in records:
+        try:
+            yield number, validate_record(record)
+        except RejectedRecord as e:
+            reject(number, record, str(e))
+
+
+# --- Dedupe ----------------------------------------------------------------
+
+def dedupe(rows, reject):
+    """
+    Drop repeats of an osm_id (or, for rows without one, of a name) within the file.
+    Only the keys are remembered, not the rows.
+    """
+    seen = {}
+    for number, row in rows:
+        key = ('osm_id', row['osm_id']) if row.get('osm_id') else ('name', row['name'])
+        first = seen.get(key)
+        if first is not None:
+            reject(number, row, f'Duplicate {key[0]} {key[1]!r} (first seen in record {first})')
+            continue
+        seen[key] = number
+        yield number, row
+
+
+# --- Write -----------------------------------------------------------------
+
+def chunked(rows, size):
+    chunk = []
+    for _, row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_courts(f, fmt, reject, chunk_size=1000, dry_run=False, progress=None):
+    """
+    Run the whole pipeline over an open file
+    reject(record_number, record, reason) is called for every rejected record,
+    progress(SeedResult) after every written chunk.
+    Returns: SeedResult totals
+    """
+    total = SeedResult()
+    rows = dedupe(validate(parse(f, fmt), reject), reject)
+    for chunk in chunked(rows, chunk_size):
+        if dry_run:
+            total.unchanged += len(chunk)
+        else:
+            result = seed_courts(chunk, batch_size=chunk_size)
+            total.created += result.created
+            total.updated += result.updated
+            total.unchanged += result.unchanged
+            total.elapsed += result.elapsed
+        if progress is not None:
+            progress(total)
+    return total
@@ -0,0 +1,65 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from court_filter import fulltext
+from court_filter.models import CourtSearchEntry
+
+PREFIXES = ['GOR', 'Lapangan', 'Arena', 'Stadion', 'Sport Center', 'Hall', 'Kolam', 'Taman']
+PLACES = [
+    'Senayan', 'Sudirman', 'Kemayoran', 'Cibubur', 'Bekasi', 'Depok', 'Bogor', 'Bandung', 'Cimahi',
+    'Surabaya', 'Sidoarjo', 'Malang', 'Semarang', 'Solo', 'Yogyakarta', 'Denpasar', 'Medan', 'Makassar',
+    'Palembang', 'Pekanbaru', 'Balikpapan', 'Pontianak', 'Manado', 'Kupang', 'Mataram', 'Jayapura',
+]
+SPORTS = ['Futsal', 'Badminton', 'Basket', 'Tenis', 'Voli', 'Padel', 'Golf', 'Mini Soccer']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark court name autocomplete on synthetic courts (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courts', type=int, default=100000, help='Synthetic courts to add (default: 100000)')
+        parser.add_argument('--queries', type=int, default=200, help='Autocomplete queries to time (default: 200)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            start = time.perf_counter()
+            entries = []
+            for i in range(options['courts']):
+                name = f'{rng.choice(PREFIXES)} {rng.choice(SPORTS)} {rng.choice(PLACES)} {i}'
+                entries.append(CourtSearchEntry(
+                    id=uuid.uuid4(), source='court_filter', source_id=str(uuid.uuid4()), name=name,
+                    address=f'Jl. {rng.choice(PLACES)} No. {rng.randint(1, 200)}, {rng.choice(PLACES)}',
+                    court_type='other', price_per_hour=0,
+                ))
+            CourtSearchEntry.objects.bulk_create(entries, batch_size=5000)
+            self.stdout.write(f'Inserted {len(entries)} courts in {time.perf_counter() - start:.1f}s')
+
+            # Awalan seperti yang diketik user: 2-6 huruf, kadang dua kata
+            queries = []
+            for _ in range(options['queries']):
+                word = rng.choice(PLACES + SPORTS + PREFIXES).split()[0].lower()
+                query = word[:rng.randint(2, min(6, len(word)))]
+                if rng.random() < 0.3:
+                    query = f'{rng.choice(SPORTS).split()[0].lower()} {query}'
+                queries.append(query)
+
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                fulltext.autocomplete(query)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'autocomplete: median {statistics.median(timings):.2f} ms, '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, max {timings[-1]:.2f} ms'
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished (synthetic courts rolled back).'))
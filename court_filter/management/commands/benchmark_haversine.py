@@ -0,0 +1,66 @@
+import random
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from court_filter.geodistance import CoordinateArray, haversine_matrix
+from court_filter.utils import haversine_distance
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark the scalar haversine_distance against the vectorized NumPy engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000',
+                            help='Comma separated number of synthetic courts (default: 1000,10000,100000)')
+        parser.add_argument('--origins', type=int, default=20,
+                            help='Number of origins for the M x N comparison (default: 20)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        m = options['origins']
+
+        self.stdout.write(
+            f"{'courts':>8} {'scalar 1xN (ms)':>16} {'numpy 1xN (ms)':>15} {'speedup':>8} "
+            f"{'scalar MxN (ms)':>16} {'numpy MxN (ms)':>15} {'speedup':>8}"
+        )
+
+        for size in sizes:
+            # Same shape as the database rows: Decimal coordinates with 6 decimal places
+            lats = [Decimal(f'{rng.uniform(-11, 6):.6f}') for _ in range(size)]
+            lons = [Decimal(f'{rng.uniform(95, 141):.6f}') for _ in range(size)]
+            origins = [(rng.uniform(-11, 6), rng.uniform(95, 141)) for _ in range(m)]
+            coords = CoordinateArray(range(size), lats, lons)
+            origin_lat, origin_lon = origins[0]
+
+            start = time.perf_counter()
+            scalar = [haversine_distance(origin_lat, origin_lon, lat, lon) for lat, lon in zip(lats, lons)]
+            scalar_one = time.perf_counter() - start
+
+            start = time.perf_counter()
+            vector = coords.distances_from(origin_lat, origin_lon)
+            numpy_one = time.perf_counter() - start
+
+            if not np.allclose(scalar, vector):
+                self.stdout.write(self.style.ERROR(f'Vectorized distances differ at {size} courts!'))
+
+            start = time.perf_counter()
+            for lat0, lon0 in origins:
+                for lat, lon in zip(lats, lons):
+                    haversine_distance(lat0, lon0, lat, lon)
+            scalar_many = time.perf_counter() - start
+
+            start = time.perf_counter()
+            haversine_matrix([o[0] for o in origins], [o[1] for o in origins], lats, lons)
+            numpy_many = time.perf_counter() - start
+
+            self.stdout.write(
+                f'{size:>8} {scalar_one * 1000:>16.2f} {numpy_one * 1000:>15.3f} {scalar_one / numpy_one:>7.0f}x '
+                f'{scalar_many * 1000:>16.2f} {numpy_many * 1000:>15.2f} {scalar_many / numpy_many:>7.0f}x'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished.'))
@@ -0,0 +1,67 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from court_filter.spatial import GeoGridIndex, DEFAULT_CELL_SIZE
+from court_filter.utils import haversine_distance
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the grid spatial index against the linear haversine scan used by search_courts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help='Comma separated number of synthetic courts (default: 10000,100000,1000000)')
+        parser.add_argument('--queries', type=int, default=10, help='Radius queries per size (default: 10)')
+        parser.add_argument('--radius', type=float, default=10, help='Search radius in km (default: 10)')
+        parser.add_argument('--cell-size', type=float, default=DEFAULT_CELL_SIZE,
+                            help=f'Grid cell size in degrees (default: {DEFAULT_CELL_SIZE})')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        radius = options['radius']
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+
+        self.stdout.write(
+            f"{'courts':>10} {'build (s)':>10} {'linear (ms)':>12} {'index (ms)':>11} {'speedup':>8} {'hits':>6}"
+        )
+
+        for size in sizes:
+            # Titik acak di dalam batas Indonesia (lat -11..6, lon 95..141)
+            points = [(rng.uniform(-11, 6), rng.uniform(95, 141)) for _ in range(size)]
+            origins = [points[rng.randrange(size)] for _ in range(options['queries'])]
+
+            start = time.perf_counter()
+            grid = GeoGridIndex(options['cell_size'])
+            for court_id, (lat, lon) in enumerate(points):
+                grid.insert(court_id, lat, lon)
+            build_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            linear_results = []
+            for lat, lon in origins:
+                hits = {
+                    court_id for court_id, (court_lat, court_lon) in enumerate(points)
+                    if haversine_distance(lat, lon, court_lat, court_lon) <= radius
+                }
+                linear_results.append(hits)
+            linear_time = (time.perf_counter() - start) / len(origins)
+
+            start = time.perf_counter()
+            index_results = []
+            for lat, lon in origins:
+                index_results.append({court_id for court_id, _ in grid.within_radius(lat, lon, radius)})
+            index_time = (time.perf_counter() - start) / len(origins)
+
+            if linear_results != index_results:
+                self.stdout.write(self.style.ERROR(f'Index results differ from the linear scan at {size} courts!'))
+
+            total_hits = sum(len(hits) for hits in index_results)
+            self.stdout.write(
+                f'{size:>10} {build_time:>10.2f} {linear_time * 1000:>12.2f} {index_time * 1000:>11.3f} '
+                f'{linear_time / index_time:>7.0f}x {total_hits // len(origins):>6}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark finished.'))
@@ -0,0 +1,79 @@
+import json
+from statistics import median
+
+from django.core.management.base import BaseCommand
+
+from court_filter.gazetteer import GAZETTEER_PATH, REFERENCE_PATH, load_places, merge_places, normalize_place
+from court_filter.models import Court, Province
+from court_filter.utils import normalize_address, is_in_indonesia
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the offline gazetteer: the reference provinces and major cities, plus the other '
+        'cities found in court addresses in the database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(GAZETTEER_PATH),
+                            help=f'Where to write the gazetteer (default: {GAZETTEER_PATH})')
+        parser.add_argument('--reference', default=str(REFERENCE_PATH),
+                            help=f'Curated places kept as they are (default: {REFERENCE_PATH})')
+        parser.add_argument('--min-courts', type=int, default=1,
+                            help='Only keep cities with at least this many courts (default: 1)')
+
+    def handle(self, *args, **options):
+        provinces = {normalize_place(name): name for name in Province.objects.values_list('name', flat=True)}
+
+        # Kumpulkan koordinat lapangan per (kota, provinsi); provinsi selalu dari data referensi
+        city_points = {}
+        city_names = {}
+        courts = Court.objects.values_list('address', 'latitude', 'longitude').iterator()
+        for address, lat, lon in courts:
+            if lat is None or lon is None or not is_in_indonesia(lat, lon):
+                continue
+            point = (float(lat), float(lon))
+            parts = [part for part in normalize_address(address).split(', ') if part]
+            if not parts:
+                continue
+
+            # Alamat biasanya "..., Kota, Provinsi", kadang berhenti di kota ("..., Jakarta Pusat")
+            province = provinces.get(normalize_place(parts[-1]))
+            if province is not None:
+                city_index = -2
+            else:
+                city_index = -1
+
+            if len(parts) >= max(2, -city_index):
+                city_key = normalize_place(parts[city_index])
+                if city_key and city_key not in provinces:
+                    city_points.setdefault((city_key, province), []).append(point)
+                    city_names.setdefault((city_key, province), address.split(',')[city_index].strip())
+
+        derived = []
+        for (city_key, province), points in sorted(city_points.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+            if len(points) >= options['min_courts']:
+                derived.append(self._place(city_names[(city_key, province)], 'city', province, points))
+        reference = load_places(options['reference'])
+        places = merge_places(reference, derived)
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump({'places': places}, f, ensure_ascii=False, indent=1)
+            f.write('\n')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(places)} places ({len(reference)} reference, {len(places) - len(reference)} '
+            f'from court addresses) to {options["output"]}'
+        ))
+
+    @staticmethod
+    def _place(name, kind, province, points):
+        # Median lebih tahan terhadap satu-dua lapangan dengan koordinat yang salah
+        return {
+            'name': name,
+            'kind': kind,
+            'province': province,
+            'latitude': round(median(lat for lat, _ in points), 6),
+            'longitude': round(median(lon for _, lon in points), 6),
+            'courts': len(points),
+        }
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from court_filter.exporting import DEFAULT_CHUNK_SIZE, EXPORTS, EXPORT_FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Stream every court or bookmark to a file (or stdout) as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson', help='Output format (default: ndjson)')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f'Rows fetched from the database per round trip (default: {DEFAULT_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        lines = export_lines(options['kind'], options['format'], chunk_size=options['chunk_size'])
+        start = time.perf_counter()
+        count = 0
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                for line in lines:
+                    f.write(line)
+                    count += 1
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+                count += 1
+
+        if options['format'] == 'csv':
+            count -= 1  # baris header
+        elapsed = time.perf_counter() - start
+        # Ringkasan ke stderr supaya tidak tercampur dengan data di stdout
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {count} {options["kind"]} in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
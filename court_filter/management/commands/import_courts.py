@@ -0,0 +1,68 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from court_filter.importing import FORMATS, detect_format, import_courts
+
+
+class Command(BaseCommand):
+    help = 'Stream courts from a CSV, NDJSON or GeoJSON file into the database (upsert by osm_id/name)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file')
+        parser.add_argument('--format', choices=FORMATS, help='Input format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows written per bulk insert/update (default: 1000)')
+        parser.add_argument('--rejects', help='Where to write rejected records as NDJSON (default: <path>.rejects.ndjson)')
+        parser.add_argument('--dry-run', action='store_true', help='Parse and validate only, write nothing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            fmt = options['format'] or detect_format(path)
+        except ValueError as e:
+            raise CommandError(e)
+        rejects_path = options['rejects'] or f'{path}.rejects.ndjson'
+
+        rejected = 0
+        start = time.perf_counter()
+
+        def progress(result):
+            elapsed = time.perf_counter() - start
+            done = result.total
+            self.stdout.write(
+                f'  {done} imported ({result.created} created, {result.updated} updated), '
+                f'{rejected} rejected, {(done + rejected) / elapsed if elapsed else 0:.0f} rows/s'
+            )
+
+        try:
+            with open(path, newline='', encoding='utf-8') as source, \
+                    open(rejects_path, 'w', encoding='utf-8') as rejects:
+
+                def reject(number, record, reason):
+                    nonlocal rejected
+                    rejected += 1
+                    rejects.write(json.dumps(
+                        {'record': number, 'reason': reason, 'data': record}, ensure_ascii=False, default=str
+                    ) + '\n')
+
+                result = import_courts(
+                    source, fmt, reject,
+                    chunk_size=options['chunk_size'], dry_run=options['dry_run'], progress=progress,
+                )
+        except FileNotFoundError as e:
+            raise CommandError(e)
+        except ValueError as e:
+            # JSON rusak di level dokumen (bukan per record)
+            raise CommandError(f'Could not read {path}: {e}')
+
+        elapsed = time.perf_counter() - start
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.total} courts ({result.created} created, {result.updated} updated, '
+            f'{result.unchanged} unchanged) in {elapsed:.2f}s '
+            f'({(result.total + rejected) / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
+        if rejected:
+            self.stdout.write(self.style.WARNING(f'{rejected} records rejected, see {rejects_path}'))
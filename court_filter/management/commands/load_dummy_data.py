@@ -1,50 +1,65 @@
 from django.core.management.base import BaseCommand
 from decimal import Decimal
-from court_filter.models import Court, Province, Facility
+from court_filter.models import Court
+from court_filter.seeding import ensure_provinces, seed_courts
 
 class Command(BaseCommand):
     help = 'Load dummy court data for testing'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows per bulk insert/update (default: 500)')
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.WARNING('Loading dummy data...'))
         
-        # Get or create provinces
-        aceh, _ = Province.objects.get_or_create(name='Aceh')
-        sumut, _ = Province.objects.get_or_create(name='Sumatera Utara')
-        sumbar, _ = Province.objects.get_or_create(name='Sumatera Barat')
-        riau, _ = Province.objects.get_or_create(name='Riau')
-        jambi, _ = Province.objects.get_or_create(name='Jambi')
-        sumsel, _ = Province.objects.get_or_create(name='Sumatera Selatan')
-        bengkulu, _ = Province.objects.get_or_create(name='Bengkulu')
-        lampung, _ = Province.objects.get_or_create(name='Lampung')
-        babel, _ = Province.objects.get_or_create(name='Kepulauan Bangka Belitung')
-        kepri, _ = Province.objects.get_or_create(name='Kepulauan Riau')
-        dki_jakarta, _ = Province.objects.get_or_create(name='DKI Jakarta')
-        jabar, _ = Province.objects.get_or_create(name='Jawa Barat')
-        jateng, _ = Province.objects.get_or_create(name='Jawa Tengah')
-        diy, _ = Province.objects.get_or_create(name='Daerah Istimewa Yogyakarta')
-        jatim, _ = Province.objects.get_or_create(name='Jawa Timur')
-        banten, _ = Province.objects.get_or_create(name='Banten')
-        bali, _ = Province.objects.get_or_create(name='Bali')
-        ntb, _ = Province.objects.get_or_create(name='Nusa Tenggara Barat')
-        ntt, _ = Province.objects.get_or_create(name='Nusa Tenggara Timur')
-        kalbar, _ = Province.objects.get_or_create(name='Kalimantan Barat')
-        kalsel, _ = Province.objects.get_or_create(name='Kalimantan Selatan')
-        kaltim, _ = Province.objects.get_or_create(name='Kalimantan Timur')
-        kaltara, _ = Province.objects.get_or_create(name='Kalimantan Utara')
-        sultara, _ = Province.objects.get_or_create(name='Sulawesi Utara')
-        sulsel, _ = Province.objects.get_or_create(name='Sulawesi Selatan')
-        sulteng, _ = Province.objects.get_or_create(name='Sulawesi Tengah')
-        sultra, _ = Province.objects.get_or_create(name='Sulawesi Tenggara')
-        gorontalo, _ = Province.objects.get_or_create(name='Gorontalo')
-        sulbar, _ = Province.objects.get_or_create(name='Sulawesi Barat')
-        maluku, _ = Province.objects.get_or_create(name='Maluku')
-        maltara, _ = Province.objects.get_or_create(name='Maluku Utara')
-        papua_barat, _ = Province.objects.get_or_create(name='Papua Barat')
-        papua, _ = Province.objects.get_or_create(name='Papua')
-        papua_tengah, _ = Province.objects.get_or_create(name='Papua Tengah')
-        papua_pegunungan, _ = Province.objects.get_or_create(name='Papua Pegunungan')
-        papua_barat_daya, _ = Province.objects.get_or_create(name='Papua Barat Daya')
+        # Get or create provinces (satu query untuk semua)
+        provinces = ensure_provinces([
+            'Aceh', 'Sumatera Utara', 'Sumatera Barat', 'Riau', 'Jambi', 'Sumatera Selatan',
+            'Bengkulu', 'Lampung', 'Kepulauan Bangka Belitung', 'Kepulauan Riau', 'DKI Jakarta',
+            'Jawa Barat', 'Jawa Tengah', 'Daerah Istimewa Yogyakarta', 'Jawa Timur', 'Banten',
+            'Bali', 'Nusa Tenggara Barat', 'Nusa Tenggara Timur', 'Kalimantan Barat',
+            'Kalimantan Selatan', 'Kalimantan Timur', 'Kalimantan Utara', 'Sulawesi Utara',
+            'Sulawesi Selatan', 'Sulawesi Tengah', 'Sulawesi Tenggara', 'Gorontalo',
+            'Sulawesi Barat', 'Maluku', 'Maluku Utara', 'Papua Barat', 'Papua', 'Papua Tengah',
+            'Papua Pegunungan', 'Papua Barat Daya',
+        ])
+        aceh = provinces['Aceh']
+        sumut = provinces['Sumatera Utara']
+        sumbar = provinces['Sumatera Barat']
+        riau = provinces['Riau']
+        jambi = provinces['Jambi']
+        sumsel = provinces['Sumatera Selatan']
+        bengkulu = provinces['Bengkulu']
+        lampung = provinces['Lampung']
+        babel = provinces['Kepulauan Bangka Belitung']
+        kepri = provinces['Kepulauan Riau']
+        dki_jakarta = provinces['DKI Jakarta']
+        jabar = provinces['Jawa Barat']
+        jateng = provinces['Jawa Tengah']
+        diy = provinces['Daerah Istimewa Yogyakarta']
+        jatim = provinces['Jawa Timur']
+        banten = provinces['Banten']
+        bali = provinces['Bali']
+        ntb = provinces['Nusa Tenggara Barat']
+        ntt = provinces['Nusa Tenggara Timur']
+        kalbar = provinces['Kalimantan Barat']
+        kalsel = provinces['Kalimantan Selatan']
+        kaltim = provinces['Kalimantan Timur']
+        kaltara = provinces['Kalimantan Utara']
+        sultara = provinces['Sulawesi Utara']
+        sulsel = provinces['Sulawesi Selatan']
+        sulteng = provinces['Sulawesi Tengah']
+        sultra = provinces['Sulawesi Tenggara']
+        gorontalo = provinces['Gorontalo']
+        sulbar = provinces['Sulawesi Barat']
+        maluku = provinces['Maluku']
+        maltara = provinces['Maluku Utara']
+        papua_barat = provinces['Papua Barat']
+        papua = provinces['Papua']
+        papua_tengah = provinces['Papua Tengah']
+        papua_pegunungan = provinces['Papua Pegunungan']
+        papua_barat_daya = provinces['Papua Barat Daya']
         
         # Dummy courts data dari berbagai provinsi
         courts_data = [
@@ -4955,56 +4970,14 @@ class Command(BaseCommand):
             # 
         ]
 
-        created_count = 0
-        updated_count = 0
-
+        # Dummy data dikenali lewat nama: beberapa osm_id di sini dipakai oleh lebih dari satu nama
         for court_data in courts_data:
-            # ambil dan hapus M2M fields dari dict sebelum update_or_create
-            provinces_input = court_data.pop('provinces', [])
-            facilities_input = court_data.pop('facilities', [])
             court_data.pop('osm_id', None)
 
-            # update_or_create hanya dengan fields non-M2M
-            court, created = Court.objects.update_or_create(
-                name=court_data['name'],
-                defaults=court_data
-            )
-
-            # === handle provinces M2M ===
-            # provinces_input bisa berupa list objek Province (mis. [jambi]) atau list nama
-            provinces_objs = []
-            for p in provinces_input:
-                if isinstance(p, Province):
-                    provinces_objs.append(p)
-                else:
-                    # anggap p adalah string nama provinsi
-                    obj, _ = Province.objects.get_or_create(name=str(p))
-                    provinces_objs.append(obj)
-            # set provinces (ganti semua relasi)
-            court.provinces.set(provinces_objs)
-
-            # === handle facilities M2M ===
-            # facilities_input bisa berupa list nama facility atau list objek Facility
-            facilities_objs = []
-            for f in facilities_input:
-                if isinstance(f, Facility):
-                    facilities_objs.append(f)
-                else:
-                    # anggap f adalah string nama facility
-                    fac_obj, _ = Facility.objects.get_or_create(name=str(f))
-                    facilities_objs.append(fac_obj)
-            # set facilities
-            court.facilities.set(facilities_objs)
-
-            # logging
-            if created:
-                created_count += 1
-                self.stdout.write(self.style.SUCCESS(f'✓ Created: {court.name}'))
-            else:
-                updated_count += 1
-                self.stdout.write(self.style.WARNING(f'⟳ Updated: {court.name}'))
+        result = seed_courts(courts_data, batch_size=options['batch_size'])
 
         self.stdout.write(self.style.SUCCESS(
-            f'\n✅ Successfully loaded {created_count} new courts and updated {updated_count} existing courts!'
+            f'\n✅ Loaded {result.total} courts: {result.created} created, {result.updated} updated, '
+            f'{result.unchanged} unchanged in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s)'
         ))
-        self.stdout.write(self.style.SUCCESS(f'📍 Total courts in database: {Court.objects.count()}'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f'📍 Total courts in database: {Court.objects.count()}'))
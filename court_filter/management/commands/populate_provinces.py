@@ -1,8 +1,9 @@
 from django.core.management.base import BaseCommand
 from court_filter.models import Province
+from manage_court.models import Province as ManagedProvince
 
 class Command(BaseCommand):
-    help = 'Populate Indonesia provinces'
+    help = 'Populate Indonesia provinces (court_filter and manage_court)'
 
     def handle(self, *args, **options):
         provinces_data = [
@@ -19,14 +20,17 @@ class Command(BaseCommand):
             'Papua Pegunungan', 'Papua Barat Daya'
         ]
         
-        for province_name in provinces_data:
-            province, created = Province.objects.get_or_create(name=province_name)
-            if created:
-                self.stdout.write(
-                    self.style.SUCCESS(f'Created province: {province_name}')
-                )
-            else:
-                self.stdout.write(f'Province already exists: {province_name}')
+        # Kedua app punya tabel Province sendiri; isi dua-duanya dari satu daftar
+        for model in (Province, ManagedProvince):
+            label = model._meta.app_label
+            for province_name in provinces_data:
+                province, created = model.objects.get_or_create(name=province_name)
+                if created:
+                    self.stdout.write(
+                        self.style.SUCCESS(f'Created province: {province_name} ({label})')
+                    )
+                else:
+                    self.stdout.write(f'Province already exists: {province_name} ({label})')
         
         self.stdout.write(
             self.style.SUCCESS('Successfully populated all provinces!')
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from court_filter.read_model import rebuild_entries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the court search table from court_filter and manage_court courts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Courts synced per batch (default: 500)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        written, removed = rebuild_entries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Search entries rebuilt in {time.perf_counter() - start:.2f}s: '
+            f'{written} written, {removed} removed'
+        ))
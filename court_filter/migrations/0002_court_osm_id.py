@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('court_filter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='court',
+            name='osm_id',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True, verbose_name='OSM ID'),
+        ),
+    ]
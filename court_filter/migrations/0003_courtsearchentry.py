@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:06
+
+import uuid
+
+from django.db import migrations, models
+
+# Salinan dari read_model.ENTRY_NAMESPACE, supaya migrasi tidak bergantung pada kode app
+ENTRY_NAMESPACE = uuid.UUID('8a4c2f0e-5b1d-4e8f-9c3a-2d6b7e1f0a95')
+FIELDS = [
+    'name', 'address', 'latitude', 'longitude', 'court_type', 'price_per_hour',
+    'phone_number', 'description',
+]
+
+
+def backfill_entries(apps, schema_editor):
+    Entry = apps.get_model('court_filter', 'CourtSearchEntry')
+    Court = apps.get_model('court_filter', 'Court')
+    Province = apps.get_model('court_filter', 'Province')
+    Facility = apps.get_model('court_filter', 'Facility')
+    ManagedCourt = apps.get_model('manage_court', 'Court')
+
+    entries, provinces, facilities = [], {}, {}
+    for court in Court.objects.prefetch_related('provinces', 'facilities').iterator(chunk_size=1000):
+        entries.append(Entry(
+            id=court.id, source='court_filter', source_id=str(court.id),
+            location_type=court.location_type, is_active=court.is_active,
+            **{field: getattr(court, field) for field in FIELDS}
+        ))
+        provinces[court.id] = [p.pk for p in court.provinces.all()]
+        facilities[court.id] = [f.pk for f in court.facilities.all()]
+
+    managed = ManagedCourt.objects.select_related('province').prefetch_related('facilities')
+    for court in managed.iterator(chunk_size=1000):
+        entry_id = uuid.uuid5(ENTRY_NAMESPACE, f'manage_court:{court.pk}')
+        entries.append(Entry(
+            id=entry_id, source='manage_court', source_id=str(court.pk),
+            location_type='', is_active=True,
+            **{field: getattr(court, field) for field in FIELDS}
+        ))
+        names = [court.province.name] if court.province_id else []
+        provinces[entry_id] = [Province.objects.get_or_create(name=name)[0].pk for name in names]
+        facilities[entry_id] = [
+            Facility.objects.get_or_create(name=f.name)[0].pk for f in court.facilities.all()
+        ]
+
+    Entry.objects.bulk_create(entries, batch_size=500)
+    Entry.provinces.through.objects.bulk_create([
+        Entry.provinces.through(courtsearchentry_id=entry_id, province_id=province_id)
+        for entry_id, ids in provinces.items() for province_id in ids
+    ], batch_size=500)
+    Entry.facilities.through.objects.bulk_create([
+        Entry.facilities.through(courtsearchentry_id=entry_id, facility_id=facility_id)
+        for entry_id, ids in facilities.items() for facility_id in ids
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('court_filter', '0002_court_osm_id'),
+        ('manage_court', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourtSearchEntry',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('source', models.CharField(choices=[('court_filter', 'Court Finder'), ('manage_court', 'Manage Court')], max_length=20)),
+                ('source_id', models.CharField(max_length=64)),
+                ('name', models.CharField(max_length=255)),
+                ('address', models.TextField()),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('court_type', models.CharField(max_length=20)),
+                ('location_type', models.CharField(blank=True, max_length=10)),
+                ('price_per_hour', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('phone_number', models.CharField(blank=True, max_length=20)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('facilities', models.ManyToManyField(blank=True, related_name='search_entries', to='court_filter.facility')),
+                ('provinces', models.ManyToManyField(blank=True, related_name='search_entries', to='court_filter.province')),
+            ],
+            options={
+                'verbose_name_plural': 'Court search entries',
+                'indexes': [models.Index(fields=['latitude', 'longitude'], name='court_filte_latitud_b0d6eb_idx'), models.Index(fields=['is_active', 'name'], name='court_filte_is_acti_344e76_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'source_id'), name='unique_search_entry_source')],
+            },
+        ),
+        migrations.RunPython(backfill_entries, migrations.RunPython.noop),
+    ]
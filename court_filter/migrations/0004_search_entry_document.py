@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:10
+
+import json
+from urllib.parse import quote
+
+from django.db import migrations, models
+
+DOCUMENT_FIELDS = [
+    'source', 'source_id', 'name', 'address', 'latitude', 'longitude', 'court_type',
+    'location_type', 'price_per_hour', 'phone_number', 'description',
+]
+
+# Salinan beku dari read_model/bitmask saat migrasi ini dibuat; jangan diganti import,
+# kode aplikasi boleh berubah tapi migrasi harus tetap menghasilkan data yang sama.
+MASK_MAX_ID = 63
+URL_SAFE = "!$&'()*+,;=/~:@"  # karakter yang tidak di-quote oleh reverse()
+
+
+def _mask(pks):
+    value = 0
+    for pk in pks:
+        if 0 < pk <= MASK_MAX_ID:
+            value |= 1 << (pk - 1)
+    return value
+
+
+def _detail_url(source, source_id, name):
+    if source == 'manage_court':
+        return f'/manage-court/detail/{int(source_id)}/'
+    return f'/courts/detail/{quote(name, safe=URL_SAFE)}/'
+
+
+def _number(value):
+    return float(value) if value is not None else None
+
+
+def _document(pk, fields, provinces, facilities):
+    return json.dumps({
+        'id': str(pk),
+        'source': fields['source'],
+        'detail_url': _detail_url(fields['source'], fields['source_id'], fields['name']),
+        'name': fields['name'],
+        'address': fields['address'],
+        'court_type': fields['court_type'],
+        'location_type': fields['location_type'],
+        'latitude': _number(fields['latitude']),
+        'longitude': _number(fields['longitude']),
+        'price_per_hour': _number(fields['price_per_hour']),
+        'phone_number': fields['phone_number'],
+        'description': fields['description'],
+        'provinces': [{'id': p.id, 'name': p.name} for p in sorted(provinces, key=lambda p: p.name)],
+        'facilities': sorted(f.name for f in facilities),
+    }, ensure_ascii=False, separators=(',', ':'))
+
+
+def build_documents(apps, schema_editor):
+    Entry = apps.get_model('court_filter', 'CourtSearchEntry')
+    entries = Entry.objects.prefetch_related('provinces', 'facilities').iterator(chunk_size=500)
+    batch = []
+    for entry in entries:
+        provinces = list(entry.provinces.all())
+        facilities = list(entry.facilities.all())
+        fields = {field: getattr(entry, field) for field in DOCUMENT_FIELDS}
+        entry.document = _document(entry.pk, fields, provinces, facilities)
+        entry.province_mask = _mask(p.pk for p in provinces)
+        entry.facility_mask = _mask(f.pk for f in facilities)
+        batch.append(entry)
+        if len(batch) >= 500:
+            Entry.objects.bulk_update(batch, ['document', 'province_mask', 'facility_mask'])
+            batch = []
+    Entry.objects.bulk_update(batch, ['document', 'province_mask', 'facility_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('court_filter', '0003_courtsearchentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courtsearchentry',
+            name='document',
+            field=models.TextField(default='{}'),
+        ),
+        migrations.AddField(
+            model_name='courtsearchentry',
+            name='facility_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='courtsearchentry',
+            name='province_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='courtsearchentry',
+            name='court_type',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='courtsearchentry',
+            name='location_type',
+            field=models.CharField(blank=True, db_index=True, max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='courtsearchentry',
+            name='price_per_hour',
+            field=models.DecimalField(db_index=True, decimal_places=2, max_digits=10),
+        ),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
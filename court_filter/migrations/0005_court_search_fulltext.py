@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# Salinan beku dari fulltext.py saat migrasi ini dibuat; jangan diganti import,
+# skema di fulltext.py boleh berubah lewat migrasi baru.
+FTS_TABLE = 'court_filter_courtsearch_fts'
+ENTRY_TABLE = 'court_filter_courtsearchentry'
+
+SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, address, description,
+        content='{ENTRY_TABLE}', content_rowid='rowid',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {ENTRY_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, address, description)
+        VALUES (new.rowid, new.name, new.address, new.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {ENTRY_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address, description)
+        VALUES ('delete', old.rowid, old.name, old.address, old.description);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, address, description ON {ENTRY_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, address, description)
+        VALUES ('delete', old.rowid, old.name, old.address, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, address, description)
+        VALUES (new.rowid, new.name, new.address, new.description);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRES_SCHEMA = [
+    f"""ALTER TABLE {ENTRY_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(address, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED""",
+    f'CREATE INDEX {ENTRY_TABLE}_search_idx ON {ENTRY_TABLE} USING GIN (search_vector)',
+]
+POSTGRES_DROP = [
+    f'DROP INDEX IF EXISTS {ENTRY_TABLE}_search_idx',
+    f'ALTER TABLE {ENTRY_TABLE} DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_fulltext(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_SCHEMA, 'postgresql': POSTGRES_SCHEMA})
+
+
+def drop_fulltext(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP})
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text index over CourtSearchEntry (FTS5 on SQLite, tsvector + GIN on
+    PostgreSQL). Raw SQL only: the model doesn't know about it, see fulltext.py.
+    """
+
+    dependencies = [
+        ('court_filter', '0004_search_entry_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext, drop_fulltext),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:40
+
+import json
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+# Salinan beku dari Court.make_slug dan read_model.detail_url saat migrasi ini dibuat;
+# jangan diganti import, kode aplikasi boleh berubah tapi migrasi harus tetap sama.
+def _make_slug(name, pk):
+    base = slugify(name)[:80].strip('-') or 'court'
+    return f'{base}-{pk.hex[:8]}'
+
+
+def _detail_url(source_id):
+    return f'/courts/court/{source_id}/'
+
+
+def fill_slugs(apps, schema_editor):
+    Court = apps.get_model('court_filter', 'Court')
+    batch = []
+    for court in Court.objects.only('id', 'name').iterator(chunk_size=500):
+        court.slug = _make_slug(court.name, court.pk)
+        batch.append(court)
+        if len(batch) >= 500:
+            Court.objects.bulk_update(batch, ['slug'])
+            batch = []
+    Court.objects.bulk_update(batch, ['slug'])
+
+
+def point_documents_at_id_route(apps, schema_editor):
+    # Dokumen search lama menyimpan detail_url berbasis nama
+    Entry = apps.get_model('court_filter', 'CourtSearchEntry')
+    batch = []
+    for entry in Entry.objects.filter(source='court_filter').only('id', 'source_id', 'document').iterator(chunk_size=500):
+        document = json.loads(entry.document)
+        document['detail_url'] = _detail_url(entry.source_id)
+        entry.document = json.dumps(document, ensure_ascii=False, separators=(',', ':'))
+        batch.append(entry)
+        if len(batch) >= 500:
+            Entry.objects.bulk_update(batch, ['document'])
+            batch = []
+    Entry.objects.bulk_update(batch, ['document'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('court_filter', '0005_court_search_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='court',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=100, null=True),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='court',
+            name='slug',
+            field=models.SlugField(editable=False, max_length=100, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='court',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255, verbose_name='Nama Lapangan'),
+        ),
+        migrations.RunPython(point_documents_at_id_route, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('court_filter', '0006_court_slug'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courtsearchentry',
+            index=models.Index(fields=['synced_at'], name='court_filte_synced__ff9273_idx'),
+        ),
+    ]
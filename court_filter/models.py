@@ -1,10 +1,50 @@
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+from django.utils.text import slugify
 import uuid
 
+from .bitmask import mask as bitmask
+from .utils import bounding_box, haversine_expression
+
 User = get_user_model()
 
+
+class GeoQuerySet(models.QuerySet):
+    """
+    Radius queries done in the database: a bounding box the (latitude, longitude)
+    index can answer, then the exact haversine distance as an annotation.
+    """
+    lat_field = 'latitude'
+    lon_field = 'longitude'
+
+    def within_radius(self, latitude, longitude, radius_km):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        return (
+            self.filter(**{
+                f'{self.lat_field}__range': (min_lat, max_lat),
+                f'{self.lon_field}__range': (min_lon, max_lon),
+            })
+            .annotate(distance=haversine_expression(latitude, longitude, self.lat_field, self.lon_field))
+            .filter(distance__lte=radius_km)
+        )
+
+
+class SearchEntryQuerySet(GeoQuerySet):
+
+    def has_bits(self, field, ids):
+        """
+        Rows whose bitmask column `field` has the bit of every id set
+        (callers check bitmask.fits() first, ids past MAX_ID have no bit).
+        """
+        wanted = bitmask(ids)
+        if not wanted:
+            return self
+        alias = f'_{field}_bits'
+        return self.alias(**{alias: models.F(field).bitand(wanted)}).filter(**{alias: wanted})
+
+
 class Facility(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name="Facility")
 
@@ -47,7 +87,9 @@ class Court(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    name = models.CharField(max_length=255, verbose_name="Nama Lapangan")
+    name = models.CharField(max_length=255, db_index=True, verbose_name="Nama Lapangan")
+    # Dibuat sekali dari nama + awal UUID, tidak berubah walau court di-rename (URL tetap valid)
+    slug = models.SlugField(max_length=100, unique=True, editable=False)
     address = models.TextField(verbose_name="Alamat Lengkap")
     latitude = models.DecimalField(max_digits=9, decimal_places=6, verbose_name="Latitude")
     longitude = models.DecimalField(max_digits=9, decimal_places=6, verbose_name="Longitude")
@@ -65,6 +107,10 @@ class Court(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True, verbose_name="Aktif")
+    # ID node/way OpenStreetMap sumber data, dipakai untuk dedupe saat import
+    osm_id = models.CharField(max_length=32, unique=True, null=True, blank=True, verbose_name="OSM ID")
+
+    objects = GeoQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
@@ -75,12 +121,152 @@ class Court(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = self.make_slug(self.name, self.pk)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def make_slug(name, pk):
+        """
+        URL slug for a court: its slugified name plus the first 8 hex digits of
+        its UUID, so it is unique without looking at other rows (bulk_create
+        callers set it themselves since save() is skipped).
+        """
+        base = slugify(name)[:80].strip('-') or 'court'
+        return f'{base}-{pk.hex[:8]}'
+
+
+class CourtSearchEntry(models.Model):
+    """
+    Denormalized copy of every searchable court, from court_filter.Court and
+    manage_court.Court alike; search_courts and the spatial index read only this.
+    Kept in sync by court_filter/read_model.py, never edited directly.
+    """
+    SOURCE_COURT_FILTER = 'court_filter'
+    SOURCE_MANAGE_COURT = 'manage_court'
+    SOURCES = [
+        (SOURCE_COURT_FILTER, 'Court Finder'),
+        (SOURCE_MANAGE_COURT, 'Manage Court'),
+    ]
+
+    # court_filter: sama dengan Court.id (bookmark tetap cocok); manage_court: uuid5 dari pk
+    id = models.UUIDField(primary_key=True, editable=False)
+    source = models.CharField(max_length=20, choices=SOURCES)
+    source_id = models.CharField(max_length=64)
+    name = models.CharField(max_length=255)
+    address = models.TextField()
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    court_type = models.CharField(max_length=20, db_index=True)
+    location_type = models.CharField(max_length=10, blank=True, db_index=True)
+    price_per_hour = models.DecimalField(max_digits=10, decimal_places=2, db_index=True)
+    phone_number = models.CharField(max_length=20, blank=True)
+    description = models.TextField(blank=True, null=True)
+    provinces = models.ManyToManyField(Province, blank=True, related_name='search_entries')
+    facilities = models.ManyToManyField(Facility, blank=True, related_name='search_entries')
+    # Kolom filter turunan dari relasi di atas, lihat bitmask.py
+    province_mask = models.BigIntegerField(default=0)
+    facility_mask = models.BigIntegerField(default=0)
+    # JSON hasil search_courts untuk court ini (tanpa is_bookmarked/distance), disusun saat sync
+    document = models.TextField(default='{}')
+    is_active = models.BooleanField(default=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    objects = SearchEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Court search entries"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_id'], name='unique_search_entry_source'),
+        ]
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['is_active', 'name']),
+            # Catch-up spatial index di worker lain, lihat spatial.py
+            models.Index(fields=['synced_at']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class BookmarkQuerySet(models.QuerySet):
+
+    def toggle(self, user_id, court_id):
+        """
+        Remove the user's bookmark on an active court if it exists, otherwise add
+        it, atomically: one statement on PostgreSQL, one transaction elsewhere.
+        Racing toggles of the same pair never hit the unique constraint.
+        Raw SQL, so no model signals: callers update the bookmark caches.
+        Returns: True (now bookmarked), False (removed), None (court missing or inactive)
+        """
+        db = router.db_for_write(self.model)
+        connection = connections[db]
+        table = self.model._meta.db_table
+        court_table = Court._meta.db_table
+        court_pk = Court._meta.pk.get_db_prep_value(court_id, connection)
+        created_at = self.model._meta.get_field('created_at').get_db_prep_value(timezone.now(), connection)
+        active_court = f'SELECT id FROM {court_table} WHERE id = %s AND is_active'
+        delete = f'DELETE FROM {table} WHERE user_id = %s AND court_id IN ({active_court})'
+        insert = (
+            f'INSERT INTO {table} (user_id, court_id, created_at) '
+            f'SELECT %s, id, %s FROM {court_table} WHERE id = %s AND is_active'
+        )
+
+        if connection.vendor == 'postgresql':
+            sql = (
+                f'WITH deleted AS ({delete} RETURNING 1), '
+                f'inserted AS ({insert} AND NOT EXISTS (SELECT 1 FROM deleted) '
+                f'ON CONFLICT (user_id, court_id) DO NOTHING RETURNING 1) '
+                f'SELECT EXISTS (SELECT 1 FROM deleted), EXISTS ({active_court})'
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [user_id, court_pk, user_id, created_at, court_pk, court_pk])
+                deleted, court_exists = cursor.fetchone()
+            # Tidak terhapus tapi court ada: sekarang (atau sudah, karena tap lain) ter-bookmark
+            return None if not court_exists else not deleted
+
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute(delete, [user_id, court_pk])
+            if cursor.rowcount:
+                return False
+            cursor.execute(
+                f'{insert} ON CONFLICT (user_id, court_id) DO NOTHING', [user_id, created_at, court_pk]
+            )
+            if cursor.rowcount:
+                return True
+            cursor.execute(active_court, [court_pk])
+            return True if cursor.fetchone() else None
+
+    def remove_many(self, user_id, court_ids):
+        """
+        Delete the user's bookmarks on these courts in one statement, without
+        per-row signals (callers update the bookmark caches).
+        Returns: number of bookmarks deleted
+        """
+        court_ids = list(court_ids)
+        if not court_ids:
+            return 0
+        db = router.db_for_write(self.model)
+        connection = connections[db]
+        court_field = self.model._meta.get_field('court')
+        placeholders = ', '.join(['%s'] * len(court_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.model._meta.db_table} WHERE user_id = %s AND court_id IN ({placeholders})',
+                [user_id, *(court_field.get_db_prep_value(pk, connection) for pk in court_ids)],
+            )
+            return cursor.rowcount
+
 
 class Bookmark(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='court_bookmarks')
     court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name='bookmarked_by')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = BookmarkQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'court')
         ordering = ['-created_at']
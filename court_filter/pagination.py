@@ -0,0 +1,88 @@
+"""
+Keyset (cursor) pagination helpers.
+
+The cursor is the sort key of the last row of a page, so the next page is a
+plain indexed range query instead of an OFFSET that re-reads every earlier row.
+"""
+import base64
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _cursor_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    payload = json.dumps([_cursor_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _is_kind(value, kind):
+    if kind is float:
+        # int juga angka, bool bukan; NaN/Infinity tidak bisa dibandingkan dengan benar
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+    return isinstance(value, kind)
+
+
+def decode_cursor(cursor, length, kinds=None):
+    """
+    kinds: optional expected type per value (float for any finite number), so a
+    forged cursor fails here instead of in a comparison or the database
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Cursor tidak valid')
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor('Cursor tidak valid')
+    if kinds is not None and not all(_is_kind(value, kind) for value, kind in zip(values, kinds)):
+        raise InvalidCursor('Cursor tidak valid')
+    return values
+
+
+def keyset_q(fields, values, descending=False):
+    """
+    Q for rows strictly after (values) in (fields) order, e.g. for two fields:
+    a > x OR (a = x AND b > y)
+    """
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i in range(len(fields) - 1, -1, -1):
+        step = Q(**{f'{fields[i]}__{lookup}': values[i]})
+        if i < len(fields) - 1:
+            step |= Q(**{fields[i]: values[i]}) & condition
+        condition = step
+    return condition
+
+
+def keyset_page(queryset, fields, cursor=None, page_size=50, descending=False, kinds=None):
+    """
+    One page of `queryset` ordered by `fields` (the last field must be unique).
+    kinds: expected cursor value types, see decode_cursor
+    Returns: (rows, next_cursor); next_cursor is None on the last page
+    """
+    if cursor:
+        queryset = queryset.filter(keyset_q(fields, decode_cursor(cursor, len(fields), kinds), descending))
+    prefix = '-' if descending else ''
+    queryset = queryset.order_by(*[prefix + field for field in fields])
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor([getattr(rows[-1], field) for field in fields])
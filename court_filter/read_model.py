@@ -0,0 +1,253 @@
+"""
+Search read model: CourtSearchEntry rows built from both court tables.
+
+court_filter.Court (imported/seeded courts) and manage_court.Court (courts added
+by their owners) are copied into one table, with provinces and facilities mapped
+by name onto the court_filter Province/Facility tables, so search never has to
+look at two schemas. signals.py resyncs single courts as they change; bulk writes
+that skip signals (seed_courts, geocode_courts) call sync_courts() themselves.
+
+Each entry also stores its search result as ready-made JSON (`document`) and its
+provinces/facilities as bitmasks, so search can filter on plain columns and
+write the stored documents straight into the response.
+"""
+import json
+import uuid
+
+from django.urls import reverse
+from django.utils import timezone
+
+from manage_court.models import Court as ManagedCourt
+
+from . import fulltext
+from .bitmask import mask
+from .bulk import chunks, ensure_named, sync_through
+from .models import Court, CourtSearchEntry, Province, Facility
+from .search_cache import invalidate_search
+from .spatial import court_index
+
+COURT_FILTER = CourtSearchEntry.SOURCE_COURT_FILTER
+MANAGE_COURT = CourtSearchEntry.SOURCE_MANAGE_COURT
+
+# Jangan diubah: id entry manage_court diturunkan dari namespace ini (juga dipakai migrasi 0003)
+ENTRY_NAMESPACE = uuid.UUID('8a4c2f0e-5b1d-4e8f-9c3a-2d6b7e1f0a95')
+
+# Lebih dari ini, spatial index dibangun ulang saja daripada di-update satu per satu
+INDEX_UPDATE_LIMIT = 50
+
+ENTRY_FIELDS = [
+    'source', 'source_id', 'name', 'address', 'latitude', 'longitude', 'court_type',
+    'location_type', 'price_per_hour', 'phone_number', 'description', 'is_active',
+    'province_mask', 'facility_mask', 'document',
+]
+
+
+def entry_id(source, source_id):
+    if source == COURT_FILTER:
+        return uuid.UUID(str(source_id))
+    return uuid.uuid5(ENTRY_NAMESPACE, f'{source}:{source_id}')
+
+
+def detail_url(source, source_id):
+    if source == MANAGE_COURT:
+        return reverse('manage_court:court_detail', args=[int(source_id)])
+    return reverse('court_filter:court_detail_by_id', args=[source_id])
+
+
+def _number(value):
+    return float(value) if value is not None else None
+
+
+def build_document(pk, fields, provinces, facilities):
+    """
+    JSON text of one court as search_courts returns it, minus the per-request
+    `is_bookmarked` and `distance` (appended by the view).
+    provinces: [Province], facilities: [Facility]
+    """
+    return json.dumps({
+        'id': str(pk),
+        'source': fields['source'],
+        'detail_url': detail_url(fields['source'], fields['source_id']),
+        'name': fields['name'],
+        'address': fields['address'],
+        'court_type': fields['court_type'],
+        'location_type': fields['location_type'],
+        'latitude': _number(fields['latitude']),
+        'longitude': _number(fields['longitude']),
+        'price_per_hour': _number(fields['price_per_hour']),
+        'phone_number': fields['phone_number'],
+        'description': fields['description'],
+        'provinces': [{'id': p.id, 'name': p.name} for p in sorted(provinces, key=lambda p: p.name)],
+        'facilities': sorted(f.name for f in facilities),
+    }, ensure_ascii=False, separators=(',', ':'))
+
+
+def _court_filter_rows(ids):
+    courts = Court.objects.filter(pk__in=ids).prefetch_related('provinces', 'facilities')
+    for court in courts:
+        fields = {
+            'source': COURT_FILTER,
+            'source_id': str(court.pk),
+            'name': court.name,
+            'address': court.address,
+            'latitude': court.latitude,
+            'longitude': court.longitude,
+            'court_type': court.court_type,
+            'location_type': court.location_type,
+            'price_per_hour': court.price_per_hour,
+            'phone_number': court.phone_number,
+            'description': court.description,
+            'is_active': court.is_active,
+        }
+        yield (
+            court.pk, fields,
+            [province.name for province in court.provinces.all()],
+            [facility.name for facility in court.facilities.all()],
+        )
+
+
+def _manage_court_rows(ids):
+    courts = ManagedCourt.objects.filter(pk__in=ids).select_related('province').prefetch_related('facilities')
+    for court in courts:
+        fields = {
+            'source': MANAGE_COURT,
+            'source_id': str(court.pk),
+            'name': court.name,
+            'address': court.address,
+            'latitude': court.latitude,
+            'longitude': court.longitude,
+            'court_type': court.court_type,
+            'location_type': '',  # manage_court tidak punya indoor/outdoor
+            'price_per_hour': court.price_per_hour,
+            'phone_number': court.phone_number,
+            'description': court.description,
+            'is_active': True,
+        }
+        yield (
+            court.pk, fields,
+            [court.province.name] if court.province_id else [],
+            [facility.name for facility in court.facilities.all()],
+        )
+
+
+LOADERS = {
+    COURT_FILTER: (Court, _court_filter_rows),
+    MANAGE_COURT: (ManagedCourt, _manage_court_rows),
+}
+
+
+def sync_courts(source, ids, batch_size=500):
+    """
+    Bring the entries of these source courts in line with the source table:
+    new and changed courts are written, entries of deleted courts removed.
+    Does not touch the caches, see refresh_search().
+    Returns: (written entries, removed entry ids)
+    """
+    _, load = LOADERS[source]
+    written, removed = [], []
+    now = timezone.now()
+
+    for chunk in chunks(set(ids), batch_size):
+        rows = {}
+        for source_pk, fields, provinces, facilities in load(chunk):
+            rows[entry_id(source, source_pk)] = (fields, provinces, facilities)
+
+        gone = [entry_id(source, pk) for pk in chunk if entry_id(source, pk) not in rows]
+        if gone and CourtSearchEntry.objects.filter(id__in=gone).delete()[0]:
+            removed.extend(gone)
+
+        province_map = ensure_named(Province, {name for _, names, _ in rows.values() for name in names})
+        facility_map = ensure_named(Facility, {name for _, _, names in rows.values() for name in names})
+        links = {}
+        for pk, (fields, province_names, facility_names) in rows.items():
+            provinces = [province_map[name] for name in set(province_names)]
+            facilities = [facility_map[name] for name in set(facility_names)]
+            fields['province_mask'] = mask(p.pk for p in provinces)
+            fields['facility_mask'] = mask(f.pk for f in facilities)
+            fields['document'] = build_document(pk, fields, provinces, facilities)
+            links[pk] = ({p.pk for p in provinces}, {f.pk for f in facilities})
+
+        existing = CourtSearchEntry.objects.in_bulk(list(rows))
+        to_create, to_update = [], []
+        for pk, (fields, _, _) in rows.items():
+            entry = existing.get(pk)
+            if entry is None:
+                entry = CourtSearchEntry(id=pk, **fields)
+                existing[pk] = entry
+                to_create.append(entry)
+            elif any(getattr(entry, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(entry, name, value)
+                entry.synced_at = now
+                to_update.append(entry)
+        CourtSearchEntry.objects.bulk_create(to_create, batch_size=batch_size)
+        CourtSearchEntry.objects.bulk_update(to_update, ENTRY_FIELDS + ['synced_at'], batch_size=batch_size)
+
+        relinked = sync_through(
+            CourtSearchEntry.provinces.through, 'courtsearchentry_id', 'province_id',
+            {pk: province_ids for pk, (province_ids, _) in links.items()}, batch_size,
+        )
+        relinked |= sync_through(
+            CourtSearchEntry.facilities.through, 'courtsearchentry_id', 'facility_id',
+            {pk: facility_ids for pk, (_, facility_ids) in links.items()}, batch_size,
+        )
+
+        changed = {entry.pk for entry in to_create + to_update} | relinked
+        written.extend(existing[pk] for pk in changed)
+
+    return written, removed
+
+
+def refresh_search(written, removed):
+    """Apply a sync_courts() result to the spatial index and the search cache."""
+    if not written and not removed:
+        return
+    if len(written) + len(removed) > INDEX_UPDATE_LIMIT:
+        court_index.invalidate()
+    else:
+        for entry in written:
+            court_index.update(entry.pk, entry.latitude, entry.longitude, entry.is_active)
+        for pk in removed:
+            court_index.remove(pk)
+    invalidate_search()
+
+
+def sync_court(source, pk):
+    """Resync one source court and refresh the caches (used by the signals)."""
+    refresh_search(*sync_courts(source, [pk]))
+
+
+def sync_entries(entries):
+    """Resync the given CourtSearchEntry queryset, e.g. after a province/facility was renamed."""
+    by_source = {}
+    for source, source_id in entries.values_list('source', 'source_id'):
+        by_source.setdefault(source, []).append(source_id)
+    for source, ids in by_source.items():
+        refresh_search(*sync_courts(source, ids))
+
+
+def rebuild_entries(batch_size=500):
+    """
+    Resync every court of both sources and drop entries without a source court.
+    Returns: (entries written, entries removed)
+    """
+    total_written = total_removed = 0
+    for source, (model, _) in LOADERS.items():
+        ids = list(model.objects.values_list('pk', flat=True))
+        written, removed = sync_courts(source, ids, batch_size)
+        total_written += len(written)
+
+        known = {str(pk) for pk in ids}
+        orphans = [
+            pk for pk, source_id in
+            CourtSearchEntry.objects.filter(source=source).values_list('pk', 'source_id').iterator()
+            if source_id not in known
+        ]
+        for chunk in chunks(orphans, batch_size):
+            CourtSearchEntry.objects.filter(pk__in=chunk).delete()
+        total_removed += len(removed) + len(orphans)
+
+    fulltext.rebuild_index()
+    court_index.invalidate()
+    invalidate_search()
+    return total_written, total_removed
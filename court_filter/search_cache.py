@@ -0,0 +1,50 @@
+"""
+Shared cache for search_courts results.
+
+Keys are built from the normalized filter tuple plus version counters, so a
+write never has to find and delete old entries: bumping the version makes
+every old key unreachable and they simply expire.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from .versioning import get_version, bump_version
+
+SEARCH_VERSION = 'court_search'
+SEARCH_CACHE_TIMEOUT = 60 * 10  # 10 minutes
+
+
+def bookmarks_version_name(user_id):
+    return f'bookmarks_{user_id}'
+
+
+def search_cache_key(params, bookmarks_user_id=None):
+    """
+    params: JSON-serializable dict of normalized search parameters
+    bookmarks_user_id: set when results depend on that user's bookmarks
+    """
+    versions = [get_version(SEARCH_VERSION)]
+    if bookmarks_user_id is not None:
+        versions.append(bookmarks_user_id)
+        versions.append(get_version(bookmarks_version_name(bookmarks_user_id)))
+    payload = json.dumps([versions, params], sort_keys=True, default=str)
+    return 'court_search_' + hashlib.sha1(payload.encode()).hexdigest()
+
+
+def get_cached_search(key):
+    return cache.get(key)
+
+
+def set_cached_search(key, value):
+    cache.set(key, value, SEARCH_CACHE_TIMEOUT)
+
+
+def invalidate_search():
+    """Call after any change to courts (or the provinces/facilities they show)."""
+    bump_version(SEARCH_VERSION)
+
+
+def invalidate_user_bookmarks(user_id):
+    bump_version(bookmarks_version_name(user_id))
@@ -0,0 +1,195 @@
+"""
+Bulk, idempotent upsert of court rows (used by load_dummy_data and import_courts).
+
+A row is a dict of Court fields plus optional `provinces` / `facilities` lists
+(model instances or names). Courts are matched to existing ones by osm_id when
+the row has one, otherwise by name: new courts are bulk-created, changed courts
+bulk-updated, and M2M links diffed against the through tables, all in one
+transaction with a handful of queries per batch of rows instead of several per row.
+The search read model (read_model.py) is updated for the courts that changed.
+"""
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from .bulk import chunks, ensure_named, sync_through
+from .conditional import COURTS_VERSION
+from .models import Court, CourtSearchEntry, Province, Facility
+from .read_model import sync_courts
+from .search_cache import invalidate_search
+from .spatial import court_index
+from .versioning import touch_version
+
+SKIP_FIELDS = {'id', 'slug', 'created_at', 'updated_at'}
+
+
+@dataclass
+class SeedResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.unchanged
+
+    @property
+    def rows_per_second(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+
+def _court_fields():
+    return {
+        field.attname: field for field in Court._meta.concrete_fields
+        if field.attname not in SKIP_FIELDS
+    }
+
+
+def _clean(field, value):
+    """Value as it will come back from the database, so unchanged rows compare equal."""
+    value = field.to_python(value)
+    if isinstance(field, models.DecimalField) and value is not None:
+        value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+    return value
+
+
+def ensure_provinces(names, batch_size=500):
+    return ensure_named(Province, names, batch_size)
+
+
+def ensure_facilities(names, batch_size=500):
+    return ensure_named(Facility, names, batch_size)
+
+
+def _names(items):
+    return [item.name if hasattr(item, 'name') else str(item) for item in items]
+
+
+def _row_key(row):
+    # Baris dengan osm_id dikenali lewat osm_id, sisanya lewat nama
+    if row.get('osm_id'):
+        return 'osm_id', row['osm_id']
+    return 'name', row['name']
+
+
+def _match_existing(by_key, batch_size):
+    """
+    Returns: {row_key: Court} for rows that already exist. Rows with an osm_id match on
+    osm_id first, then adopt a court of the same name that has no osm_id yet.
+    """
+    matched = {}
+    osm_ids = [value for kind, value in by_key if kind == 'osm_id']
+    for ids in chunks(osm_ids, batch_size):
+        for court in Court.objects.filter(osm_id__in=ids):
+            matched[('osm_id', court.osm_id)] = court
+
+    unmatched = [key for key in by_key if key not in matched]
+    names = {by_key[key][0]['name'] for key in unmatched}
+    by_name = {}
+    for chunk in chunks(names, batch_size):
+        # Kalau ada nama kembar di database, yang paling lama yang di-update
+        for court in Court.objects.filter(name__in=chunk).order_by('created_at', 'pk'):
+            by_name.setdefault(court.name, []).append(court)
+
+    claimed = {court.pk for court in matched.values()}
+    for key in unmatched:
+        kind, _ = key
+        for court in by_name.get(by_key[key][0]['name'], []):
+            if court.pk in claimed or (kind == 'osm_id' and court.osm_id):
+                continue
+            matched[key] = court
+            claimed.add(court.pk)
+            break
+    return matched
+
+
+def seed_courts(rows, batch_size=500):
+    """
+    Upsert court rows (by osm_id when present, otherwise by name) in bulk
+    Returns: SeedResult
+    """
+    start = time.perf_counter()
+    fields = _court_fields()
+
+    # Key yang sama muncul lebih dari sekali: baris terakhir yang dipakai, sama seperti update_or_create berurutan
+    by_key = {}
+    for row in rows:
+        row = dict(row)
+        provinces = _names(row.pop('provinces', []))
+        facilities = _names(row.pop('facilities', []))
+        unknown = set(row) - fields.keys()
+        if unknown:
+            raise ValueError(f'Unknown court fields for {row.get("name")!r}: {", ".join(sorted(unknown))}')
+        row = {name: _clean(fields[name], value) for name, value in row.items()}
+        if 'osm_id' in row:
+            row['osm_id'] = row['osm_id'] or None
+        by_key[_row_key(row)] = (row, provinces, facilities)
+
+    result = SeedResult()
+    with transaction.atomic():
+        province_map = ensure_provinces(
+            {name for _, provinces, _ in by_key.values() for name in provinces}, batch_size
+        )
+        facility_map = ensure_facilities(
+            {name for _, _, facilities in by_key.values() for name in facilities}, batch_size
+        )
+
+        existing = _match_existing(by_key, batch_size)
+
+        to_create, to_update = [], []
+        now = timezone.now()
+        for key, (row, _, _) in by_key.items():
+            court = existing.get(key)
+            if court is None:
+                court = Court(**row)
+                court.slug = Court.make_slug(court.name, court.pk)
+                to_create.append(court)
+                existing[key] = court
+                continue
+            changed = [field for field, value in row.items() if getattr(court, field) != value]
+            if changed:
+                for field in changed:
+                    setattr(court, field, row[field])
+                court.updated_at = now
+                to_update.append(court)
+
+        Court.objects.bulk_create(to_create, batch_size=batch_size)
+        if to_update:
+            Court.objects.bulk_update(to_update, list(fields) + ['updated_at'], batch_size=batch_size)
+
+        desired_provinces = {
+            existing[key].pk: {province_map[p].pk for p in provinces}
+            for key, (_, provinces, _) in by_key.items()
+        }
+        desired_facilities = {
+            existing[key].pk: {facility_map[f].pk for f in facilities}
+            for key, (_, _, facilities) in by_key.items()
+        }
+        touched = {court.pk for court in to_create + to_update}
+        touched |= sync_through(
+            Court.provinces.through, 'court_id', 'province_id', desired_provinces, batch_size
+        )
+        touched |= sync_through(
+            Court.facilities.through, 'court_id', 'facility_id', desired_facilities, batch_size
+        )
+
+        if touched:
+            # bulk_create/bulk_update tidak mengirim signal, jadi read model & cache diurus manual
+            sync_courts(CourtSearchEntry.SOURCE_COURT_FILTER, touched, batch_size)
+            transaction.on_commit(_invalidate_caches)
+
+    result.created = len(to_create)
+    result.updated = len(to_update)
+    result.unchanged = len(by_key) - result.created - result.updated
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _invalidate_caches():
+    court_index.invalidate()
+    invalidate_search()
+    touch_version(COURTS_VERSION)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Court, Bookmark, Province
+from .bookmark_cache import get_bookmarked_ids
+from .models import Court, Province
 
 class ProvinceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -22,9 +23,12 @@ class CourtSerializer(serializers.ModelSerializer):
         ]
 
     def get_is_bookmarked(self, obj):
+        bookmarked_ids = self.context.get('bookmarked_ids')
+        if bookmarked_ids is not None:
+            return obj.id in bookmarked_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return Bookmark.objects.filter(user=request.user, court=obj).exists()
+            return obj.id in get_bookmarked_ids(request.user.pk)
         return False
 
     def get_distance(self, obj):
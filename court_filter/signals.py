@@ -0,0 +1,130 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from manage_court import models as manage_models
+
+from .bookmark_cache import bookmarks_changed
+from .conditional import COURTS_VERSION, touch_court, user_version_name
+from .models import Court, CourtSearchEntry, Bookmark, Province, Facility
+from .read_model import COURT_FILTER, MANAGE_COURT, sync_court, sync_courts, sync_entries, refresh_search
+from .search_cache import invalidate_search
+from .versioning import model_version_name, touch_version
+
+
+@receiver(post_save, sender=Court)
+@receiver(post_delete, sender=Court)
+def sync_court_filter_entry(sender, instance, **kwargs):
+    """
+    Keep the court's search entry (and through it the spatial index and search cache) in step.
+    """
+    sync_court(COURT_FILTER, instance.pk)
+    touch_court(instance)
+
+
+@receiver(post_save, sender=manage_models.Court)
+@receiver(post_delete, sender=manage_models.Court)
+def sync_managed_court_entry(sender, instance, **kwargs):
+    sync_court(MANAGE_COURT, instance.pk)
+
+
+@receiver(m2m_changed, sender=Court.provinces.through)
+@receiver(m2m_changed, sender=Court.facilities.through)
+@receiver(m2m_changed, sender=manage_models.Court.facilities.through)
+def sync_entry_relations(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # clear() dari sisi province/facility tidak mengirim pk_set, jadi catat court-nya dulu
+        instance._cleared_court_ids = list(
+            sender.objects.filter(**{f'{instance._meta.model_name}_id': instance.pk})
+            .values_list('court_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    court_model = model if reverse else type(instance)
+    source = MANAGE_COURT if court_model is manage_models.Court else COURT_FILTER
+    if not reverse:
+        sync_court(source, instance.pk)
+        if source == COURT_FILTER:
+            touch_court(instance)
+        return
+    court_ids = pk_set if action != 'post_clear' else getattr(instance, '_cleared_court_ids', [])
+    if court_ids:
+        refresh_search(*sync_courts(source, court_ids))
+        if source == COURT_FILTER:
+            touch_version(COURTS_VERSION)
+
+
+@receiver(pre_delete, sender=manage_models.Province)
+@receiver(pre_delete, sender=manage_models.Facility)
+def remember_managed_courts(sender, instance, **kwargs):
+    # Setelah delete relasinya sudah hilang (SET_NULL / through terhapus tanpa signal)
+    instance._search_court_ids = list(_managed_courts(instance).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=manage_models.Province)
+@receiver(post_save, sender=manage_models.Facility)
+@receiver(post_delete, sender=manage_models.Province)
+@receiver(post_delete, sender=manage_models.Facility)
+def sync_managed_courts_of(sender, instance, **kwargs):
+    """A renamed or deleted manage_court province/facility changes the names on its courts' entries."""
+    court_ids = getattr(instance, '_search_court_ids', None)
+    if court_ids is None:
+        court_ids = list(_managed_courts(instance).values_list('pk', flat=True))
+    if court_ids:
+        refresh_search(*sync_courts(MANAGE_COURT, court_ids))
+
+
+def _managed_courts(instance):
+    if isinstance(instance, manage_models.Province):
+        return instance.courts.all()
+    return instance.court_set.all()
+
+
+@receiver(pre_delete, sender=Province)
+@receiver(pre_delete, sender=Facility)
+def remember_search_entries(sender, instance, **kwargs):
+    instance._search_entry_ids = list(instance.search_entries.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Province)
+@receiver(post_delete, sender=Province)
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def sync_entries_of(sender, instance, created=False, **kwargs):
+    """Stored search documents carry province/facility names, so rebuild the affected ones."""
+    if created:
+        return
+    entry_ids = getattr(instance, '_search_entry_ids', None)
+    if entry_ids is None:
+        entry_ids = list(instance.search_entries.values_list('pk', flat=True))
+    sync_entries(CourtSearchEntry.objects.filter(pk__in=entry_ids))
+    invalidate_search()
+
+
+@receiver(post_save, sender=Province)
+@receiver(post_delete, sender=Province)
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+@receiver(post_save, sender=manage_models.Province)
+@receiver(post_delete, sender=manage_models.Province)
+@receiver(post_save, sender=manage_models.Facility)
+@receiver(post_delete, sender=manage_models.Facility)
+def touch_catalog_version(sender, **kwargs):
+    """ETag get_provinces / get_court_constants / halaman detail, lihat conditional.py"""
+    touch_version(model_version_name(sender))
+
+
+@receiver(post_save, sender=Bookmark)
+@receiver(post_delete, sender=Bookmark)
+def bookmark_changed(sender, instance, **kwargs):
+    # Setelah commit, supaya set yang dimuat ulang sudah berisi perubahan ini
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bookmarks_changed(user_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    # Halaman per_user (navbar: nama dan foto) tidak boleh 304 dengan data user yang lama
+    touch_version(user_version_name(instance.pk))
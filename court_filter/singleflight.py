@@ -0,0 +1,75 @@
+"""
+Coalesce concurrent calls for the same key into a single execution.
+
+The first thread to ask for a key runs the function; every thread that asks for
+the same key while it is still running waits and gets the same result (or the
+same exception) instead of doing the work again.
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Run fn() once for all concurrent callers of the same key
+        Returns: fn's result, shared with every caller that joined the flight
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines: callers awaiting the same key on the same
+    event loop share one task.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, coro_fn):
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get((id(loop), key))
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(coro_fn())
+            self._tasks[(id(loop), key)] = task
+            task.add_done_callback(lambda _: self._tasks.pop((id(loop), key), None))
+        # shield: satu pemanggil yang dibatalkan tidak membatalkan yang lain
+        return await asyncio.shield(task)
@@ -0,0 +1,282 @@
+"""
+In-memory spatial index over court coordinates.
+
+Courts are bucketed into a uniform lat/lon grid so a radius query only has to
+look at the handful of cells that overlap the search circle instead of every
+court in the database.
+"""
+import heapq
+import threading
+from datetime import timedelta
+from math import asin, cos, floor, radians, sin
+
+from django.db import transaction
+from django.utils import timezone
+
+from .geodistance import EARTH_RADIUS_KM, haversine_many
+from .utils import haversine_distance, bounding_box
+from .versioning import get_version, bump_version, touch_version
+
+INDEX_VERSION = 'court_spatial_index'  # naik: semua worker membangun ulang (bulk write)
+CHANGES_VERSION = 'court_spatial_changes'  # naik: ada entry yang disimpan, cukup catch-up
+# Catch-up membaca ulang entry yang synced_at-nya sejak catch-up sebelumnya dikurangi ini
+# (selisih jam antar worker, transaksi yang commit belakangan)
+CATCH_UP_SLACK = timedelta(seconds=60)
+# Catch-up juga jalan setelah selang ini tanpa menunggu versi berubah
+CATCH_UP_INTERVAL = timedelta(seconds=30)
+DEFAULT_CELL_SIZE = 0.1  # degrees, roughly 11 km at the equator
+
+
+class GeoGridIndex:
+    """
+    Grid of (row, col) cells, each holding {court_id: (lat, lon)}
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, court_id):
+        return court_id in self._points
+
+    def _cell(self, lat, lon):
+        return floor(lat / self.cell_size), floor(lon / self.cell_size)
+
+    def insert(self, court_id, latitude, longitude):
+        lat, lon = float(latitude), float(longitude)
+        self.remove(court_id)
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, {})[court_id] = (lat, lon)
+        self._points[court_id] = cell
+
+    def remove(self, court_id):
+        cell = self._points.pop(court_id, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[court_id]
+        if not bucket:
+            del self._cells[cell]
+
+    def candidates(self, latitude, longitude, radius_km):
+        """
+        IDs of every court in a cell overlapping the search circle's bounding box.
+        A superset of the real answer, so callers still need an exact distance check.
+        """
+        for _, bucket in self._cells_in_box(latitude, longitude, radius_km):
+            yield from bucket
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """
+        Returns: [(court_id, distance_km), ...] sorted by distance
+        """
+        lat, lon = float(latitude), float(longitude)
+        results = []
+        for _, bucket in self._cells_in_box(lat, lon, radius_km):
+            for court_id, (court_lat, court_lon) in bucket.items():
+                distance = haversine_distance(lat, lon, court_lat, court_lon)
+                if distance <= radius_km:
+                    results.append((court_id, distance))
+        results.sort(key=lambda item: item[1])
+        return results
+
+    def iter_nearest(self, latitude, longitude):
+        """
+        Yield (court_id, distance_km) nearest first, scanning rings of cells outward
+        from the origin's cell and only releasing a court once no unscanned cell
+        could hold anything closer.
+        """
+        if not self._cells:
+            return
+        lat, lon = float(latitude), float(longitude)
+        origin_row, origin_col = self._cell(lat, lon)
+        last_ring = max(
+            max(abs(row - origin_row), abs(col - origin_col)) for row, col in self._cells
+        )
+
+        heap = []
+        for ring in range(last_ring + 1):
+            ids, lats, lons = [], [], []
+            for cell in self._ring_cells(origin_row, origin_col, ring):
+                bucket = self._cells.get(cell)
+                if bucket:
+                    for court_id, (court_lat, court_lon) in bucket.items():
+                        ids.append(court_id)
+                        lats.append(court_lat)
+                        lons.append(court_lon)
+            if ids:
+                for court_id, distance in zip(ids, haversine_many(lat, lon, lats, lons).tolist()):
+                    heapq.heappush(heap, (distance, str(court_id), court_id))
+
+            clearance = self._ring_clearance_km(lat, lon, origin_row, origin_col, ring)
+            while heap and heap[0][0] <= clearance:
+                distance, _, court_id = heapq.heappop(heap)
+                yield court_id, distance
+
+        while heap:
+            distance, _, court_id = heapq.heappop(heap)
+            yield court_id, distance
+
+    def nearest(self, latitude, longitude, k):
+        """
+        Returns: the k closest [(court_id, distance_km), ...], nearest first
+        """
+        results = []
+        for item in self.iter_nearest(latitude, longitude):
+            if len(results) >= k:
+                break
+            results.append(item)
+        return results
+
+    @staticmethod
+    def _ring_cells(origin_row, origin_col, ring):
+        if ring == 0:
+            yield origin_row, origin_col
+            return
+        for col in range(origin_col - ring, origin_col + ring + 1):
+            yield origin_row - ring, col
+            yield origin_row + ring, col
+        for row in range(origin_row - ring + 1, origin_row + ring):
+            yield row, origin_col - ring
+            yield row, origin_col + ring
+
+    def _ring_clearance_km(self, lat, lon, origin_row, origin_col, ring):
+        """Shortest distance from the origin to any point outside the rings scanned so far."""
+        size = self.cell_size
+        lat_gap = min(lat - (origin_row - ring) * size, (origin_row + ring + 1) * size - lat)
+        lon_gap = min(lon - (origin_col - ring) * size, (origin_col + ring + 1) * size - lon)
+        lat_km = radians(lat_gap) * EARTH_RADIUS_KM
+        # Great-circle distance from the origin to the meridian lon_gap degrees away
+        lon_km = asin(min(1.0, cos(radians(lat)) * sin(radians(min(lon_gap, 90))))) * EARTH_RADIUS_KM
+        return min(lat_km, lon_km)
+
+    def _cells_in_box(self, latitude, longitude, radius_km):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        min_row, min_col = self._cell(min_lat, min_lon)
+        max_row, max_col = self._cell(max_lat, max_lon)
+
+        # A huge radius covers more cells than there are occupied ones, so just scan those
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+            for (row, col), bucket in self._cells.items():
+                if min_row <= row <= max_row and min_col <= col <= max_col:
+                    yield (row, col), bucket
+            return
+
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                bucket = self._cells.get((row, col))
+                if bucket:
+                    yield (row, col), bucket
+
+
+class CourtSpatialIndex:
+    """
+    Process-wide GeoGridIndex of active courts (CourtSearchEntry ids), loaded
+    lazily from the database.
+
+    Small writes patch the writing worker's grid and touch CHANGES_VERSION; other
+    workers then catch up by re-reading the entries whose synced_at is recent,
+    so the cache counter only has to say "something changed", never which write
+    or how many (the file-based cache has no atomic incr). Catch-up also runs
+    every CATCH_UP_INTERVAL, which covers a touch lost to a racing write.
+    Deleted entries may stay in other workers' grids until their next rebuild;
+    callers check candidates against the database anyway.
+    Bulk writes call invalidate() and every worker rebuilds.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._grid = None
+        self._version = None
+        self._changes = None
+        self._synced_since = None
+        self._lock = threading.RLock()
+
+    def _load_points(self, since=None):
+        from .models import CourtSearchEntry
+
+        entries = CourtSearchEntry.objects.all()
+        if since is None:
+            entries = entries.filter(is_active=True)
+        else:
+            entries = entries.filter(synced_at__gte=since)
+        return entries.values_list('id', 'latitude', 'longitude', 'is_active').iterator()
+
+    def rebuild(self):
+        with self._lock:
+            version = get_version(INDEX_VERSION)
+            changes = get_version(CHANGES_VERSION)
+            started = timezone.now()
+            grid = GeoGridIndex(self.cell_size)
+            for court_id, lat, lon, _ in self._load_points():
+                if lat is not None and lon is not None:
+                    grid.insert(court_id, lat, lon)
+            self._grid = grid
+            self._version = version
+            self._changes = changes
+            self._synced_since = started
+            return grid
+
+    def _catch_up(self, changes):
+        started = timezone.now()
+        for court_id, lat, lon, is_active in self._load_points(self._synced_since - CATCH_UP_SLACK):
+            self._place(court_id, lat, lon, is_active)
+        self._changes = changes
+        self._synced_since = started
+
+    def _current_grid(self):
+        with self._lock:
+            if self._grid is None or self._version != get_version(INDEX_VERSION):
+                return self.rebuild()
+            changes = get_version(CHANGES_VERSION)
+            if changes != self._changes or timezone.now() - self._synced_since > CATCH_UP_INTERVAL:
+                self._catch_up(changes)
+            return self._grid
+
+    def candidates(self, latitude, longitude, radius_km):
+        with self._lock:
+            return list(self._current_grid().candidates(latitude, longitude, radius_km))
+
+    def within_radius(self, latitude, longitude, radius_km):
+        with self._lock:
+            return self._current_grid().within_radius(latitude, longitude, radius_km)
+
+    def nearest(self, latitude, longitude, k):
+        with self._lock:
+            return self._current_grid().nearest(latitude, longitude, k)
+
+    def _place(self, court_id, latitude, longitude, is_active):
+        if is_active and latitude is not None and longitude is not None:
+            self._grid.insert(court_id, latitude, longitude)
+        else:
+            self._grid.remove(court_id)
+
+    def update(self, court_id, latitude, longitude, is_active=True):
+        """Apply a saved court to the local grid; other workers catch up after commit."""
+        with self._lock:
+            if self._grid is not None:
+                self._place(court_id, latitude, longitude, is_active)
+        self._changed()
+
+    def remove(self, court_id):
+        with self._lock:
+            if self._grid is not None:
+                self._grid.remove(court_id)
+        self._changed()
+
+    def _changed(self):
+        # Setelah commit: worker lain yang catch-up lebih awal tidak akan melihat baris yang belum di-commit
+        transaction.on_commit(lambda: touch_version(CHANGES_VERSION))
+
+    def invalidate(self):
+        """Force every worker to rebuild, e.g. after a bulk write that skipped signals."""
+        with self._lock:
+            bump_version(INDEX_VERSION)
+            self._grid = None
+
+
+court_index = CourtSpatialIndex()
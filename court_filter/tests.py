@@ -2,14 +2,42 @@ from django.test import TestCase
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import Court, Bookmark, Province
+from .models import Court, CourtSearchEntry, Bookmark, Province, Facility
+from manage_court import models as manage_models
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import requests
-from court_filter.utils import haversine_distance, is_in_indonesia, geocode_address
+from court_filter.utils import (
+    haversine_distance, is_in_indonesia, geocode_address, geocode_cache_key, normalize_address,
+    bounding_box, GEOCODE_NOT_FOUND, GEOCODE_NEGATIVE_TIMEOUT,
+)
+from court_filter.spatial import GeoGridIndex, court_index
+from court_filter.seeding import seed_courts
+from court_filter.read_model import entry_id
+from court_filter.importing import iter_json_array
+from court_filter.search_cache import bookmarks_version_name, search_cache_key
+from court_filter.versioning import get_version
+from court_filter import fulltext, spatial
+from court_filter.pagination import encode_cursor
+from court_filter.constants_bundle import constants_bundle
+from court_filter.bookmark_cache import get_bookmarked_ids
+from court_filter.views import NOT_BOOKMARKABLE
+from django.core.management import call_command
+from io import StringIO
+from court_filter.gazetteer import Gazetteer, PlaceTrie, get_gazetteer
+from court_filter.geocoding import CircuitBreaker, GeocoderUnavailable, NominatimClient, geocoder
+from court_filter.geodistance import CoordinateArray, haversine_many, haversine_matrix
 import uuid
+import threading
+import json
+import os
+import tempfile
+from asgiref.sync import async_to_sync
 
 User = get_user_model()
 
@@ -85,6 +113,9 @@ class CourtFinderViewTests(APITestCase):
         cls.URL_SEARCH = reverse('court_filter:search_courts')
         cls.URL_PROVINCES = reverse('court_filter:get_provinces')
 
+    def setUp(self):
+        cache.clear()
+
     
     def test_court_finder_view_anonymous(self):
         """Tes halaman utama finder (GET) sebagai anonymous."""
@@ -137,27 +168,19 @@ class CourtFinderViewTests(APITestCase):
         self.assertIn('Alamat harus diisi', response.data['error'])
 
     @patch('court_filter.views.is_in_indonesia', return_value=True)
-    @patch('court_filter.views.haversine_distance')
-    def test_search_courts_success_basic(self, mock_haversine, mock_is_in_indo):
+    def test_search_courts_success_basic(self, mock_is_in_indo):
         """Tes pencarian dasar (POST) di Jakarta, radius 10km."""
-        
-        def side_effect(lat1, lon1, lat2, lon2):
-            if lat2 == self.court_jakarta_1.latitude: return 2.5
-            if lat2 == self.court_jakarta_2.latitude: return 1.5
-            # Cek lapangan bekasi (di luar radius 10km)
-            if lat2 == self.court_tennis_bekasi.latitude: return 30.0 
-            return 1000
-        mock_haversine.side_effect = side_effect
+        # Jakarta 2 ~4 km, Jakarta 1 ~5 km, Bekasi ~15 km (di luar radius)
 
         response = self.client.post(self.URL_SEARCH, self.jakarta_coords)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.json()['count'], 2)
         
-        self.assertEqual(response.data['courts'][0]['name'], self.court_jakarta_2.name)
-        self.assertEqual(response.data['courts'][1]['name'], self.court_jakarta_1.name)
+        self.assertEqual(response.json()['courts'][0]['name'], self.court_jakarta_2.name)
+        self.assertEqual(response.json()['courts'][1]['name'], self.court_jakarta_1.name)
         
-        for court in response.data['courts']:
+        for court in response.json()['courts']:
             self.assertNotEqual(court['name'], self.court_inactive.name)
 
     def test_search_courts_no_coords(self):
@@ -176,8 +199,7 @@ class CourtFinderViewTests(APITestCase):
         self.assertIn('Lokasi harus berada di Indonesia', response.data['error'])
 
     @patch('court_filter.views.is_in_indonesia', return_value=True)
-    @patch('court_filter.views.haversine_distance', return_value=1.0)
-    def test_search_courts_filter_province(self, mock_haversine, mock_is_in_indo):
+    def test_search_courts_filter_province(self, mock_is_in_indo):
         """Tes pencarian (POST) dengan filter provinsi."""
         data = {
             **self.jakarta_coords,
@@ -186,29 +208,26 @@ class CourtFinderViewTests(APITestCase):
         response = self.client.post(self.URL_SEARCH, data)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.json()['count'], 1)
         # Cek lapangan bekasi
-        self.assertEqual(response.data['courts'][0]['name'], self.court_tennis_bekasi.name)
+        self.assertEqual(response.json()['courts'][0]['name'], self.court_tennis_bekasi.name)
 
     @patch('court_filter.views.is_in_indonesia', return_value=True)
-    @patch('court_filter.views.haversine_distance', return_value=1.0)
-    def test_search_courts_filter_price(self, mock_haversine, mock_is_in_indo):
+    def test_search_courts_filter_price(self, mock_is_in_indo):
         """Tes pencarian (POST) dengan filter harga."""
         data = {
             **self.jakarta_coords,
-            'price_max': '200000'  # Maks 200rb (Jkt 1 & Bekasi)
+            'price_max': '200000'  # Maks 200rb (Jkt 1 & Bekasi, tapi Bekasi di luar 10km)
         }
         response = self.client.post(self.URL_SEARCH, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 2)
-        names = {c['name'] for c in response.data['courts']}
+        self.assertEqual(response.json()['count'], 1)
+        names = {c['name'] for c in response.json()['courts']}
         self.assertIn(self.court_jakarta_1.name, names)
-        # Cek lapangan bekasi
-        self.assertIn(self.court_tennis_bekasi.name, names)
+        self.assertNotIn(self.court_jakarta_2.name, names)
 
     @patch('court_filter.views.is_in_indonesia', return_value=True)
-    @patch('court_filter.views.haversine_distance', return_value=1.0)
-    def test_search_courts_filter_court_type(self, mock_haversine, mock_is_in_indo):
+    def test_search_courts_filter_court_type(self, mock_is_in_indo):
         """Tes pencarian (POST) dengan filter jenis lapangan."""
         data = {
             **self.jakarta_coords,
@@ -216,12 +235,11 @@ class CourtFinderViewTests(APITestCase):
         }
         response = self.client.post(self.URL_SEARCH, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 1)
-        self.assertEqual(response.data['courts'][0]['name'], self.court_jakarta_2.name)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(response.json()['courts'][0]['name'], self.court_jakarta_2.name)
 
     @patch('court_filter.views.is_in_indonesia', return_value=True)
-    @patch('court_filter.views.haversine_distance', return_value=1.0)
-    def test_search_courts_filter_bookmarked_authenticated(self, mock_haversine, mock_is_in_indo):
+    def test_search_courts_filter_bookmarked_authenticated(self, mock_is_in_indo):
         """Tes pencarian (POST) filter bookmark (user login)."""
         self.client.force_login(self.user)
         data = {
@@ -230,12 +248,11 @@ class CourtFinderViewTests(APITestCase):
         }
         response = self.client.post(self.URL_SEARCH, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 1)
-        self.assertEqual(response.data['courts'][0]['name'], self.court_jakarta_1.name)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(response.json()['courts'][0]['name'], self.court_jakarta_1.name)
 
     @patch('court_filter.views.is_in_indonesia', return_value=True)
-    @patch('court_filter.views.haversine_distance', return_value=1.0)
-    def test_search_courts_filter_bookmarked_anonymous(self, mock_haversine, mock_is_in_indo):
+    def test_search_courts_filter_bookmarked_anonymous(self, mock_is_in_indo):
         """Tes pencarian (POST) filter bookmark (anonymous), harus diabaikan."""
         data = {
             **self.jakarta_coords,
@@ -245,7 +262,301 @@ class CourtFinderViewTests(APITestCase):
         response = self.client.post(self.URL_SEARCH, data) 
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['count'], 3)
+        # Semua lapangan dalam 10km, bukan hanya yang di-bookmark
+        self.assertEqual(response.json()['count'], 2)
+
+    def _count_search_queries(self, data):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.URL_SEARCH, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response.json()['count']
+
+    def test_search_courts_query_count_constant(self):
+        """Tes jumlah query search tidak bertambah seiring jumlah hasil (tanpa N+1)."""
+        self.client.force_login(self.user)
+        for court in (self.court_jakarta_1, self.court_jakarta_2, self.court_tennis_bekasi):
+            court.facilities.create(name=f'Fasilitas {court.name}')
+        get_bookmarked_ids(self.user.pk)  # set bookmark sudah ada di cache, seperti setelah search pertama
+
+        few_queries, few_count = self._count_search_queries({'court_types': ['tennis']})
+        self.assertEqual(few_count, 1)
+
+        for i in range(10):
+            court = Court.objects.create(
+                name=f'Lapangan Tambahan {i}', latitude=Decimal('-6.2050'), longitude=Decimal('106.8050'),
+                price_per_hour=Decimal('100000'), court_type='futsal',
+            )
+            court.provinces.add(self.prov_jakarta)
+            Bookmark.objects.create(user=self.user, court=court)
+
+        many_queries, many_count = self._count_search_queries({})
+        self.assertEqual(many_count, 13)
+        self.assertEqual(many_queries, few_queries)
+
+        radius_queries, radius_count = self._count_search_queries(self.jakarta_coords)
+        self.assertEqual(radius_count, 12)
+        self.assertEqual(radius_queries, few_queries)
+
+    def test_search_courts_bookmarks_from_cached_set(self):
+        """Tes set bookmark dimuat sekali, lalu dimuat ulang sekali setelah toggle karena versinya berubah."""
+        def bookmark_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.URL_SEARCH, {}, format='json')
+            flags = {c['name']: c['is_bookmarked'] for c in response.json()['courts']}
+            return len([q for q in ctx.captured_queries if 'court_filter_bookmark' in q['sql']]), flags
+
+        self.client.force_login(self.user)
+        self.client.post(self.URL_SEARCH, {}, format='json')
+        self.assertEqual(bookmark_queries()[0], 0)
+
+        url = reverse('court_filter:toggle_bookmark', kwargs={'court_id': self.court_jakarta_2.id})
+        self.client.post(url)
+        queries, flags = bookmark_queries()
+        self.assertEqual(queries, 1)
+        self.assertTrue(flags[self.court_jakarta_2.name])
+        self.assertEqual(bookmark_queries()[0], 0)
+
+        self.client.post(url)
+        self.assertNotIn(self.court_jakarta_2.id, get_bookmarked_ids(self.user.pk))
+        self.assertIn(self.court_jakarta_1.id, get_bookmarked_ids(self.user.pk))
+
+    def test_bookmark_set_with_old_version_is_a_miss(self):
+        """Tes set bookmark di cache yang versinya tertinggal (mis. dimuat saat ada tulisan lain) tidak dipakai."""
+        stale = frozenset([self.court_jakarta_2.id])
+        version = get_version(bookmarks_version_name(self.user.pk))
+        cache.set(f'bookmark_ids_{self.user.pk}', (version - 1, stale))
+        self.assertEqual(get_bookmarked_ids(self.user.pk), frozenset([self.court_jakarta_1.id]))
+
+    def test_search_courts_marks_bookmarks(self):
+        """Tes flag is_bookmarked diambil dari set bookmark user."""
+        self.client.force_login(self.user)
+        response = self.client.post(self.URL_SEARCH, {}, format='json')
+
+        flags = {c['name']: c['is_bookmarked'] for c in response.json()['courts']}
+        self.assertTrue(flags[self.court_jakarta_1.name])
+        self.assertFalse(flags[self.court_jakarta_2.name])
+
+    def test_search_courts_custom_radius(self):
+        """Tes radius dari client (20km mencakup Bekasi)."""
+        response = self.client.post(self.URL_SEARCH, {**self.jakarta_coords, 'radius': 20}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [c['name'] for c in response.json()['courts']]
+        self.assertEqual(names, [self.court_jakarta_2.name, self.court_jakarta_1.name, self.court_tennis_bekasi.name])
+
+    def test_search_courts_invalid_radius(self):
+        """Tes radius di luar batas ditolak (400)."""
+        for radius in ('0', '-5', '1000', 'abc'):
+            response = self.client.post(self.URL_SEARCH, {**self.jakarta_coords, 'radius': radius}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, radius)
+
+    def test_search_courts_k_nearest_without_radius(self):
+        """Tes limit=k tanpa radius mengembalikan k lapangan terdekat walau jauh."""
+        data = {'latitude': -6.2383, 'longitude': 107.5, 'limit': 2}
+        response = self.client.post(self.URL_SEARCH, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [c['name'] for c in response.json()['courts']],
+            [self.court_tennis_bekasi.name, self.court_jakarta_2.name]
+        )
+        self.assertGreater(response.json()['courts'][0]['distance'], 50)
+
+    def test_search_courts_k_nearest_respects_filters(self):
+        """Tes k terdekat tetap memakai filter lain."""
+        data = {**self.jakarta_coords, 'limit': 5, 'court_types': ['basketball']}
+        response = self.client.post(self.URL_SEARCH, data, format='json')
+
+        self.assertEqual([c['name'] for c in response.json()['courts']], [self.court_jakarta_1.name])
+
+    def test_search_courts_k_nearest_falls_back_to_sql(self):
+        """Tes k terdekat dengan filter selektif berhenti menambah kandidat dan mengurutkan jarak di SQL."""
+        data = {'latitude': -6.2383, 'longitude': 107.5, 'limit': 1, 'court_types': ['basketball']}
+        with patch('court_filter.views.MAX_NEAREST_CANDIDATES', 2), \
+                patch.object(court_index, 'nearest', wraps=court_index.nearest) as nearest:
+            response = self.client.post(self.URL_SEARCH, data, format='json')
+
+        self.assertEqual([call.args[2] for call in nearest.call_args_list], [2])
+        courts = response.json()['courts']
+        self.assertEqual([c['name'] for c in courts], [self.court_jakarta_1.name])
+        self.assertGreater(courts[0]['distance'], 50)
+
+    def test_search_courts_cursor_pagination_by_distance(self):
+        """Tes cursor pagination urut jarak."""
+        data = {**self.jakarta_coords, 'radius': 20, 'page_size': 2}
+        first = self.client.post(self.URL_SEARCH, data, format='json').json()
+        self.assertEqual(first['count'], 2)
+        self.assertIsNotNone(first['next_cursor'])
+
+        second = self.client.post(self.URL_SEARCH, {**data, 'cursor': first['next_cursor']}, format='json').json()
+        self.assertEqual([c['name'] for c in second['courts']], [self.court_tennis_bekasi.name])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_search_courts_cursor_pagination_by_name(self):
+        """Tes cursor pagination urut nama (tanpa koordinat dan dengan limit)."""
+        names = []
+        cursor = None
+        while True:
+            data = {'page_size': 1, **({'cursor': cursor} if cursor else {})}
+            page = self.client.post(self.URL_SEARCH, data, format='json').json()
+            names += [c['name'] for c in page['courts']]
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(names, sorted([
+            self.court_jakarta_1.name, self.court_jakarta_2.name, self.court_tennis_bekasi.name
+        ]))
+
+        limited = self.client.post(self.URL_SEARCH, {'limit': 2, 'page_size': 1}, format='json').json()
+        rest = self.client.post(
+            self.URL_SEARCH, {'limit': 2, 'page_size': 1, 'cursor': limited['next_cursor']}, format='json'
+        ).json()
+        self.assertEqual([c['name'] for c in limited['courts'] + rest['courts']], names[:2])
+        self.assertIsNone(rest['next_cursor'])
+
+    def test_search_courts_invalid_cursor(self):
+        """Tes cursor rusak ditolak (400)."""
+        response = self.client.post(self.URL_SEARCH, {'cursor': 'bukan-cursor'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_courts_cursor_with_wrong_types(self):
+        """Tes cursor dengan tipe nilai yang salah ditolak (400) di semua jalur pagination."""
+        searches = [
+            {**self.jakarta_coords, 'limit': 5},  # k terdekat
+            {**self.jakarta_coords, 'radius': 20},  # urut jarak di database
+            {**self.jakarta_coords, 'radius': 20, 'limit': 5},
+            {'q': 'lapangan'},  # urut relevansi
+            {'limit': 5},  # urut nama
+        ]
+        for data in searches:
+            for values in (['a', 'b'], [1, 2], [True, 'b'], [None, 'b']):
+                if 'latitude' not in data and 'q' not in data and isinstance(values[0], str):
+                    continue  # [str, str] memang bentuk cursor urut nama
+                response = self.client.post(
+                    self.URL_SEARCH, {**data, 'cursor': encode_cursor(values)}, format='json'
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, (data, values))
+
+    def test_search_courts_rejects_non_finite_numbers(self):
+        """Tes koordinat dan harga NaN/Infinity ditolak (400)."""
+        for value in ('nan', 'inf', '-Infinity'):
+            response = self.client.post(self.URL_SEARCH, {'latitude': value, 'longitude': 106.8}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, value)
+            response = self.client.post(self.URL_SEARCH, {'price_max': value}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, value)
+
+    def test_search_courts_cached_response(self):
+        """Tes pencarian kedua dengan filter sama diambil dari cache (tanpa query)."""
+        data = {'court_types': ['futsal', 'basketball']}
+        first = self.client.post(self.URL_SEARCH, data, format='json')
+
+        with self.assertNumQueries(0):
+            second = self.client.post(self.URL_SEARCH, {'court_types': ['basketball', 'futsal']}, format='json')
+        self.assertEqual(second.json(), first.json())
+
+    def test_search_courts_cache_invalidated_on_court_change(self):
+        """Tes cache pencarian tidak basi setelah court diubah."""
+        data = {'court_types': ['futsal']}
+        self.client.post(self.URL_SEARCH, data, format='json')
+
+        self.court_jakarta_2.name = 'Lapangan Futsal Senayan Baru'
+        self.court_jakarta_2.save()
+        response = self.client.post(self.URL_SEARCH, data, format='json')
+        self.assertEqual(response.json()['courts'][0]['name'], 'Lapangan Futsal Senayan Baru')
+
+        self.court_jakarta_2.provinces.add(self.prov_jawa_barat)
+        response = self.client.post(self.URL_SEARCH, data, format='json')
+        self.assertEqual(len(response.json()['courts'][0]['provinces']), 2)
+
+    def test_search_courts_cache_invalidated_on_bookmark_change(self):
+        """Tes cache bookmarked_only ikut berubah saat bookmark user berubah."""
+        self.client.force_login(self.user)
+        data = {'bookmarked_only': 'true'}
+        self.assertEqual(self.client.post(self.URL_SEARCH, data, format='json').json()['count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Bookmark.objects.create(user=self.user, court=self.court_jakarta_2)
+        response = self.client.post(self.URL_SEARCH, data, format='json')
+        self.assertEqual(response.json()['count'], 2)
+        self.assertTrue(all(c['is_bookmarked'] for c in response.json()['courts']))
+
+        # User lain (anonymous) tidak ikut melihat flag bookmark dari cache user ini
+        self.client.logout()
+        response = self.client.post(self.URL_SEARCH, {}, format='json')
+        self.assertFalse(any(c['is_bookmarked'] for c in response.json()['courts']))
+
+    def test_bookmark_toggle_is_atomic_primitive(self):
+        """Tes Bookmark.objects.toggle: tambah, hapus, dan court yang tidak aktif/tidak ada."""
+        court = self.court_jakarta_2
+        self.assertIs(Bookmark.objects.toggle(self.user.pk, court.pk), True)
+        self.assertEqual(Bookmark.objects.filter(user=self.user, court=court).count(), 1)
+        self.assertIs(Bookmark.objects.toggle(self.user.pk, court.pk), False)
+        self.assertFalse(Bookmark.objects.filter(user=self.user, court=court).exists())
+
+        court.is_active = False
+        court.save()
+        self.assertIsNone(Bookmark.objects.toggle(self.user.pk, court.pk))
+        self.assertIsNone(Bookmark.objects.toggle(self.user.pk, uuid.uuid4()))
+        self.assertFalse(Bookmark.objects.filter(user=self.user, court=court).exists())
+
+    def test_sync_bookmarks_applies_batch(self):
+        """Tes sync batch: operasi terakhir per court yang dipakai, court tak dikenal dilewati."""
+        self.client.force_login(self.user)
+        unknown = uuid.uuid4()
+        response = self.client.post(reverse('court_filter:sync_bookmarks'), {'operations': [
+            {'court_id': str(self.court_jakarta_2.id), 'action': 'add', 'timestamp': '2030-01-01T10:00:00Z'},
+            {'court_id': str(self.court_jakarta_2.id), 'action': 'remove', 'timestamp': '2020-01-01T09:00:00Z'},
+            {'court_id': str(self.court_tennis_bekasi.id), 'action': 'add'},
+            {'court_id': str(self.court_jakarta_1.id), 'action': 'remove'},
+            {'court_id': str(unknown), 'action': 'add'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = {str(self.court_jakarta_2.id), str(self.court_tennis_bekasi.id)}
+        self.assertEqual(set(response.data['bookmarks']), expected)
+        self.assertEqual((response.data['added'], response.data['removed']), (2, 1))
+        self.assertEqual(response.data['skipped'], [{'court_id': str(unknown), 'reason': 'not_found'}])
+        self.assertEqual(
+            {str(pk) for pk in Bookmark.objects.filter(user=self.user).values_list('court_id', flat=True)}, expected
+        )
+        self.assertEqual({str(pk) for pk in get_bookmarked_ids(self.user.pk)}, expected)
+
+    def test_sync_bookmarks_skips_stale_remove(self):
+        """Tes remove dengan timestamp lebih lama dari bookmark di server tidak dijalankan."""
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('court_filter:sync_bookmarks'), {'operations': [
+            {'court_id': str(self.court_jakarta_1.id), 'action': 'remove', 'timestamp': '2000-01-01T00:00:00'},
+        ]}, format='json')
+
+        self.assertEqual(response.data['skipped'], [{'court_id': str(self.court_jakarta_1.id), 'reason': 'stale'}])
+        self.assertTrue(Bookmark.objects.filter(user=self.user, court=self.court_jakarta_1).exists())
+
+    def test_sync_bookmarks_delta_token(self):
+        """Tes GET dengan sync token: tidak berubah -> changed false, setelah toggle -> set lengkap."""
+        self.client.force_login(self.user)
+        url = reverse('court_filter:sync_bookmarks')
+        token = self.client.post(url, {'operations': []}, format='json').data['sync_token']
+
+        response = self.client.get(url, {'since': token})
+        self.assertEqual(response.data, {'changed': False, 'sync_token': token})
+
+        self.client.post(reverse('court_filter:toggle_bookmark', kwargs={'court_id': self.court_jakarta_2.id}))
+        response = self.client.get(url, {'since': token})
+        self.assertTrue(response.data['changed'])
+        self.assertNotEqual(response.data['sync_token'], token)
+        self.assertIn(str(self.court_jakarta_2.id), response.data['bookmarks'])
+
+    def test_sync_bookmarks_invalid_payload(self):
+        """Tes sync dengan operasi tidak valid ditolak (400) dan butuh login."""
+        url = reverse('court_filter:sync_bookmarks')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_login(self.user)
+        for operations in ('bukan list', [{'court_id': 'xyz', 'action': 'add'}],
+                           [{'court_id': str(self.court_jakarta_2.id), 'action': 'like'}],
+                           [{'court_id': str(self.court_jakarta_2.id), 'action': 'add', 'timestamp': 'kemarin'}]):
+            response = self.client.post(url, {'operations': operations}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, operations)
 
     def test_toggle_bookmark_add_new(self):
         """Tes bookmark (POST) lapangan baru oleh user login."""
@@ -314,8 +625,8 @@ class CourtFinderViewTests(APITestCase):
         self.assertIn('Jawa Barat', province_names)
     
     def test_court_detail_view_success(self):
-        """Tes halaman detail (GET) dengan nama yang valid."""
-        url = reverse('court_filter:court_detail', kwargs={'court_name': self.court_jakarta_1.name})
+        """Tes halaman detail (GET) lewat slug court."""
+        url = reverse('court_filter:court_detail', kwargs={'slug': self.court_jakarta_1.slug})
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -323,29 +634,61 @@ class CourtFinderViewTests(APITestCase):
         self.assertEqual(response.context['court'], self.court_jakarta_1)
 
     def test_court_detail_view_not_found(self):
-        """Tes halaman detail (GET) dengan nama yang tidak ada (404)."""
-        url = reverse('court_filter:court_detail', kwargs={'court_name': 'Lapangan Hantu'})
-        response = self.client.get(url)
-        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        """Tes halaman detail (GET) dengan slug, id, atau nama yang tidak ada (404)."""
+        urls = [
+            reverse('court_filter:court_detail', kwargs={'slug': 'lapangan-hantu-00000000'}),
+            reverse('court_filter:court_detail_by_id', kwargs={'court_id': uuid.uuid4()}),
+            reverse('court_filter:court_detail_legacy', kwargs={'court_name': 'Lapangan Hantu'}),
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, url)
+
+    def test_court_detail_view_by_id(self):
+        """Tes halaman detail lewat UUID hanya butuh satu query untuk court-nya."""
+        url = reverse('court_filter:court_detail_by_id', kwargs={'court_id': self.court_jakarta_1.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['court'], self.court_jakarta_1)
+        court_queries = [q['sql'] for q in queries if 'FROM "court_filter_court"' in q['sql']]
+        self.assertEqual(len(court_queries), 1)
 
     def test_court_detail_view_with_url_encoding(self):
-        """Tes halaman detail (GET) jika nama mengandung spasi (URL encoding)."""
+        """Tes URL lama berbasis nama (dengan spasi) di-redirect permanen ke URL slug."""
         spaced_name_court = Court.objects.create(
             name="Lapangan Keren Pakai Spasi", 
             latitude=0, longitude=0, price_per_hour=0
         )
+        self.assertTrue(spaced_name_court.slug.startswith('lapangan-keren-pakai-spasi-'))
         
-        url = reverse('court_filter:court_detail', kwargs={'court_name': spaced_name_court.name})
+        url = reverse('court_filter:court_detail_legacy', kwargs={'court_name': spaced_name_court.name})
         self.assertIn('%20', url)
         
         response = self.client.get(url)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.context['court'], spaced_name_court)
+        self.assertRedirects(
+            response,
+            reverse('court_filter:court_detail', kwargs={'slug': spaced_name_court.slug}),
+            status_code=status.HTTP_301_MOVED_PERMANENTLY,
+        )
+
+    def test_court_slug_is_stable_and_unique(self):
+        """Tes slug tidak berubah saat rename dan court bernama sama tetap dapat slug berbeda."""
+        twin = Court.objects.create(name=self.court_jakarta_1.name, latitude=0, longitude=0, price_per_hour=0)
+        self.assertNotEqual(twin.slug, self.court_jakarta_1.slug)
+
+        slug = twin.slug
+        twin.name = 'Nama Baru'
+        twin.save()
+        twin.refresh_from_db()
+        self.assertEqual(twin.slug, slug)
 
 class UtilsTests(TestCase):
     
     def setUp(self):
         cache.clear()
+        geocoder.breaker.reset()
 
     def test_haversine_distance(self):
         """
@@ -377,13 +720,13 @@ class UtilsTests(TestCase):
         self.assertFalse(is_in_indonesia(6.1, 100))
         self.assertFalse(is_in_indonesia(51.5, -0.12))
 
-    @patch('court_filter.utils.requests.get')
+    @patch('court_filter.geocoding.requests.Session.get')
     def test_geocode_address_success(self, mock_requests_get):
         """
         Tes geocode berhasil, API dipanggil, dan hasil di-cache.
         """
         address = "Monas, Jakarta"
-        cache_key = f'geocode_{address}'
+        cache_key = geocode_cache_key(address)
 
         mock_api_result = [{
             'lat': '-6.175392', 
@@ -405,13 +748,13 @@ class UtilsTests(TestCase):
 
         self.assertEqual(cache.get(cache_key), expected_coords)
 
-    @patch('court_filter.utils.requests.get')
+    @patch('court_filter.geocoding.requests.Session.get')
     def test_geocode_address_cached(self, mock_requests_get):
         """
         Tes geocode berhasil mengambil dari cache, API TIDAK dipanggil.
         """
         address = "GBK, Jakarta"
-        cache_key = f'geocode_{address}'
+        cache_key = geocode_cache_key(address)
         expected_coords = {'latitude': -6.2183, 'longitude': 106.8023}
 
         cache.set(cache_key, expected_coords)
@@ -422,7 +765,7 @@ class UtilsTests(TestCase):
 
         mock_requests_get.assert_not_called()
 
-    @patch('court_filter.utils.requests.get')
+    @patch('court_filter.geocoding.requests.Session.get')
     def test_geocode_address_api_failure(self, mock_requests_get):
         """
         Tes geocode gagal jika API mengembalikan error (misal: 500).
@@ -435,7 +778,7 @@ class UtilsTests(TestCase):
 
         self.assertIsNone(coords)
 
-    @patch('court_filter.utils.requests.get')
+    @patch('court_filter.geocoding.requests.Session.get')
     def test_geocode_address_not_found(self, mock_requests_get):
         """
         Tes geocode gagal jika API tidak menemukan alamat (hasil '[]').
@@ -450,7 +793,7 @@ class UtilsTests(TestCase):
 
         self.assertIsNone(coords)
 
-    @patch('court_filter.utils.requests.get')
+    @patch('court_filter.geocoding.requests.Session.get')
     def test_geocode_address_outside_indonesia(self, mock_requests_get):
         """
         Tes geocode jika API (secara keliru) mengembalikan hasil di luar Indonesia.
@@ -466,4 +809,1253 @@ class UtilsTests(TestCase):
 
         coords = geocode_address("Paris, France")
 
-        self.assertIsNone(coords)
\ No newline at end of file
+        self.assertIsNone(coords)
+
+
+class StubNominatim:
+    """
+    Pengganti requests.get untuk Nominatim: menjawab dari dict alamat -> (lat, lon),
+    mencatat setiap query, dan bisa ditahan supaya beberapa thread saling tumpang tindih.
+    """
+
+    def __init__(self, places=None, fail=False):
+        self.places = {key.casefold(): value for key, value in (places or {}).items()}
+        self.fail = fail
+        self.queries = []
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def __call__(self, url, params=None, **kwargs):
+        with self._lock:
+            self.queries.append(params['q'])
+        self.release.wait(5)
+        if self.fail:
+            raise requests.exceptions.ConnectionError('Nominatim down')
+        address = params['q'].rsplit(', Indonesia', 1)[0].casefold()
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        place = self.places.get(address)
+        response.json.return_value = [{'lat': str(place[0]), 'lon': str(place[1])}] if place else []
+        return response
+
+
+class GeocodeCachingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        geocoder.breaker.reset()
+        self.nominatim = StubNominatim({'Monas, Jakarta': (-6.175392, 106.827153)})
+        patcher = patch('court_filter.geocoding.requests.Session.get', new=self.nominatim)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_normalize_address(self):
+        """Tes normalisasi alamat: huruf, spasi, dan koma."""
+        self.assertEqual(normalize_address('  MONAS ,   Jakarta  '), 'monas, jakarta')
+        self.assertEqual(geocode_cache_key('Monas,Jakarta'), geocode_cache_key('monas, jakarta'))
+        self.assertNotEqual(geocode_cache_key('Monas, Jakarta'), geocode_cache_key('Monas, Bandung'))
+
+    def test_address_variants_share_cache(self):
+        """Tes variasi huruf/spasi dari alamat yang sama hanya memanggil Nominatim sekali."""
+        expected = {'latitude': -6.175392, 'longitude': 106.827153}
+        self.assertEqual(geocode_address('Monas, Jakarta'), expected)
+        self.assertEqual(geocode_address('  monas,JAKARTA '), expected)
+        self.assertEqual(geocode_address('MONAS ,  jakarta'), expected)
+        self.assertEqual(len(self.nominatim.queries), 1)
+
+    def test_not_found_is_negative_cached(self):
+        """Tes alamat yang tidak ketemu di-cache sebentar sehingga tidak ditanya ulang."""
+        self.assertIsNone(geocode_address('asdfghjkl'))
+        self.assertIsNone(geocode_address('ASDFGHJKL'))
+        self.assertEqual(len(self.nominatim.queries), 1)
+        self.assertEqual(cache.get(geocode_cache_key('asdfghjkl')), GEOCODE_NOT_FOUND)
+
+    def test_negative_cache_uses_short_timeout(self):
+        """Tes negative cache memakai TTL pendek, bukan TTL 24 jam."""
+        with patch('court_filter.utils.cache.set', wraps=cache.set) as cache_set:
+            geocode_address('asdfghjkl')
+        cache_set.assert_any_call(geocode_cache_key('asdfghjkl'), GEOCODE_NOT_FOUND, GEOCODE_NEGATIVE_TIMEOUT)
+
+    def test_upstream_errors_are_not_cached(self):
+        """Tes error jaringan tidak di-cache supaya request berikutnya mencoba lagi."""
+        self.nominatim.fail = True
+        self.assertIsNone(geocode_address('Monas, Jakarta'))
+        self.assertIsNone(cache.get(geocode_cache_key('Monas, Jakarta')))
+
+        self.nominatim.fail = False
+        self.assertIsNotNone(geocode_address('Monas, Jakarta'))
+        self.assertEqual(len(self.nominatim.queries), 2)
+
+    def test_concurrent_lookups_are_coalesced(self):
+        """Tes beberapa request bersamaan untuk alamat yang sama hanya memanggil Nominatim sekali."""
+        self.nominatim.release.clear()
+        results = []
+
+        def lookup(address):
+            results.append(geocode_address(address))
+
+        threads = [
+            threading.Thread(target=lookup, args=(address,))
+            for address in ['Monas, Jakarta', 'monas, jakarta', 'MONAS,JAKARTA', 'Monas,  Jakarta']
+        ]
+        for thread in threads:
+            thread.start()
+        # Tunggu sampai request pertama sampai ke stub sebelum melepasnya
+        for _ in range(100):
+            if self.nominatim.queries:
+                break
+            threading.Event().wait(0.01)
+        self.nominatim.release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(self.nominatim.queries), 1)
+        self.assertEqual(results, [{'latitude': -6.175392, 'longitude': 106.827153}] * 4)
+
+
+class GazetteerTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.gazetteer = Gazetteer([
+            {'name': 'Jawa Barat', 'kind': 'province', 'province': None, 'latitude': -6.9, 'longitude': 107.6},
+            {'name': 'Kota Bandung', 'kind': 'city', 'province': 'Jawa Barat', 'latitude': -6.91, 'longitude': 107.61},
+            {'name': 'Kabupaten Bandung Barat', 'kind': 'city', 'province': 'Jawa Barat', 'latitude': -6.84, 'longitude': 107.5},
+            {'name': 'Kota Baru', 'kind': 'city', 'province': 'Kalimantan Selatan', 'latitude': -3.3, 'longitude': 116.2},
+            {'name': 'Kota Baru', 'kind': 'city', 'province': 'Jambi', 'latitude': -1.6, 'longitude': 103.6},
+        ])
+
+    def test_resolve_city_and_province(self):
+        """Tes gazetteer menjawab nama kota/provinsi, dengan atau tanpa awalan administratif."""
+        expected = {'latitude': -6.91, 'longitude': 107.61}
+        self.assertEqual(self.gazetteer.resolve('Bandung'), expected)
+        self.assertEqual(self.gazetteer.resolve('  KOTA bandung ,Jawa Barat'), expected)
+        self.assertEqual(self.gazetteer.resolve('Provinsi Jawa Barat'), {'latitude': -6.9, 'longitude': 107.6})
+
+    def test_resolve_miss_for_specific_address(self):
+        """Tes alamat yang lebih spesifik dari kota tidak dijawab gazetteer."""
+        self.assertIsNone(self.gazetteer.resolve('Jl. Braga No. 1, Bandung'))
+        self.assertIsNone(self.gazetteer.resolve('Band'))
+        self.assertIsNone(self.gazetteer.resolve(''))
+
+    def test_resolve_ambiguous_name(self):
+        """Tes nama kembar hanya dijawab jika provinsinya disebut."""
+        self.assertIsNone(self.gazetteer.resolve('Baru'))
+        self.assertEqual(self.gazetteer.resolve('Kota Baru, Jambi'), {'latitude': -1.6, 'longitude': 103.6})
+
+    def test_trie_prefix_completion(self):
+        """Tes pencarian awalan di trie, nama terpendek lebih dulu."""
+        names = [place['name'] for place in self.gazetteer.trie.complete('band')]
+        self.assertEqual(names, ['Kota Bandung', 'Kabupaten Bandung Barat'])
+        self.assertEqual(PlaceTrie().complete('band'), [])
+
+    @patch('court_filter.geocoding.requests.Session.get')
+    def test_geocode_address_uses_gazetteer_first(self, mock_requests_get):
+        """Tes geocode_address menjawab dari gazetteer bawaan tanpa memanggil Nominatim."""
+        self.assertGreater(len(get_gazetteer()), 0)
+        coords = geocode_address('Kota Bandung, Jawa Barat')
+
+        self.assertIsNotNone(coords)
+        self.assertTrue(is_in_indonesia(coords['latitude'], coords['longitude']))
+        mock_requests_get.assert_not_called()
+
+    def test_bundled_gazetteer_knows_provinces_and_major_cities(self):
+        """Tes gazetteer bawaan menjawab semua provinsi dan kota besar dengan koordinat referensi."""
+        gazetteer = get_gazetteer()
+        for name in ('Jakarta', 'DKI Jakarta', 'Jakarta Selatan', 'Yogyakarta', 'Medan', 'Semarang', 'Depok', 'Makassar'):
+            self.assertIsNotNone(gazetteer.resolve(name), name)
+        call_command('populate_provinces', stdout=StringIO())
+        for name in Province.objects.values_list('name', flat=True):
+            self.assertIsNotNone(gazetteer.resolve(name), name)
+        # Banten menunjuk ke ibu kotanya (Serang), bukan ke kumpulan lapangan di Tangerang Selatan
+        self.assertEqual(gazetteer.resolve('Banten'), {'latitude': -6.12, 'longitude': 106.1503})
+
+    def test_build_gazetteer_keeps_reference_places(self):
+        """Tes build_gazetteer memakai koordinat referensi dan hanya menambah kota lain dari alamat lapangan."""
+        Province.objects.create(name='Jawa Barat')
+        defaults = {'court_type': 'futsal', 'price_per_hour': Decimal('1'), 'phone_number': '1'}
+        Court.objects.create(name='A', address='Jl. A, Bandung, Jawa Barat',
+                             latitude=Decimal('-6.95'), longitude=Decimal('107.70'), **defaults)
+        Court.objects.create(name='B', address='Jl. B, Kabupaten Garut, Jawa Barat',
+                             latitude=Decimal('-7.2'), longitude=Decimal('107.9'), **defaults)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        output = os.path.join(tmp_dir.name, 'gazetteer.json')
+
+        call_command('build_gazetteer', output=output, stdout=StringIO())
+
+        gazetteer = Gazetteer.from_file(output)
+        self.assertEqual(gazetteer.resolve('Bandung'), {'latitude': -6.9175, 'longitude': 107.6191})
+        self.assertEqual(gazetteer.resolve('Jawa Barat'), {'latitude': -6.9175, 'longitude': 107.6191})
+        self.assertEqual(gazetteer.resolve('Garut'), {'latitude': -7.2, 'longitude': 107.9})
+
+
+class GeocodingClientTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        geocoder.breaker.reset()
+        self.now = [0.0]
+        self.nominatim = StubNominatim({'Monas, Jakarta': (-6.175392, 106.827153)})
+        patcher = patch('court_filter.geocoding.requests.Session.get', new=self.nominatim)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_circuit_breaker_states(self):
+        """Tes circuit breaker: terbuka setelah gagal berturut-turut, half-open setelah cooldown."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: self.now[0])
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        self.now[0] = 31
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # hanya satu percobaan saat half-open
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        self.now[0] = 62
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_breaker_fails_fast(self):
+        """Tes saat Nominatim down, setelah ambang gagal tidak ada lagi request keluar."""
+        client = NominatimClient(failure_threshold=3)
+        self.nominatim.fail = True
+        for _ in range(3):
+            with self.assertRaises(GeocoderUnavailable):
+                async_to_sync(client.lookup)('Monas, Jakarta')
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        with self.assertRaises(GeocoderUnavailable):
+            async_to_sync(client.lookup)('Monas, Jakarta')
+        self.assertEqual(len(self.nominatim.queries), 3)
+
+    def test_concurrency_limit(self):
+        """Tes request melebihi batas konkurensi ditolak setelah menunggu sebentar."""
+        client = NominatimClient(max_concurrency=1, queue_timeout=0.05)
+        self.nominatim.release.clear()
+        first = threading.Thread(target=async_to_sync(client.lookup), args=('Monas, Jakarta',))
+        first.start()
+        for _ in range(100):
+            if self.nominatim.queries:
+                break
+            threading.Event().wait(0.01)
+
+        with self.assertRaises(GeocoderUnavailable):
+            async_to_sync(client.lookup)('Bundaran HI, Jakarta')
+
+        self.nominatim.release.set()
+        first.join(5)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_geocode_address_during_outage(self):
+        """Tes geocode_address mengembalikan None (tanpa cache) saat breaker terbuka."""
+        self.nominatim.fail = True
+        for _ in range(geocoder.breaker.failure_threshold + 2):
+            self.assertIsNone(geocode_address('Monas, Jakarta'))
+        self.assertEqual(len(self.nominatim.queries), geocoder.breaker.failure_threshold)
+        self.assertIsNone(cache.get(geocode_cache_key('Monas, Jakarta')))
+
+    async def test_async_geocode_view(self):
+        """Tes endpoint geocode async (ASGI) memakai client yang sama."""
+        url = reverse('court_filter:geocode_api_async')
+        response = await self.async_client.post(
+            url, {'address': 'Monas, Jakarta'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'latitude': -6.175392, 'longitude': 106.827153})
+
+        response = await self.async_client.post(url, {'address': 'asdfghjkl'})
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.post(url, {})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.nominatim.queries), 2)
+
+
+class SeedCourtsTests(TestCase):
+
+    def _rows(self, count, **overrides):
+        rows = []
+        for i in range(count):
+            row = {
+                'name': f'Lapangan {i}',
+                'address': f'Jl. Contoh {i}, Jakarta',
+                'latitude': Decimal('-6.2000001') + Decimal(i) / 1000,
+                'longitude': Decimal('106.8'),
+                'court_type': 'futsal',
+                'location_type': 'outdoor',
+                'price_per_hour': Decimal('100000'),
+                'phone_number': '0800',
+                'provinces': ['DKI Jakarta'],
+                'facilities': ['Toilets / restrooms', 'Parking area'],
+            }
+            row.update(overrides)
+            rows.append(row)
+        return rows
+
+    def test_seed_creates_courts_and_relations(self):
+        """Tes seeding membuat court, provinsi, fasilitas, dan relasi M2M-nya."""
+        result = seed_courts(self._rows(3))
+
+        self.assertEqual((result.created, result.updated, result.unchanged), (3, 0, 0))
+        self.assertEqual(Court.objects.count(), 3)
+        court = Court.objects.get(name='Lapangan 1')
+        self.assertEqual([p.name for p in court.provinces.all()], ['DKI Jakarta'])
+        self.assertEqual(sorted(f.name for f in court.facilities.all()), ['Parking area', 'Toilets / restrooms'])
+        self.assertEqual(court.latitude, Decimal('-6.199000'))
+
+    def test_seed_is_idempotent(self):
+        """Tes seeding ulang data yang sama tidak mengubah apa pun."""
+        seed_courts(self._rows(3))
+        with self.assertNumQueries(7):
+            result = seed_courts(self._rows(3))
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 0, 3))
+        self.assertEqual(Court.objects.count(), 3)
+
+    def test_seed_query_count_is_constant(self):
+        """Tes jumlah query seeding tidak bertambah seiring jumlah baris."""
+        # Provinsi dan fasilitas sudah ada, sehingga kedua run sebanding
+        seed_courts(self._rows(1))
+        Court.objects.all().delete()
+        with CaptureQueriesContext(connection) as small:
+            seed_courts(self._rows(2))
+        Court.objects.all().delete()
+        with CaptureQueriesContext(connection) as large:
+            seed_courts(self._rows(40))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_seed_updates_changed_courts_and_relations(self):
+        """Tes seeding memperbarui field dan relasi yang berubah saja."""
+        seed_courts(self._rows(2))
+        original_id = Court.objects.get(name='Lapangan 0').pk
+
+        rows = self._rows(2)
+        rows[0]['price_per_hour'] = Decimal('150000')
+        rows[0]['facilities'] = ['Lighting']
+        rows[1]['provinces'] = [Province.objects.get(name='DKI Jakarta'), 'Banten']
+        result = seed_courts(rows)
+
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 1, 1))
+        court = Court.objects.get(name='Lapangan 0')
+        self.assertEqual(court.pk, original_id)
+        self.assertEqual(court.price_per_hour, Decimal('150000'))
+        self.assertEqual([f.name for f in court.facilities.all()], ['Lighting'])
+        self.assertEqual(
+            sorted(p.name for p in Court.objects.get(name='Lapangan 1').provinces.all()),
+            ['Banten', 'DKI Jakarta'],
+        )
+        self.assertEqual(Facility.objects.filter(name='Lighting').count(), 1)
+
+    def test_seed_rejects_unknown_fields(self):
+        """Tes seeding menolak field yang tidak ada di model Court."""
+        with self.assertRaises(ValueError):
+            seed_courts(self._rows(1, rating=5))
+        self.assertEqual(Court.objects.count(), 0)
+
+    def test_seed_invalidates_search_cache(self):
+        """Tes seeding menginvalidasi cache pencarian karena bulk write tidak mengirim signal."""
+        key_before = search_cache_key({'lat': -6.2})
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_courts(self._rows(1))
+        self.assertNotEqual(search_cache_key({'lat': -6.2}), key_before)
+
+    def test_load_dummy_data_twice(self):
+        """Tes load_dummy_data bisa dijalankan ulang tanpa duplikasi."""
+        call_command('load_dummy_data', stdout=StringIO())
+        count = Court.objects.count()
+        self.assertGreater(count, 0)
+
+        out = StringIO()
+        call_command('load_dummy_data', stdout=out)
+        self.assertEqual(Court.objects.count(), count)
+        self.assertIn(f'0 created, 0 updated, {count} unchanged', out.getvalue())
+
+
+class CourtSearchEntryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        court_index.invalidate()
+        self.owner = User.objects.create_user(username='owner', password='pw')
+        self.mc_province = manage_models.Province.objects.create(name='DKI Jakarta')
+        self.mc_facility = manage_models.Facility.objects.create(name='Parking area')
+
+    def _managed_court(self, **kwargs):
+        fields = {
+            'owner': self.owner, 'name': 'GOR Milik Owner', 'address': 'Jl. Owner 1, Jakarta',
+            'court_type': 'badminton', 'price_per_hour': Decimal('75000'),
+            'latitude': Decimal('-6.200000'), 'longitude': Decimal('106.816666'),
+            'province': self.mc_province,
+        }
+        fields.update(kwargs)
+        return manage_models.Court.objects.create(**fields)
+
+    def _search(self, **data):
+        return self.client.post(reverse('court_filter:search_courts'), data)
+
+    def test_owner_court_appears_in_search(self):
+        """Tes lapangan dari manage_court ikut muncul di search_courts."""
+        court = self._managed_court()
+        court.facilities.add(self.mc_facility)
+
+        response = self._search(latitude=-6.2, longitude=106.8166, radius=5)
+        self.assertEqual(response.status_code, 200)
+        [result] = response.json()['courts']
+        self.assertEqual(result['id'], str(entry_id(CourtSearchEntry.SOURCE_MANAGE_COURT, court.pk)))
+        self.assertEqual(result['source'], 'manage_court')
+        self.assertEqual(result['detail_url'], reverse('manage_court:court_detail', args=[court.pk]))
+        self.assertEqual([p['name'] for p in result['provinces']], ['DKI Jakarta'])
+        self.assertEqual(result['facilities'], ['Parking area'])
+
+        # Filter provinsi memakai tabel Province court_filter untuk kedua sumber
+        response = self._search(province='DKI Jakarta')
+        self.assertEqual([c['name'] for c in response.json()['courts']], ['GOR Milik Owner'])
+
+    def test_owner_court_is_not_bookmarkable(self):
+        """Tes id hasil search manage_court ditolak jelas oleh toggle dan sync bookmark, bukan 404."""
+        court = self._managed_court()
+        court_id = entry_id(CourtSearchEntry.SOURCE_MANAGE_COURT, court.pk)
+        self.client.force_login(self.owner)
+
+        response = self.client.post(reverse('court_filter:toggle_bookmark', kwargs={'court_id': court_id}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], NOT_BOOKMARKABLE)
+
+        response = self.client.post(reverse('court_filter:sync_bookmarks'), {'operations': [
+            {'court_id': str(court_id), 'action': 'add'},
+        ]}, content_type='application/json')
+        self.assertEqual(response.json()['skipped'], [{'court_id': str(court_id), 'reason': 'not_bookmarkable'}])
+        self.assertFalse(Bookmark.objects.filter(user=self.owner).exists())
+
+    def test_signals_keep_entry_in_sync(self):
+        """Tes perubahan dan penghapusan lapangan langsung terlihat di read model."""
+        court = self._managed_court()
+        entry = CourtSearchEntry.objects.get(source='manage_court', source_id=str(court.pk))
+
+        court.price_per_hour = Decimal('90000')
+        court.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.price_per_hour, Decimal('90000'))
+
+        self.mc_province.name = 'Daerah Khusus Jakarta'
+        self.mc_province.save()
+        self.assertEqual([p.name for p in entry.provinces.all()], ['Daerah Khusus Jakarta'])
+
+        court.delete()
+        self.assertFalse(CourtSearchEntry.objects.filter(pk=entry.pk).exists())
+        self.assertNotIn(entry.pk, court_index.candidates(-6.2, 106.8166, 5))
+
+    def test_court_filter_relations_synced(self):
+        """Tes relasi provinsi Court court_filter ikut tersalin ke entry, termasuk clear() dari sisi provinsi."""
+        province = Province.objects.create(name='Banten')
+        court = Court.objects.create(
+            name='Lapangan Banten', address='Tangerang', latitude=Decimal('-6.17'), longitude=Decimal('106.63'),
+            court_type='futsal', location_type='indoor', price_per_hour=Decimal('100000'), phone_number='1',
+        )
+        court.provinces.add(province)
+        entry = CourtSearchEntry.objects.get(pk=court.pk)
+        self.assertEqual([p.name for p in entry.provinces.all()], ['Banten'])
+
+        province.courts.clear()
+        self.assertEqual(list(entry.provinces.all()), [])
+
+    def test_courts_without_coordinates_are_not_listed(self):
+        """Tes lapangan owner yang belum punya koordinat tidak ditampilkan (belum bisa dipetakan)."""
+        self._managed_court(latitude=None, longitude=None)
+        self.assertEqual(CourtSearchEntry.objects.count(), 1)
+        self.assertEqual(self._search(court_types='badminton').json()['count'], 0)
+
+    def test_seed_courts_writes_entries(self):
+        """Tes seed_courts (bulk, tanpa signal) tetap mengisi read model."""
+        seed_courts([{
+            'name': 'Seeded', 'address': 'Jl. Seed', 'latitude': '-6.2', 'longitude': '106.8',
+            'court_type': 'tennis', 'location_type': 'outdoor', 'price_per_hour': '0',
+            'phone_number': '', 'provinces': ['Bali'], 'facilities': ['Lighting'],
+        }])
+        entry = CourtSearchEntry.objects.get(name='Seeded')
+        self.assertEqual(entry.pk, Court.objects.get(name='Seeded').pk)
+        self.assertEqual([f.name for f in entry.facilities.all()], ['Lighting'])
+
+    def test_rebuild_court_search(self):
+        """Tes rebuild_court_search memulihkan entry yang hilang dan membuang yang yatim."""
+        court = self._managed_court()
+        CourtSearchEntry.objects.all().delete()
+        CourtSearchEntry.objects.create(
+            id=uuid.uuid4(), source='court_filter', source_id=str(uuid.uuid4()), name='Yatim',
+            address='-', court_type='other', price_per_hour=0,
+        )
+        out = StringIO()
+        call_command('rebuild_court_search', stdout=out)
+        self.assertIn('1 written, 1 removed', out.getvalue())
+        self.assertEqual(
+            list(CourtSearchEntry.objects.values_list('source_id', flat=True)), [str(court.pk)]
+        )
+
+    def test_search_document_rebuilt_on_change(self):
+        """Tes dokumen JSON tersimpan ikut diperbarui saat court, relasi, atau nama provinsi berubah."""
+        province = Province.objects.create(name='Banten')
+        court = Court.objects.create(
+            name='Lapangan Banten', address='Tangerang', latitude=Decimal('-6.17'), longitude=Decimal('106.63'),
+            court_type='futsal', location_type='indoor', price_per_hour=Decimal('100000'), phone_number='1',
+        )
+        court.provinces.add(province)
+        entry = CourtSearchEntry.objects.get(pk=court.pk)
+        document = json.loads(entry.document)
+        self.assertEqual(document['provinces'], [{'id': province.pk, 'name': 'Banten'}])
+        self.assertEqual(document['price_per_hour'], 100000.0)
+        self.assertEqual(entry.province_mask, 1 << (province.pk - 1))
+
+        court.price_per_hour = Decimal('120000')
+        court.save()
+        province.name = 'Provinsi Banten'
+        province.save()
+        entry.refresh_from_db()
+        document = json.loads(entry.document)
+        self.assertEqual(document['price_per_hour'], 120000.0)
+        self.assertEqual(document['provinces'][0]['name'], 'Provinsi Banten')
+
+    def test_search_response_uses_stored_documents(self):
+        """Tes response search_courts adalah dokumen tersimpan plus is_bookmarked dan distance."""
+        court = self._managed_court()
+        entry = CourtSearchEntry.objects.get(source_id=str(court.pk))
+        response = self._search(latitude=-6.2, longitude=106.8166, radius=5)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        [result] = response.json()['courts']
+        self.assertEqual(
+            {k: v for k, v in result.items() if k not in ('is_bookmarked', 'distance')},
+            json.loads(entry.document),
+        )
+        self.assertFalse(result['is_bookmarked'])
+        self.assertEqual(result['distance'], 0.01)
+
+    def test_province_filter_uses_mask_and_falls_back_to_join(self):
+        """Tes filter provinsi memakai bitmask, dan join M2M untuk id provinsi di luar jangkauan mask."""
+        self._managed_court()
+        far = Province.objects.create(id=200, name='Provinsi Baru')
+        other = manage_models.Province.objects.create(name='Provinsi Baru')
+        self._managed_court(name='GOR Provinsi Baru', province=other)
+
+        self.assertEqual(
+            [c['name'] for c in self._search(province='DKI Jakarta').json()['courts']], ['GOR Milik Owner']
+        )
+        entry = CourtSearchEntry.objects.get(name='GOR Provinsi Baru')
+        self.assertEqual(entry.province_mask, 0)
+        self.assertEqual(list(entry.provinces.all()), [far])
+        self.assertEqual(
+            [c['name'] for c in self._search(province='Provinsi Baru').json()['courts']], ['GOR Provinsi Baru']
+        )
+        self.assertEqual(self._search(province='Tidak Ada').json()['count'], 0)
+
+    def test_facility_filter_requires_all_facilities(self):
+        """Tes filter fasilitas: lapangan harus punya semua fasilitas yang diminta, tanpa join M2M."""
+        toilets = manage_models.Facility.objects.create(name='Toilets / restrooms')
+        both = self._managed_court(name='GOR Lengkap')
+        both.facilities.add(self.mc_facility, toilets)
+        self._managed_court(name='GOR Parkir Saja').facilities.add(self.mc_facility)
+
+        data = {'facilities': ['Parking area', 'Toilets / restrooms']}
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._search(**data)
+        self.assertEqual([c['name'] for c in response.json()['courts']], ['GOR Lengkap'])
+        search_sql = [q['sql'] for q in ctx.captured_queries if 'courtsearchentry' in q['sql']]
+        self.assertFalse(any('courtsearchentry_facilities' in sql for sql in search_sql))
+
+        names = [c['name'] for c in self._search(facilities='Parking area').json()['courts']]
+        self.assertEqual(names, ['GOR Lengkap', 'GOR Parkir Saja'])
+        self.assertEqual(self._search(facilities=['Parking area', 'Kolam renang']).json()['count'], 0)
+
+    def test_facility_filter_falls_back_to_join_past_mask(self):
+        """Tes fasilitas dengan id di luar jangkauan bitmask tetap bisa difilter lewat M2M."""
+        Facility.objects.create(id=100, name='Sauna')
+        court = self._managed_court()
+        court.facilities.add(manage_models.Facility.objects.create(name='Sauna'), self.mc_facility)
+        self._managed_court(name='GOR Lain').facilities.add(self.mc_facility)
+
+        response = self._search(facilities=['Sauna', 'Parking area'])
+        self.assertEqual([c['name'] for c in response.json()['courts']], ['GOR Milik Owner'])
+
+    def test_populate_provinces_seeds_both_apps(self):
+        """Tes populate_mc_provinces dan populate_provinces mengisi tabel provinsi yang sama-sama lengkap."""
+        call_command('populate_mc_provinces', stdout=StringIO())
+        self.assertEqual(Province.objects.count(), 38)
+        self.assertEqual(manage_models.Province.objects.count(), 38)
+
+
+class FullTextSearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        court_index.invalidate()
+        defaults = {
+            'latitude': Decimal('-6.2'), 'longitude': Decimal('106.8'), 'court_type': 'futsal',
+            'location_type': 'indoor', 'price_per_hour': Decimal('100000'), 'phone_number': '1',
+        }
+        self.senayan = Court.objects.create(name='GOR Senayan', address='Jl. Pintu Satu, Jakarta', **defaults)
+        self.sudirman = Court.objects.create(
+            name='Lapangan Sudirman', address='Jl. Sudirman, Jakarta', description='Dekat GOR Senayan', **defaults
+        )
+        self.bandung = Court.objects.create(name='Senayan Futsal Bandung Raya', address='Bandung', **defaults)
+        self.inactive = Court.objects.create(name='GOR Senayan Lama', address='Jakarta', is_active=False, **defaults)
+
+    def _search(self, **data):
+        return self.client.post(reverse('court_filter:search_courts'), data).json()
+
+    def _autocomplete(self, q, **params):
+        return self.client.get(reverse('court_filter:court_autocomplete'), {'q': q, **params}).json()['results']
+
+    def test_q_ranks_name_matches_first(self):
+        """Tes q mencari di name/address/description, kecocokan di nama lebih tinggi, court nonaktif tidak ikut."""
+        names = [c['name'] for c in self._search(q='senayan')['courts']]
+        self.assertEqual(names[-1], 'Lapangan Sudirman')  # hanya cocok di deskripsi
+        self.assertCountEqual(names, ['GOR Senayan', 'Senayan Futsal Bandung Raya', 'Lapangan Sudirman'])
+
+    def test_q_requires_every_word_and_combines_with_filters(self):
+        """Tes semua kata di q harus cocok dan filter lain tetap berlaku."""
+        self.assertEqual([c['name'] for c in self._search(q='senayan pintu')['courts']], ['GOR Senayan'])
+        self.assertCountEqual(
+            [c['name'] for c in self._search(q='senayan', latitude=-6.2, longitude=106.8, radius=1)['courts']],
+            ['GOR Senayan', 'Lapangan Sudirman', 'Senayan Futsal Bandung Raya'],
+        )
+        self.assertEqual(self._search(q='senayan', price_max=1000)['count'], 0)
+        self.assertEqual(self._search(q='senayan xyzzy')['count'], 0)
+
+    def test_search_applies_filters_before_limit(self):
+        """Tes filter (termasuk is_active) diterapkan di query full-text, jadi limit hanya menghitung hasil yang valid."""
+        self.assertEqual(fulltext.search('senayan lama'), [])
+        self.bandung.court_type = 'basketball'
+        self.bandung.save()
+
+        # Dua court lain lebih relevan untuk 'senayan', tapi tersaring court_type
+        queryset = CourtSearchEntry.objects.filter(is_active=True, court_type='basketball')
+        matches = fulltext.search('senayan', queryset, limit=1)
+        self.assertEqual([match_id for match_id, _ in matches], [self.bandung.pk])
+
+    def test_q_with_coords_applies_location_before_match_limit(self):
+        """Tes q + koordinat tidak kehilangan court terdekat karena batas MAX_MATCHES dipenuhi court yang jauh."""
+        medan = Court.objects.create(
+            name='Arena Medan', address='Jl. Futsal, Medan', latitude=Decimal('3.59'), longitude=Decimal('98.67'),
+            court_type='futsal', location_type='indoor', price_per_hour=Decimal('100000'), phone_number='1',
+        )
+        coords = {'q': 'futsal', 'latitude': 3.59, 'longitude': 98.67}
+        with patch('court_filter.fulltext.MAX_MATCHES', 1):
+            # Court Jakarta/Bandung lebih relevan (kata di nama) dan memenuhi batas lebih dulu
+            self.assertNotIn(medan.pk, [match_id for match_id, _ in fulltext.search('futsal')])
+            for data in ({'radius': 5}, {'radius': 5, 'order': 'relevance'}, {'limit': 1}):
+                with self.subTest(**data):
+                    result = self._search(**coords, **data)
+                    self.assertEqual([c['name'] for c in result['courts']], ['Arena Medan'])
+
+    def test_q_cursor_pagination(self):
+        """Tes hasil q bisa dipaging dengan cursor tanpa duplikat."""
+        first = self._search(q='senayan', page_size=2)
+        second = self._search(q='senayan', page_size=2, cursor=first['next_cursor'])
+        names = [c['name'] for c in first['courts'] + second['courts']]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(len(set(names)), 3)
+        self.assertIsNone(second['next_cursor'])
+
+    def test_index_follows_court_changes(self):
+        """Tes index full-text ikut berubah saat court diganti nama atau dihapus."""
+        self.senayan.name = 'GOR Kemayoran'
+        self.senayan.save()
+        self.assertEqual([c['name'] for c in self._search(q='kemayoran')['courts']], ['GOR Kemayoran'])
+        self.senayan.delete()
+        self.assertEqual(self._search(q='kemayoran')['count'], 0)
+
+    def test_autocomplete_prefix(self):
+        """Tes autocomplete mencocokkan awalan kata di nama, yang terpendek lebih dulu."""
+        results = self._autocomplete('sena')
+        self.assertEqual([r['name'] for r in results], ['GOR Senayan', 'Senayan Futsal Bandung Raya'])
+        self.assertEqual(results[0]['id'], str(self.senayan.pk))
+        self.assertEqual(results[0]['detail_url'], reverse('court_filter:court_detail_by_id', args=[self.senayan.pk]))
+        self.assertEqual([r['name'] for r in self._autocomplete('gor sen')], ['GOR Senayan'])
+        self.assertEqual(len(self._autocomplete('sena', limit=1)), 1)
+        self.assertEqual(self._autocomplete('s'), [])
+
+    def test_autocomplete_orders_all_matches(self):
+        """Tes nama terpendek dipilih dari semua court yang cocok, bukan dari sebagian kandidat saja."""
+        defaults = {
+            'latitude': Decimal('-6.2'), 'longitude': Decimal('106.8'), 'court_type': 'futsal',
+            'price_per_hour': Decimal('100000'), 'phone_number': '1',
+        }
+        for i in range(60):
+            Court.objects.create(name=f'Senayan Sport Center Cabang {i:02d}', **defaults)
+        Court.objects.create(name='Senayan', **defaults)
+
+        self.assertEqual([r['name'] for r in self._autocomplete('sena', limit=2)], ['Senayan', 'GOR Senayan'])
+
+    def test_autocomplete_is_cached_until_courts_change(self):
+        """Tes hasil autocomplete di-cache dan invalid saat ada court berubah."""
+        self._autocomplete('sena')
+        with self.assertNumQueries(0):
+            self._autocomplete('sena')
+        Court.objects.create(
+            name='Senayan Mini', address='Jakarta', latitude=Decimal('-6.2'), longitude=Decimal('106.8'),
+            court_type='futsal', location_type='indoor', price_per_hour=Decimal('1'), phone_number='1',
+        )
+        self.assertEqual(self._autocomplete('sena')[0]['name'], 'GOR Senayan')
+        self.assertIn('Senayan Mini', [r['name'] for r in self._autocomplete('sena')])
+
+
+class ImportCourtsTests(TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp = tmp_dir.name
+
+    def _write(self, filename, content):
+        path = os.path.join(self.tmp, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def _import(self, path, *args):
+        out = StringIO()
+        call_command('import_courts', path, '--chunk-size=2', *args, stdout=out)
+        return out.getvalue()
+
+    def _rejects(self, path):
+        with open(f'{path}.rejects.ndjson', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_import_csv(self):
+        """Tes import CSV: baris valid masuk, baris invalid dan duplikat ditulis ke file rejects."""
+        path = self._write('courts.csv', (
+            'name,address,latitude,longitude,court_type,location_type,price_per_hour,phone_number,provinces,facilities\n'
+            'GOR A,"Jl. A, Jakarta",-6.2,106.8,badminton,indoor,50000,0811,DKI Jakarta|Banten,Toilets / restrooms;Parking area\n'
+            'GOR B,"Jl. B, Bandung",-6.9,107.6,futsal,,,,Jawa Barat,\n'
+            'GOR C,"Paris",48.85,2.35,tennis,outdoor,0,,,\n'
+            'GOR A,"Jl. A lagi",-6.2,106.8,badminton,indoor,50000,,,\n'
+            'GOR D,"Jl. D",abc,106.8,tennis,outdoor,0,,,\n'
+        ))
+        output = self._import(path)
+
+        self.assertIn('Imported 2 courts (2 created', output)
+        court = Court.objects.get(name='GOR A')
+        self.assertEqual(sorted(p.name for p in court.provinces.all()), ['Banten', 'DKI Jakarta'])
+        self.assertEqual(sorted(f.name for f in court.facilities.all()), ['Parking area', 'Toilets / restrooms'])
+        self.assertEqual(Court.objects.get(name='GOR B').location_type, 'outdoor')
+
+        reasons = {row['record']: row['reason'] for row in self._rejects(path)}
+        self.assertEqual(sorted(reasons), [3, 4, 5])
+        self.assertIn('outside Indonesia', reasons[3])
+        self.assertIn('Duplicate', reasons[4])
+        self.assertIn('not a number', reasons[5])
+
+    def test_import_geojson_osm_export(self):
+        """Tes import GeoJSON hasil export OSM, termasuk polygon dan osm_id 'way/...'."""
+        features = [
+            {'type': 'Feature', 'id': 'way/111',
+             'properties': {'name': 'Lapangan Futsal', 'sport': 'soccer', 'addr:street': 'Jl. Merdeka',
+                            'addr:city': 'Bandung'},
+             'geometry': {'type': 'Polygon', 'coordinates': [[
+                 [107.60, -6.90], [107.62, -6.90], [107.62, -6.92], [107.60, -6.92], [107.60, -6.90]
+             ]]}},
+            {'type': 'Feature', 'id': 'node/222',
+             'properties': {'name': 'Lapangan Voli', 'sport': 'beachvolleyball', 'indoor': 'yes'},
+             'geometry': {'type': 'Point', 'coordinates': [115.2, -8.6]}},
+            {'type': 'Feature', 'id': 'node/333',
+             'properties': {'name': 'Tanpa Alamat', 'sport': 'tennis'},
+             'geometry': {'type': 'Point', 'coordinates': [115.2, -8.6]}},
+        ]
+        features[1]['properties']['address'] = 'Kuta, Bali'
+        path = self._write('osm.geojson', json.dumps({'type': 'FeatureCollection', 'features': features}))
+        self._import(path)
+
+        futsal = Court.objects.get(osm_id='111')
+        self.assertEqual(futsal.address, 'Jl. Merdeka, Bandung')
+        self.assertEqual(futsal.court_type, 'soccer')
+        self.assertEqual(futsal.latitude, Decimal('-6.910000'))
+        voli = Court.objects.get(osm_id='222')
+        self.assertEqual((voli.court_type, voli.location_type), ('volleyball', 'indoor'))
+        self.assertEqual([row['reason'] for row in self._rejects(path)], ['Missing address'])
+
+    def test_reimport_upserts_by_osm_id(self):
+        """Tes import ulang NDJSON memperbarui court berdasarkan osm_id, bukan membuat duplikat."""
+        line = {'name': 'GOR Lama', 'address': 'Jl. A, Jakarta', 'latitude': -6.2, 'longitude': 106.8,
+                'court_type': 'futsal', 'osm_id': '999'}
+        path = self._write('courts.ndjson', json.dumps(line) + '\n{not json\n')
+        self._import(path)
+        self.assertEqual(self._rejects(path)[0]['record'], 2)
+
+        line['name'] = 'GOR Baru'
+        path = self._write('courts.ndjson', json.dumps(line) + '\n')
+        output = self._import(path)
+
+        self.assertIn('0 created, 1 updated', output)
+        self.assertEqual(list(Court.objects.values_list('name', flat=True)), ['GOR Baru'])
+
+    def test_import_rejects_values_that_do_not_fit_the_columns(self):
+        """Tes harga/koordinat yang melebihi max_digits dan osm_id terlalu panjang ditolak per baris, baris lain tetap masuk."""
+        good = {'name': 'GOR Baik', 'address': 'Jl. A, Jakarta', 'latitude': -6.2, 'longitude': 106.8,
+                'price_per_hour': '99999999.99'}
+        lines = [
+            good,
+            {**good, 'name': 'GOR Mahal', 'price_per_hour': '123456789012'},
+            {**good, 'name': 'GOR Bulat', 'price_per_hour': '99999999.999'},
+            {**good, 'name': 'GOR OSM', 'osm_id': 'way/' + '1' * 40},
+        ]
+        path = self._write('courts.ndjson', ''.join(json.dumps(line) + '\n' for line in lines))
+        output = self._import(path)
+
+        self.assertIn('Imported 1 courts', output)
+        self.assertEqual(list(Court.objects.values_list('name', flat=True)), ['GOR Baik'])
+        reasons = {row['record']: row['reason'] for row in self._rejects(path)}
+        self.assertEqual(sorted(reasons), [2, 3, 4])
+        self.assertIn('price_per_hour does not fit', reasons[2])
+        self.assertIn('price_per_hour does not fit', reasons[3])
+        self.assertIn('osm_id is longer than 32', reasons[4])
+
+    def test_iter_json_array_across_chunks(self):
+        """Tes parser GeoJSON streaming tetap benar walau item terpotong di batas chunk."""
+        doc = json.dumps({'type': 'FeatureCollection', 'name': 'x', 'features': [
+            {'type': 'Feature', 'properties': {'name': f'Lapangan {i}, "A"'}, 'geometry': None}
+            for i in range(20)
+        ]})
+        items = list(iter_json_array(StringIO(doc), 'features', chunk_size=7))
+        self.assertEqual([item['properties']['name'] for item in items], [f'Lapangan {i}, "A"' for i in range(20)])
+        self.assertEqual(list(iter_json_array(StringIO('{"features": []}'), 'features')), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array(StringIO('{"features": [{"a": 1}'), 'features'))
+
+
+class ExportDataTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='password123', is_staff=True
+        )
+        cls.user = User.objects.create_user(username='user', email='user@test.com', password='password123')
+        seed_courts([
+            {
+                'name': f'Lapangan {i}', 'address': f'Jl. {i}, Jakarta', 'latitude': Decimal('-6.2'),
+                'longitude': Decimal('106.8'), 'court_type': 'futsal', 'location_type': 'indoor',
+                'price_per_hour': Decimal('100000'), 'phone_number': '0800',
+                'provinces': ['DKI Jakarta'], 'facilities': ['Toilets / restrooms', 'Parking area'],
+            }
+            for i in range(5)
+        ])
+        Bookmark.objects.create(user=cls.user, court=Court.objects.get(name='Lapangan 1'))
+
+    def _export(self, kind, **params):
+        response = self.client.get(reverse('court_filter:export_data', args=[kind]), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_requires_admin(self):
+        """Tes ekspor hanya bisa dilakukan admin."""
+        url = reverse('court_filter:export_data', args=['courts'])
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_export_courts_ndjson(self):
+        """Tes ekspor court sebagai NDJSON lengkap dengan provinsi dan fasilitas."""
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('court_filter:export_data', args=['courts']))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        # 3 query per chunk: court, provinsi, fasilitas
+        with self.assertNumQueries(3):
+            rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['provinces'], ['DKI Jakarta'])
+        self.assertEqual(sorted(rows[0]['facilities']), ['Parking area', 'Toilets / restrooms'])
+
+    def test_export_csv_round_trips_through_import(self):
+        """Tes hasil ekspor CSV bisa diimpor kembali dengan import_courts."""
+        self.client.force_login(self.admin)
+        content = self._export('courts', format='csv')
+        self.assertTrue(content.startswith('id,osm_id,name,'))
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = os.path.join(tmp_dir.name, 'courts.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        out = StringIO()
+        call_command('import_courts', path, stdout=out)
+        self.assertIn('Imported 5 courts (0 created, 0 updated, 5 unchanged)', out.getvalue())
+
+    def test_export_bookmarks_and_errors(self):
+        """Tes ekspor bookmark, serta format/jenis data yang tidak dikenal."""
+        self.client.force_login(self.admin)
+        rows = [json.loads(line) for line in self._export('bookmarks').splitlines()]
+        self.assertEqual([(row['user_id'], row['court_name']) for row in rows], [(self.user.pk, 'Lapangan 1')])
+
+        url = reverse('court_filter:export_data', args=['courts'])
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
+        url = reverse('court_filter:export_data', args=['users'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_export_command(self):
+        """Tes management command export_data menulis file."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = os.path.join(tmp_dir.name, 'courts.ndjson')
+        err = StringIO()
+        call_command('export_data', 'courts', '--output', path, '--chunk-size=2', stderr=err)
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 5)
+        self.assertIn('Exported 5 courts', err.getvalue())
+
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.province = Province.objects.create(name='DKI Jakarta')
+        self.court = Court.objects.create(
+            name='GOR Senayan', address='Jakarta', latitude=Decimal('-6.2'), longitude=Decimal('106.8'),
+            court_type='futsal', location_type='indoor', price_per_hour=Decimal('100000'), phone_number='0800',
+        )
+
+    def test_provinces_not_modified_without_queries(self):
+        """Tes get_provinces menjawab 304 tanpa query, lalu 200 lagi setelah province berubah."""
+        url = reverse('court_filter:get_provinces')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        self.province.name = 'Jakarta'
+        self.province.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_court_detail_not_modified_until_court_changes(self):
+        """Tes halaman detail (slug dan UUID) 304 tanpa query sampai court-nya disimpan ulang."""
+        urls = [
+            reverse('court_filter:court_detail', args=[self.court.slug]),
+            reverse('court_filter:court_detail_by_id', args=[self.court.pk]),
+        ]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        for url, etag in zip(urls, etags):
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+        self.court.price_per_hour = Decimal('150000')
+        self.court.save()
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_court_detail_etag_changes_after_seed_and_login(self):
+        """Tes ETag detail berubah setelah seed_courts (bulk) dan berbeda per user."""
+        url = reverse('court_filter:court_detail', args=[self.court.slug])
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_courts([{
+                'name': 'Lapangan Baru', 'address': 'Bandung', 'latitude': Decimal('-6.9'),
+                'longitude': Decimal('107.6'), 'court_type': 'futsal', 'location_type': 'indoor',
+                'price_per_hour': Decimal('50000'), 'phone_number': '0800',
+            }])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        self.client.force_login(User.objects.create_user(username='user', email='user@test.com', password='password123'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_court_detail_etag_changes_after_profile_change(self):
+        """Tes ETag detail berubah saat user login mengganti profil (navbar menampilkan nama dan foto)."""
+        user = User.objects.create_user(username='user', email='user@test.com', password='password123')
+        self.client.force_login(user)
+        url = reverse('court_filter:court_detail', args=[self.court.slug])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        user.username = 'nama_baru'
+        user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'nama_baru')
+
+    def test_missing_court_has_no_etag(self):
+        """Tes 404 tidak membawa ETag."""
+        response = self.client.get(reverse('court_filter:court_detail', args=['tidak-ada-00000000']))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ConstantsBundleTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        constants_bundle.reset()
+        Province.objects.create(name='DKI Jakarta')
+        Facility.objects.create(name='Parking area')
+        manage_models.Province.objects.create(name='Jawa Barat')
+
+    def test_version_check_and_immutable_bundle(self):
+        """Tes endpoint versi menunjuk ke bundle yang boleh di-cache lama (immutable)."""
+        version = self.client.get(reverse('court_filter:constants_version')).json()
+        response = self.client.get(version['url'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        bundle = response.json()
+        self.assertEqual(bundle['version'], version['version'])
+        self.assertEqual([p['name'] for p in bundle['provinces']], ['DKI Jakarta'])
+        self.assertEqual([p['name'] for p in bundle['manage_court']['provinces']], ['Jawa Barat'])
+        self.assertIn({'value': 'futsal', 'label': 'Futsal'}, bundle['sport_types'])
+        self.assertIn({'value': 'indoor', 'label': 'Indoor'}, bundle['location_types'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('court_filter:constants_version'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_bundle_rebuilt_after_data_change(self):
+        """Tes bundle dibangun sekali, lalu versi baru setelah facility ditambah; versi lama di-redirect."""
+        old = constants_bundle.version()
+        with self.assertNumQueries(0):
+            self.assertEqual(constants_bundle.version(), old)
+
+        manage_models.Facility.objects.create(name='Toilet')
+        new = constants_bundle.version()
+        self.assertNotEqual(new, old)
+        self.assertEqual([f['name'] for f in constants_bundle.content()['manage_court']['facilities']], ['Toilet'])
+
+        response = self.client.get(reverse('court_filter:constants_bundle', args=[old]))
+        self.assertRedirects(response, reverse('court_filter:constants_bundle', args=[new]))
+        self.assertRedirects(
+            self.client.get(reverse('court_filter:constants_latest')),
+            reverse('court_filter:constants_bundle', args=[new]),
+        )
+
+class SpatialIndexTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_grid_within_radius_matches_linear_scan(self):
+        """Tes hasil grid index sama dengan scan haversine biasa."""
+        points = {
+            'monas': (-6.1754, 106.8272),
+            'senayan': (-6.2183, 106.8023),
+            'bekasi': (-6.2383, 106.9756),
+            'bandung': (-6.9175, 107.6191),
+        }
+        grid = GeoGridIndex()
+        for court_id, (lat, lon) in points.items():
+            grid.insert(court_id, lat, lon)
+
+        origin = (-6.2088, 106.8456)
+        expected = sorted(
+            court_id for court_id, (lat, lon) in points.items()
+            if haversine_distance(*origin, lat, lon) <= 10
+        )
+        found = grid.within_radius(*origin, 10)
+
+        self.assertEqual(sorted(court_id for court_id, _ in found), expected)
+        self.assertEqual([court_id for court_id, _ in found], ['monas', 'senayan'])
+        self.assertNotIn('bandung', set(grid.candidates(*origin, 10)))
+
+    def test_grid_insert_moves_and_remove(self):
+        """Tes update posisi dan hapus court dari grid."""
+        grid = GeoGridIndex()
+        grid.insert('a', -6.2, 106.8)
+        grid.insert('a', -6.9, 107.6)
+
+        self.assertEqual(len(grid), 1)
+        self.assertEqual(grid.within_radius(-6.2, 106.8, 5), [])
+        self.assertEqual(len(grid.within_radius(-6.9, 107.6, 5)), 1)
+
+        grid.remove('a')
+        grid.remove('a')
+        self.assertNotIn('a', grid)
+        self.assertEqual(list(grid.candidates(-6.9, 107.6, 5)), [])
+
+    def test_grid_nearest_matches_brute_force(self):
+        """Tes k terdekat dari grid sama dengan urutan brute force."""
+        import random
+        rng = random.Random(7)
+        grid = GeoGridIndex()
+        points = {}
+        for i in range(500):
+            points[i] = (rng.uniform(-8, -5), rng.uniform(105, 110))
+            grid.insert(i, *points[i])
+
+        for origin in [(-6.2, 106.8), (-4.0, 112.0), (-7.9, 105.01)]:
+            expected = sorted(points, key=lambda i: haversine_distance(*origin, *points[i]))[:25]
+            self.assertEqual([i for i, _ in grid.nearest(*origin, 25)], expected)
+        self.assertEqual(len(grid.nearest(-6.2, 106.8, 1000)), 500)
+
+    def test_bounding_box_contains_radius(self):
+        """Tes bounding box mencakup titik di tepi radius."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(-6.2, 106.8, 10)
+        self.assertLess(min_lat, -6.2)
+        self.assertGreater(max_lat, -6.2)
+        # Titik tepat ~10 km ke timur harus masih di dalam kotak
+        self.assertLess(haversine_distance(-6.2, 106.8, -6.2, max_lon), 10.01)
+        self.assertGreater(haversine_distance(-6.2, 106.8, -6.2, max_lon), 9.99)
+
+    def test_court_index_follows_court_signals(self):
+        """Tes index ikut berubah saat court disimpan, dinonaktifkan, atau dihapus."""
+        court = Court.objects.create(
+            name='Lapangan Index', latitude=Decimal('-6.2000'), longitude=Decimal('106.8000'),
+            price_per_hour=Decimal('100000'), court_type='futsal',
+        )
+        self.assertIn(court.id, court_index.candidates(-6.2, 106.8, 1))
+
+        court.latitude = Decimal('-6.9175')
+        court.longitude = Decimal('107.6191')
+        court.save()
+        self.assertNotIn(court.id, court_index.candidates(-6.2, 106.8, 1))
+        self.assertIn(court.id, court_index.candidates(-6.9175, 107.6191, 1))
+
+        court.is_active = False
+        court.save()
+        self.assertNotIn(court.id, court_index.candidates(-6.9175, 107.6191, 1))
+
+        court.is_active = True
+        court.save()
+        court.delete()
+        self.assertEqual(court_index.candidates(-6.9175, 107.6191, 1), [])
+
+    def test_court_index_patches_small_writes_without_rebuild(self):
+        """Tes simpan court menambal index di tempat, tanpa membangun ulang seluruh grid."""
+        court_index.candidates(-6.2, 106.8, 1)
+        with patch.object(court_index, 'rebuild', wraps=court_index.rebuild) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                court = Court.objects.create(
+                    name='Lapangan Index', latitude=Decimal('-6.2000'), longitude=Decimal('106.8000'),
+                    price_per_hour=Decimal('100000'), court_type='futsal',
+                )
+                court.facilities.add(Facility.objects.create(name='Parkir'))
+            self.assertIn(court.id, court_index.candidates(-6.2, 106.8, 1))
+        rebuild.assert_not_called()
+
+    def test_court_index_catches_up_on_other_workers_writes(self):
+        """Tes tulisan worker lain terbaca lewat synced_at, juga kalau kenaikan versinya hilang."""
+        court_index.candidates(-6.2, 106.8, 1)
+        other = Court.objects.create(
+            name='Lapangan Lain', latitude=Decimal('-6.2000'), longitude=Decimal('106.8000'),
+            price_per_hour=Decimal('100000'), court_type='futsal',
+        )
+        # Tulisan worker lain: grid worker ini tidak ditambal
+        CourtSearchEntry.objects.filter(pk=other.pk).update(
+            latitude=Decimal('-6.9175'), longitude=Decimal('107.6191'), synced_at=timezone.now(),
+        )
+        # Versi perubahan naik (tulisan berikutnya di-commit) -> catch-up
+        with self.captureOnCommitCallbacks(execute=True):
+            Court.objects.create(
+                name='Lapangan Baru', latitude=Decimal('-6.2000'), longitude=Decimal('106.8000'),
+                price_per_hour=Decimal('100000'), court_type='futsal',
+            )
+        self.assertIn(other.id, court_index.candidates(-6.9175, 107.6191, 1))
+
+        # Tanpa kenaikan versi sama sekali: catch-up berkala
+        CourtSearchEntry.objects.filter(pk=other.pk).update(
+            latitude=Decimal('-6.2000'), longitude=Decimal('106.8000'), synced_at=timezone.now(),
+        )
+        self.assertNotIn(other.id, court_index.candidates(-6.2, 106.8, 1))
+        later = timezone.now() + spatial.CATCH_UP_INTERVAL * 2
+        with patch('court_filter.spatial.timezone.now', return_value=later):
+            self.assertIn(other.id, court_index.candidates(-6.2, 106.8, 1))
+
+
+class WithinRadiusQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.near = Court.objects.create(
+            name='Lapangan Dekat', latitude=Decimal('-6.2000'), longitude=Decimal('106.8000'),
+            price_per_hour=Decimal('100000'), court_type='futsal',
+        )
+        cls.edge = Court.objects.create(
+            name='Lapangan Bekasi', latitude=Decimal('-6.2383'), longitude=Decimal('106.9756'),
+            price_per_hour=Decimal('100000'), court_type='tennis',
+        )
+        cls.far = Court.objects.create(
+            name='Lapangan Bandung', latitude=Decimal('-6.9175'), longitude=Decimal('107.6191'),
+            price_per_hour=Decimal('100000'), court_type='tennis',
+        )
+
+    def test_within_radius_annotates_exact_distance(self):
+        """Tes jarak hasil SQL sama dengan haversine Python."""
+        origin = (-6.2088, 106.8456)
+        courts = list(Court.objects.within_radius(*origin, 20).order_by('distance'))
+
+        self.assertEqual(courts, [self.near, self.edge])
+        for court in courts:
+            expected = haversine_distance(*origin, court.latitude, court.longitude)
+            self.assertAlmostEqual(court.distance, expected, places=6)
+
+    def test_within_radius_filters_outside_radius(self):
+        """Tes court di dalam bounding box tapi di luar radius tidak ikut."""
+        origin = (-6.2088, 106.8456)
+        self.assertEqual(list(Court.objects.within_radius(*origin, 10)), [self.near])
+        self.assertEqual(Court.objects.within_radius(*origin, 0.1).count(), 0)
+
+    def test_within_radius_uses_bounding_box(self):
+        """Tes query memakai filter latitude/longitude sehingga index bisa dipakai."""
+        sql = str(Court.objects.within_radius(-6.2088, 106.8456, 10).query)
+        self.assertIn('"latitude" BETWEEN', sql)
+        self.assertIn('"longitude" BETWEEN', sql)
+
+
+class GeoDistanceTests(TestCase):
+
+    def setUp(self):
+        self.ids = ['monas', 'senayan', 'bekasi', 'bandung']
+        self.lats = [Decimal('-6.175400'), Decimal('-6.218300'), Decimal('-6.238300'), Decimal('-6.917500')]
+        self.lons = [Decimal('106.827200'), Decimal('106.802300'), Decimal('106.975600'), Decimal('107.619100')]
+
+    def test_haversine_many_matches_scalar(self):
+        """Tes jarak vektor sama dengan haversine_distance satu per satu."""
+        distances = haversine_many(-6.2088, 106.8456, self.lats, self.lons)
+        self.assertEqual(distances.shape, (4,))
+        for distance, lat, lon in zip(distances, self.lats, self.lons):
+            self.assertAlmostEqual(distance, haversine_distance(-6.2088, 106.8456, lat, lon), places=9)
+
+    def test_haversine_matrix_shape_and_values(self):
+        """Tes matriks jarak M origin x N court."""
+        matrix = haversine_matrix([-6.2088, -6.9175], [106.8456, 107.6191], self.lats, self.lons)
+        self.assertEqual(matrix.shape, (2, 4))
+        self.assertAlmostEqual(matrix[1][3], 0.0)
+        self.assertAlmostEqual(
+            matrix[0][2], haversine_distance(-6.2088, 106.8456, self.lats[2], self.lons[2]), places=9
+        )
+
+    def test_coordinate_array_within_radius_and_nearest(self):
+        """Tes radius dan k-terdekat dari CoordinateArray."""
+        coords = CoordinateArray(self.ids, self.lats, self.lons)
+        self.assertTrue(coords.lat.flags['C_CONTIGUOUS'])
+
+        self.assertEqual([i for i, _ in coords.within_radius(-6.2088, 106.8456, 10)], ['monas', 'senayan'])
+        self.assertEqual([i for i, _ in coords.nearest(-6.2088, 106.8456, 3)], ['monas', 'senayan', 'bekasi'])
+        self.assertEqual(len(coords.nearest(-6.2088, 106.8456, 10)), 4)
+        self.assertEqual(coords.nearest(-6.2088, 106.8456, 0), [])
+
+    def test_coordinate_array_from_queryset(self):
+        """Tes CoordinateArray dibangun dari queryset Court."""
+        court = Court.objects.create(
+            name='Lapangan Array', latitude=Decimal('-6.2000'), longitude=Decimal('106.8000'),
+            price_per_hour=Decimal('100000'), court_type='futsal',
+        )
+        coords = CoordinateArray.from_queryset(Court.objects.all())
+        self.assertEqual(coords.ids, [court.id])
+        self.assertAlmostEqual(coords.distances_from(-6.2, 106.8)[0], 0.0)
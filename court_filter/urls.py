@@ -7,8 +7,18 @@ app_name = 'court_filter'
 urlpatterns = [
     path('', court_finder, name='court_finder'),
     path('api/geocode/', geocode_api, name='geocode_api'),
+    path('api/geocode/async/', geocode_api_async, name='geocode_api_async'),
     path('api/search/', search_courts, name='search_courts'),
+    path('api/autocomplete/', court_autocomplete, name='court_autocomplete'),
     path('api/bookmark/<uuid:court_id>/', toggle_bookmark, name='toggle_bookmark'),
+    path('api/bookmarks/sync/', sync_bookmarks, name='sync_bookmarks'),
     path('api/provinces/', get_provinces, name='get_provinces'),
-    path('detail/<path:court_name>/', views.court_detail_view, name='court_detail'),
+    path('api/constants/', constants_latest, name='constants_latest'),
+    path('api/constants/version/', constants_version, name='constants_version'),
+    path('api/constants/<str:version>/', constants_bundle_view, name='constants_bundle'),
+    path('api/export/<str:kind>/', export_data, name='export_data'),
+    path('c/<slug:slug>/', views.court_detail_view, name='court_detail'),
+    path('court/<uuid:court_id>/', views.court_detail_by_id, name='court_detail_by_id'),
+    # URL lama berbasis nama, sekarang hanya redirect permanen ke URL slug
+    path('detail/<path:court_name>/', views.court_detail_legacy, name='court_detail_legacy'),
 ]
\ No newline at end of file
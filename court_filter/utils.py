@@ -1,6 +1,16 @@
-from math import radians, sin, cos, sqrt, atan2
-import requests
+import hashlib
+import logging
+import re
+import time
+from math import radians, degrees, sin, cos, asin, sqrt, atan2
+from asgiref.sync import async_to_sync
 from django.core.cache import cache
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+from .singleflight import SingleFlight, AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     """
@@ -22,6 +32,48 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     return R * c
 
 
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Smallest lat/lon box that contains every point within radius_km of the origin
+    Returns: (min_lat, max_lat, min_lon, max_lon) in degrees
+    """
+    R = 6371  # Earth radius in kilometers
+
+    lat = float(latitude)
+    lon = float(longitude)
+    dlat = degrees(radius_km / R)
+
+    # Near the poles a single degree of longitude shrinks to nothing, so the box spans every longitude
+    if abs(lat) + dlat >= 90:
+        return max(lat - dlat, -90), min(lat + dlat, 90), -180.0, 180.0
+
+    dlon = degrees(asin(sin(radius_km / R) / cos(radians(lat))))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def haversine_expression(latitude, longitude, lat_field='latitude', lon_field='longitude'):
+    """
+    Haversine distance (km) from a fixed point to each row, as a SQL expression
+    Works on PostgreSQL and SQLite (Django registers the math functions there)
+    """
+    R = 6371  # Earth radius in kilometers
+
+    origin_lat = radians(float(latitude))
+    origin_lon = radians(float(longitude))
+
+    row_lat = Radians(Cast(F(lat_field), FloatField()))
+    row_lon = Radians(Cast(F(lon_field), FloatField()))
+    dlat = row_lat - Value(origin_lat)
+    dlon = row_lon - Value(origin_lon)
+
+    a = (
+        Power(Sin(dlat / Value(2.0)), 2)
+        + Value(cos(origin_lat)) * Cos(row_lat) * Power(Sin(dlon / Value(2.0)), 2)
+    )
+    # Least() guards asin against rounding pushing sqrt(a) just above 1
+    return Value(2.0 * R) * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
+
+
 def is_in_indonesia(latitude, longitude):
     """
     Check if coordinates are within Indonesia bounds (rough approximation)
@@ -32,43 +84,150 @@ def is_in_indonesia(latitude, longitude):
     return -11 <= lat <= 6 and 95 <= lon <= 141
 
 
+GEOCODE_CACHE_TIMEOUT = 60 * 60 * 24  # 24 jam untuk alamat yang ketemu
+GEOCODE_NEGATIVE_TIMEOUT = 60 * 10  # 10 menit untuk alamat yang tidak ketemu
+GEOCODE_NOT_FOUND = '__not_found__'
+GEOCODE_LOCK_TIMEOUT = 10
+GEOCODE_WAIT_INTERVAL = 0.1
+
+_geocode_flight = SingleFlight()
+_async_geocode_flight = AsyncSingleFlight()
+
+
+def normalize_address(address):
+    """
+    Canonical form of an address: trimmed, single-spaced, case-folded,
+    with a single space after every comma
+    """
+    address = ' '.join(str(address).split())
+    address = re.sub(r'\s*,\s*', ', ', address).strip(', ')
+    return address.casefold()
+
+
+def geocode_cache_key(address):
+    digest = hashlib.sha1(normalize_address(address).encode('utf-8')).hexdigest()
+    return f'geocode_{digest}'
+
+
+def _unwrap_cached(cached):
+    return None if cached == GEOCODE_NOT_FOUND else cached
+
+
 def geocode_address(address):
     """
     Convert address to coordinates using Nominatim (OpenStreetMap)
     Returns: {'latitude': float, 'longitude': float} or None if not found
     """
-    cache_key = f'geocode_{address}'
+    from .gazetteer import get_gazetteer
+
+    # Nama provinsi/kota yang umum dijawab dari gazetteer lokal tanpa request keluar
+    coords = get_gazetteer().resolve(address)
+    if coords is not None:
+        return coords
+
+    cache_key = geocode_cache_key(address)
     cached = cache.get(cache_key)
-    if cached:
-        return cached
-    
+    if cached is not None:
+        return _unwrap_cached(cached)
+
+    # Request yang sama dari thread lain di proses ini cukup menunggu satu panggilan
+    return _geocode_flight.do(cache_key, lambda: _geocode_shared(address, cache_key))
+
+
+def _geocode_shared(address, cache_key):
+    """
+    Coalesce across workers too: whoever takes the lock in the shared cache asks
+    Nominatim, the others poll the cache for the answer until the lock goes away.
+    The lock is only exclusive where cache.add is atomic (Redis); on the
+    file-based cache two workers can both take it and ask for the same address,
+    which costs a duplicate request but not a wrong answer.
+    """
+    lock_key = f'{cache_key}_lock'
+    deadline = time.monotonic() + GEOCODE_LOCK_TIMEOUT
+    while not cache.add(lock_key, 1, GEOCODE_LOCK_TIMEOUT):
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return _unwrap_cached(cached)
+        if time.monotonic() >= deadline:
+            # Pemegang lock terlalu lama, lanjut sendiri
+            return _geocode_and_cache(address, cache_key)
+        time.sleep(GEOCODE_WAIT_INTERVAL)
+
     try:
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            'q': address + ', Indonesia',  # Force Indonesia search
-            'format': 'json',
-            'limit': 1,
-            'countrycodes': 'id',  # Restrict to Indonesia
-        }
-        headers = {
-            'User-Agent': 'CourtFinder/1.0'
-        }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        response.raise_for_status()
-        
-        results = response.json()
-        if results:
-            result = results[0]
-            lat = float(result['lat'])
-            lon = float(result['lon'])
-            
-            # Validate coordinates are in Indonesia
-            if is_in_indonesia(lat, lon):
-                coords = {'latitude': lat, 'longitude': lon}
-                cache.set(cache_key, coords, 60 * 60 * 24)  # Cache for 24 hours
-                return coords
+        # Worker lain mungkin baru saja selesai sebelum kita dapat lock
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return _unwrap_cached(cached)
+        return _geocode_and_cache(address, cache_key)
+    finally:
+        cache.delete(lock_key)
+
+
+def _geocode_and_cache(address, cache_key):
+    from .geocoding import geocoder, GeocoderUnavailable
+
+    try:
+        coords = async_to_sync(geocoder.lookup)(address)
+    except GeocoderUnavailable as e:
+        # Error jaringan/server tidak di-cache, supaya request berikutnya bisa mencoba lagi
+        logger.warning('Geocoding error: %s', e)
         return None
-    except Exception as e:
-        print(f"Geocoding error: {e}")
-        return None
\ No newline at end of file
+
+    _store_geocode(cache_key, coords)
+    return coords
+
+
+def _store_geocode(cache_key, coords):
+    if coords is None:
+        cache.set(cache_key, GEOCODE_NOT_FOUND, GEOCODE_NEGATIVE_TIMEOUT)
+    else:
+        cache.set(cache_key, coords, GEOCODE_CACHE_TIMEOUT)
+
+
+def get_cached_geocode(address):
+    """
+    Look an address up in the geocode cache only
+    Returns: (hit, coords) - coords is None for a cached "not found"
+    """
+    cached = cache.get(geocode_cache_key(address))
+    if cached is None:
+        return False, None
+    return True, _unwrap_cached(cached)
+
+
+def store_geocode(address, coords):
+    """Cache a lookup made outside geocode_address (coords=None caches a miss)"""
+    _store_geocode(geocode_cache_key(address), coords)
+
+
+async def ageocode_address(address):
+    """
+    Async version of geocode_address for ASGI views: same gazetteer, cache and
+    negative cache, without tying up a thread while Nominatim answers.
+    Concurrent lookups for the same address in one event loop share a single request.
+    """
+    from .gazetteer import get_gazetteer
+    from .geocoding import geocoder, GeocoderUnavailable
+
+    coords = get_gazetteer().resolve(address)
+    if coords is not None:
+        return coords
+
+    cache_key = geocode_cache_key(address)
+    cached = await cache.aget(cache_key)
+    if cached is not None:
+        return _unwrap_cached(cached)
+
+    async def lookup():
+        try:
+            coords = await geocoder.lookup(address)
+        except GeocoderUnavailable as e:
+            logger.warning('Geocoding error: %s', e)
+            return None
+        if coords is None:
+            await cache.aset(cache_key, GEOCODE_NOT_FOUND, GEOCODE_NEGATIVE_TIMEOUT)
+        else:
+            await cache.aset(cache_key, coords, GEOCODE_CACHE_TIMEOUT)
+        return coords
+
+    return await _async_geocode_flight.do(cache_key, lookup)
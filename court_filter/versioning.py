@@ -0,0 +1,65 @@
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'version_'
+
+
+def _version_key(name):
+    return f'{VERSION_KEY_PREFIX}{name}'
+
+
+def _initial_version():
+    # Start from a timestamp instead of 1 so a version that was evicted from the cache
+    # never comes back with a value some worker has already seen.
+    return int(time.time() * 1000)
+
+
+def model_version_name(model):
+    """Counter name for "some row of this model changed", e.g. court_filter.province"""
+    return model._meta.label_lower
+
+
+def get_version(name):
+    """
+    Current value of a shared version counter (created on first read)
+    """
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key, _initial_version())
+    return version
+
+
+def bump_version(name):
+    """
+    Increment a shared version counter so every worker notices the data changed
+    Returns: the new version
+    """
+    key = _version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key missing or evicted: start a fresh counter
+        cache.add(key, _initial_version(), None)
+        return cache.get(key)
+
+
+def touch_version(name):
+    """
+    Like bump_version, but the counter also moves to at least the current time
+    in milliseconds, so its value can double as a Last-Modified timestamp.
+    Returns: the new version
+    """
+    key = _version_key(name)
+    now = _initial_version()
+    current = cache.get(key)
+    if current is not None:
+        try:
+            return cache.incr(key, max(1, now - current))
+        except ValueError:
+            pass  # evicted between get and incr
+    if cache.add(key, now, None):
+        return now
+    return cache.incr(key)
@@ -1,21 +1,53 @@
-from django.shortcuts import render
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.shortcuts import render, redirect
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_http_methods, require_GET, require_POST
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.db import transaction
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from decimal import Decimal
-from .models import Court, Bookmark, Province
-from .serializers import CourtSerializer, ProvinceSerializer
-from .utils import haversine_distance, geocode_address, is_in_indonesia
+from decimal import Decimal, InvalidOperation
+from .models import Court, CourtSearchEntry, Bookmark, Province, Facility
+from .serializers import CourtSerializer
+from .utils import geocode_address, ageocode_address, haversine_expression, is_in_indonesia
+from .spatial import court_index
+from . import bitmask, fulltext
+from .read_model import detail_url
+from .conditional import PROVINCES_VERSION, court_detail_versions, versioned
+from .constants_bundle import constants_bundle
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+from .search_cache import search_cache_key, get_cached_search, set_cached_search
+from .bookmark_cache import get_bookmarked_ids, bookmarks_changed, sync_token
+from .exporting import EXPORTS, EXPORT_FORMATS, CONTENT_TYPES, export_lines
 from django.shortcuts import get_object_or_404
 from urllib.parse import unquote
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import authentication_classes
 from rest_framework.permissions import AllowAny
+from django.conf import settings
 import json
+import math
+import uuid
+from datetime import timezone as dt_timezone
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 100
+MAX_LIMIT = 500
+DEFAULT_PAGE_SIZE = settings.REST_FRAMEWORK.get('PAGE_SIZE', 50)
+MAX_PAGE_SIZE = 200
+DEFAULT_AUTOCOMPLETE = 10
+MAX_AUTOCOMPLETE = 20
+MAX_SYNC_OPERATIONS = 500
+MAX_NEAREST_CANDIDATES = 2000
+# Cursor [jarak atau -relevansi, id] untuk halaman yang diurutkan di Python
+NUMBER_CURSOR = (float, str)
+SYNC_ACTIONS = ('add', 'remove')
+CONSTANTS_MAX_AGE = 60 * 60 * 24 * 365  # URL bundle memuat hash isinya, jadi aman di-cache lama
 
 @require_http_methods(["GET"])
 def court_finder(request):
@@ -26,6 +58,7 @@ def court_finder(request):
     context = {
         'provinces': provinces,
         'court_types': court_types,
+        'facilities': Facility.objects.order_by('name'),
         'default_lat': -6.2088,  # Jakarta
         'default_lon': 106.8456,
         'is_authenticated': request.user.is_authenticated,  # ← TAMBAH INI
@@ -53,6 +86,38 @@ def geocode_api(request):
             status=status.HTTP_404_NOT_FOUND
         )
 
+@require_POST
+async def geocode_api_async(request):
+    """
+    Async twin of geocode_api for ASGI deployments (court_finder/asgi.py):
+    the lookup is awaited, so a slow Nominatim doesn't hold a worker thread.
+    Accepts a JSON body or form data with `address`.
+    """
+    address = request.POST.get('address')
+    if not address and request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = {}
+        address = data.get('address') if isinstance(data, dict) else None
+
+    if not address:
+        return JsonResponse({'error': 'Alamat harus diisi'}, status=400)
+
+    coords = await ageocode_address(address)
+    if coords:
+        return JsonResponse(coords)
+    return JsonResponse({'error': 'Alamat tidak ditemukan di Indonesia'}, status=404)
+
+def _court_json(document, is_bookmarked, distance):
+    """
+    A court's stored search document (CourtSearchEntry.document) with the
+    per-request fields appended, as JSON text: no dict is built per court.
+    """
+    distance = 'null' if distance is None else repr(round(distance, 2))
+    return f'{document[:-1]},"is_bookmarked":{"true" if is_bookmarked else "false"},"distance":{distance}}}'
+
+
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     def enforce_csrf(self, request):
         return  # Tidak melakukan apa-apa (Bypass CSRF)
@@ -64,8 +129,14 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
 def search_courts(request):
     """
     Search courts with dynamic logic:
-    - If lat/lon are provided: search by 10km radius.
+    - If lat/lon are provided: search by `radius` km (default 10km), nearest first.
+      With `limit` and no `radius`: the `limit` nearest courts, however far away.
     - If lat/lon are NOT provided: search by filters across the entire database.
+    `facilities` (names) keeps only courts that have every one of them.
+    `q` is a full-text query over name, address and description; without
+    lat/lon the matches come best first.
+    Results are paged by cursor (`page_size`, `cursor` -> `next_cursor`),
+    ordered by distance, name or relevance (`order`).
     """
     # FIX: request.data adalah dict, bukan QueryDict
     # Ambil data dengan .get() untuk single value atau langsung akses untuk list
@@ -81,112 +152,295 @@ def search_courts(request):
         except json.JSONDecodeError:
             pass
 
-    # 1. Ambil court_types
-    court_types_data = data.get('court_types[]') or data.get('court_types') # Pakai 'data', bukan 'request.data'
-    if court_types_data:
-        if isinstance(court_types_data, list):
-            court_types = court_types_data
-        else:
-            court_types = [court_types_data]
-    else:
-        court_types = []
+    # 1. Ambil court_types dan facilities (form-data bisa kirim banyak nilai)
+    court_types = _get_list(data, 'court_types')
+    # Lapangan harus punya SEMUA fasilitas yang diminta
+    facility_names = _get_list(data, 'facilities')
     
     # 2. Ambil parameter lain (Gunakan 'data')
-    province_name = data.get('province')
-    price_min = data.get('price_min')
-    price_max = data.get('price_max')
-    bookmarked_only = str(data.get('bookmarked_only')).lower() == 'true'
-    
+    province_name = data.get('province') or None
+    bookmarked_only = str(data.get('bookmarked_only')).lower() == 'true' and request.user.is_authenticated
+    try:
+        price_min = _parse_price(data.get('price_min'))
+        price_max = _parse_price(data.get('price_max'))
+    except InvalidOperation:
+        return Response({'error': 'Harga tidak valid'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 3. Parameter radius / limit (k terdekat) / pagination
+    try:
+        radius_km = _parse_number(data.get('radius'), float, 0, MAX_RADIUS_KM)
+        limit = _parse_number(data.get('limit'), int, 1, MAX_LIMIT)
+        page_size = _parse_number(data.get('page_size'), int, 1, MAX_PAGE_SIZE) or DEFAULT_PAGE_SIZE
+    except ValueError:
+        return Response(
+            {'error': f'Parameter tidak valid (radius maks {MAX_RADIUS_KM} km, limit maks {MAX_LIMIT}, '
+                      f'page_size maks {MAX_PAGE_SIZE})'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    cursor = data.get('cursor') or None
+
+    has_coords = data.get('latitude') not in (None, '') and data.get('longitude') not in (None, '') # Pakai 'data'
+    latitude = longitude = None
+    if has_coords:
+        try:
+            latitude = float(data.get('latitude'))
+            longitude = float(data.get('longitude'))
+            if not (math.isfinite(latitude) and math.isfinite(longitude)):
+                raise ValueError('nan/inf')
+        except (TypeError, ValueError):
+            return Response({'error': 'Latitude dan longitude tidak valid'}, status=status.HTTP_400_BAD_REQUEST)
+    q = fulltext.normalize_query(data.get('q') or '')
+    if has_coords:
+        order = data.get('order') or 'distance'
+    else:
+        order = 'relevance' if q else 'name'
+
+    # Set bookmark user dari cache (lihat bookmark_cache.py), dipakai untuk filter dan flag is_bookmarked
+    bookmarked_ids = get_bookmarked_ids(request.user.pk)
+
+    # 4. Hasil pencarian di-cache per kombinasi filter (tanpa is_bookmarked, itu per user)
+    cache_key = search_cache_key({
+        'q': q,
+        'court_types': court_types,
+        'facilities': facility_names,
+        'province': province_name,
+        'price_min': price_min,
+        'price_max': price_max,
+        'latitude': latitude,
+        'longitude': longitude,
+        'radius': radius_km,
+        'limit': limit,
+        'order': order,
+        'page_size': page_size,
+        'cursor': cursor,
+    }, bookmarks_user_id=request.user.pk if bookmarked_only else None)
+    result = get_cached_search(cache_key)
+
+    if result is None:
+        queryset = _filter_courts(
+            court_types, province_name, price_min, price_max,
+            bookmarked_ids if bookmarked_only else None, facility_names,
+        )
+
+        # --- LOGIKA UTAMA: Cek apakah ini pencarian RADIUS atau FILTER ---
+        try:
+            if has_coords:
+                if q and order != 'relevance':
+                    # Tanpa batas MAX_MATCHES: yang cocok di dekat titik tidak boleh kalah dari yang jauh
+                    queryset = fulltext.matching(queryset, q)
+                if limit and radius_km is None:
+                    # k terdekat tanpa batas radius: kandidat dari spatial index
+                    courts, next_cursor = _page_nearest(queryset, latitude, longitude, limit, cursor, page_size)
+                else:
+                    # Bounding box + jarak haversine dihitung di database
+                    courts = queryset.within_radius(latitude, longitude, radius_km or DEFAULT_RADIUS_KM)
+                    if order == 'relevance' and q:
+                        # Radius ikut di dalam query full-text, jadi batasnya hanya menghitung court di sekitar
+                        matches = fulltext.search(q, courts)
+                        courts, next_cursor = _page_ranked(courts, matches, cursor, page_size, limit)
+                    else:
+                        courts, next_cursor = _page_courts(courts, order, cursor, page_size, limit)
+            elif q:
+                # TIPE 3: PENCARIAN TEKS
+                # Id yang cocok (sudah urut relevansi) dari index full-text; filter lain ikut di query yang sama
+                matches = fulltext.search(q, queryset)
+                courts, next_cursor = _page_ranked(queryset, matches, cursor, page_size, limit)
+            else:
+                # TIPE 2: PENCARIAN FILTER
+                courts, next_cursor = _page_courts(queryset, 'name', cursor, page_size, limit)
+        except (ValueError, InvalidCursor) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = {
+            'courts': [
+                (str(court.id), court.document, getattr(court, 'distance', None)) for court in courts
+            ],
+            'next_cursor': next_cursor,
+        }
+        set_cached_search(cache_key, result)
+
+    # Dokumen JSON yang tersimpan langsung disambung jadi body response
+    bookmarked = {str(court_id) for court_id in bookmarked_ids}
+    courts_json = ','.join(
+        _court_json(document, court_id in bookmarked, distance)
+        for court_id, document, distance in result['courts']
+    )
+    body = '{"courts":[%s],"count":%d,"next_cursor":%s}' % (
+        courts_json, len(result['courts']), json.dumps(result['next_cursor']),
+    )
+    return HttpResponse(body, content_type='application/json')
+
+
+def _get_list(data, name):
+    """Sorted unique values of a list parameter sent as `name[]`, `name` or a JSON list."""
+    if hasattr(data, 'getlist'):
+        values = data.getlist(f'{name}[]') or data.getlist(name)
+    else:
+        values = data.get(f'{name}[]') or data.get(name) or []
+    if not isinstance(values, list):
+        values = [values]
+    return sorted(set(values))
+
+
+def _filter_courts(court_types, province_name, price_min, price_max, bookmarked_ids=None, facility_names=()):
+    """
+    Active courts from both sources matching the non-location filters, loading only
+    what the response needs. Courts without coordinates yet (see geocode_courts) are left out, they can't go on the map.
+    """
     # Mulai dengan queryset dasar
-    queryset = Court.objects.filter(is_active=True)
-    
-    # --- Terapkan SEMUA filter non-lokasi terlebih dahulu ---
+    queryset = CourtSearchEntry.objects.filter(
+        is_active=True, latitude__isnull=False, longitude__isnull=False
+    )
     
     if province_name:
-        queryset = queryset.filter(provinces__name=province_name)
-    
-    if price_min:
-        queryset = queryset.filter(price_per_hour__gte=Decimal(price_min))
-    if price_max:
-        queryset = queryset.filter(price_per_hour__lte=Decimal(price_max))
-    
-    if court_types:
-        types_to_search = list(court_types)
-        
-        if 'futsal' in types_to_search:
-            types_to_search.append('futsal')
-        
-        if 'other' not in types_to_search:
-            queryset = queryset.filter(court_type__in=types_to_search)
-    
-    if bookmarked_only and request.user.is_authenticated:
-        bookmarked_court_ids = Bookmark.objects.filter(user=request.user).values_list('court_id', flat=True)
-        queryset = queryset.filter(id__in=bookmarked_court_ids)
-    
-    # --- LOGIKA UTAMA: Cek apakah ini pencarian RADIUS atau FILTER ---
+        province_id = Province.objects.filter(name=province_name).values_list('id', flat=True).first()
+        if province_id is None:
+            queryset = queryset.none()
+        elif bitmask.fits(province_id):
+            queryset = queryset.has_bits('province_mask', [province_id])
+        else:
+            queryset = queryset.filter(provinces=province_id)
     
-    final_courts_data = []
+    if price_min is not None:
+        queryset = queryset.filter(price_per_hour__gte=price_min)
+    if price_max is not None:
+        queryset = queryset.filter(price_per_hour__lte=price_max)
     
-    if 'latitude' in data and 'longitude' in data: # Pakai 'data'
-        latitude = float(data.get('latitude'))
-        longitude = float(data.get('longitude'))
-        radius_km = 10
-        
-        courts_with_distance = []
-        for court in queryset:
-            distance = haversine_distance(latitude, longitude, float(court.latitude), float(court.longitude))
-            if distance <= radius_km:
-                courts_with_distance.append((court, distance))
-        
-        # Urutkan berdasarkan jarak terdekat
-        courts_with_distance.sort(key=lambda x: x[1])
-        
-        # Siapkan data untuk response
-        for court, distance in courts_with_distance:
-            is_bookmarked = request.user.is_authenticated and Bookmark.objects.filter(user=request.user, court=court).exists()
-            final_courts_data.append({
-                'id': str(court.id),  # Convert UUID to string
-                'name': court.name,
-                'address': court.address,
-                'court_type': court.court_type,
-                'location_type': court.location_type,
-                'latitude': float(court.latitude),
-                'longitude': float(court.longitude),
-                'price_per_hour': float(court.price_per_hour),
-                'phone_number': court.phone_number,
-                'description': court.description,
-                'provinces': [{'id': p.id, 'name': p.name} for p in court.provinces.all()],
-                'facilities': [f.name for f in court.facilities.all()],
-                'is_bookmarked': is_bookmarked,
-                'distance': round(distance, 2)
-            })
-    else:
-        # TIPE 2: PENCARIAN FILTER
-        queryset = queryset.order_by('name')
-        
-        for court in queryset:
-            is_bookmarked = request.user.is_authenticated and Bookmark.objects.filter(user=request.user, court=court).exists()
-            final_courts_data.append({
-                'id': str(court.id),  # Convert UUID to string
-                'name': court.name,
-                'address': court.address,
-                'court_type': court.court_type,
-                'location_type': court.location_type,
-                'latitude': float(court.latitude),
-                'longitude': float(court.longitude),
-                'price_per_hour': float(court.price_per_hour),
-                'phone_number': court.phone_number,
-                'description': court.description,
-                'provinces': [{'id': p.id, 'name': p.name} for p in court.provinces.all()],
-                'facilities': [f.name for f in court.facilities.all()],
-                'is_bookmarked': is_bookmarked,
-                'distance': None
-            })
+    if court_types and 'other' not in court_types:
+        queryset = queryset.filter(court_type__in=court_types)
+
+    if facility_names:
+        facility_ids = list(Facility.objects.filter(name__in=facility_names).values_list('id', flat=True))
+        if len(facility_ids) < len(facility_names):
+            queryset = queryset.none()
+        else:
+            # Satu tes bitwise untuk semua fasilitas; hanya id di luar jangkauan mask yang perlu join
+            queryset = queryset.has_bits('facility_mask', [pk for pk in facility_ids if bitmask.fits(pk)])
+            for pk in facility_ids:
+                if not bitmask.fits(pk):
+                    queryset = queryset.filter(facilities=pk)
+
+    if bookmarked_ids is not None:
+        queryset = queryset.filter(id__in=bookmarked_ids)
+
+    # Cukup kolom untuk urutan/cursor dan dokumen JSON-nya
+    return queryset.only('id', 'name', 'latitude', 'longitude', 'document')
+
+
+def _parse_price(value):
+    if value in (None, ''):
+        return None
+    price = Decimal(str(value))
+    if not price.is_finite():
+        raise InvalidOperation(value)
+    return price.normalize()
+
+
+def _parse_number(value, cast, minimum, maximum):
+    """Parse an optional numeric parameter; raises ValueError if it is out of range."""
+    if value in (None, ''):
+        return None
+    number = cast(value)
+    if not minimum <= number <= maximum or (cast is float and number == 0):
+        raise ValueError(value)
+    return number
+
+
+def _page_courts(queryset, order, cursor, page_size, limit=None):
+    """
+    Keyset page over a queryset ordered by 'distance' or 'name' (id breaks ties).
+    With a limit only the first `limit` courts overall are ever returned.
+    """
+    if order not in ('distance', 'name'):
+        raise ValueError("Order harus 'distance', 'name', atau 'relevance' (dengan q)")
+    fields = [order, 'id']
+    kinds = (float if order == 'distance' else str, str)
+
+    if not limit:
+        return keyset_page(queryset, fields, cursor, page_size, kinds=kinds)
+
+    # limit = k: ambil k teratas dulu, lalu halaman berikutnya dipotong dari sana
+    top = list(queryset.order_by(*fields)[:limit])
+    return _page_list(top, lambda court: [getattr(court, order), str(court.id)], cursor, page_size, kinds)
+
+
+def _page_nearest(queryset, latitude, longitude, k, cursor, page_size):
+    """
+    k nearest courts (after filters), using the spatial index for candidates so
+    no radius is needed. Candidates are checked against the filters in batches
+    that grow until k matches are found or the index runs out. Filters too
+    selective for MAX_NEAREST_CANDIDATES candidates fall back to ordering by
+    the haversine distance in SQL.
+    """
+    wanted = min(k * 2, MAX_NEAREST_CANDIDATES)
+    while True:
+        candidates = court_index.nearest(latitude, longitude, wanted)
+        distances = dict(candidates)
+        matched_ids = set(
+            queryset.filter(id__in=list(distances)).values_list('id', flat=True)
+        )
+        if len(matched_ids) >= k or len(candidates) < wanted:
+            break
+        if wanted >= MAX_NEAREST_CANDIDATES:
+            # Daftar id__in tidak boleh terus membesar (batas variabel SQLite)
+            top = list(
+                queryset.annotate(distance=haversine_expression(latitude, longitude))
+                .order_by('distance', 'id')[:k]
+            )
+            return _page_list(top, lambda court: [court.distance, str(court.id)], cursor, page_size, NUMBER_CURSOR)
+        wanted = min(wanted * 4, MAX_NEAREST_CANDIDATES)
+
+    nearest_ids = [court_id for court_id, _ in candidates if court_id in matched_ids][:k]
+    courts = {court.id: court for court in queryset.filter(id__in=nearest_ids)}
+    top = []
+    for court_id in nearest_ids:
+        court = courts.get(court_id)
+        if court is not None:
+            court.distance = distances[court_id]
+            top.append(court)
+    return _page_list(top, lambda court: [court.distance, str(court.id)], cursor, page_size, NUMBER_CURSOR)
 
-    return Response({
-        'courts': final_courts_data,
-        'count': len(final_courts_data)
-    }, status=status.HTTP_200_OK)
+
+def _page_ranked(queryset, matches, cursor, page_size, limit=None):
+    """
+    Page through full-text matches [(id, relevance), ...] best first, keeping
+    only the ones still in `queryset` (the other filters).
+    """
+    relevance = dict(matches)
+    courts = {court.id: court for court in queryset.filter(id__in=list(relevance))}
+    ranked = [courts[court_id] for court_id, _ in matches if court_id in courts][:limit or None]
+    for court in ranked:
+        court.relevance = relevance[court.id]
+    return _page_list(ranked, lambda court: [-court.relevance, str(court.id)], cursor, page_size, NUMBER_CURSOR)
+
+
+def _page_list(items, sort_key, cursor, page_size, kinds):
+    """
+    Keyset page over an already sorted list (same cursor format as keyset_page).
+    kinds: the types of sort_key's values, checked before the cursor is compared
+    """
+    if cursor:
+        after = decode_cursor(cursor, 2, kinds)
+        keys = [sort_key(item) for item in items]
+        if after in keys:
+            items = items[keys.index(after) + 1:]
+        else:
+            items = [item for item, key in zip(items, keys) if key > after]
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    return items, encode_cursor(sort_key(items[-1]))
+
+
+# Bookmark hanya untuk court_filter.Court; hasil search dari manage_court tidak menampilkan bintang
+NOT_BOOKMARKABLE = 'Lapangan dari Manage Court belum bisa di-bookmark'
+
+
+def _managed_entry_ids(ids):
+    return set(
+        CourtSearchEntry.objects.filter(pk__in=ids, source=CourtSearchEntry.SOURCE_MANAGE_COURT)
+        .values_list('pk', flat=True)
+    )
 
 
 @csrf_exempt
@@ -194,48 +448,246 @@ def search_courts(request):
 @authentication_classes([CsrfExemptSessionAuthentication])
 @permission_classes([IsAuthenticated])
 def toggle_bookmark(request, court_id):
-    try:
-        court = Court.objects.get(id=court_id, is_active=True)
-    except Court.DoesNotExist:
+    # Satu operasi atomik (lihat BookmarkQuerySet.toggle), jadi double tap dari Flutter aman
+    bookmarked = Bookmark.objects.toggle(request.user.pk, court_id)
+    if bookmarked is None:
+        if _managed_entry_ids([court_id]):
+            return Response({'error': NOT_BOOKMARKABLE}, status=status.HTTP_400_BAD_REQUEST)
         return Response({'error': 'Lapangan tidak ditemukan'}, status=404)
 
-    # --- LOGIKA SMART TOGGLE ---
-    
-    # 1. Cari apakah bookmark sudah ada?
-    bookmark = Bookmark.objects.filter(user=request.user, court=court).first()
+    # Raw SQL tidak mengirim signal: set bookmark di cache dimuat ulang di request berikutnya
+    bookmarks_changed(request.user.pk)
 
-    if bookmark:
-        # KALO UDAH ADA -> HAPUS
-        bookmark.delete()
-        return Response({
-            'message': 'Bookmark dihapus', 
-            'bookmarked': False # <-- Info penting buat Flutter: "Matiin lampunya!"
-        }, status=200)
-    else:
-        # KALO BELUM ADA -> TAMBAH
-        Bookmark.objects.create(user=request.user, court=court)
+    if bookmarked:
         return Response({
             'message': 'Bookmark ditambahkan', 
             'bookmarked': True # <-- Info penting buat Flutter: "Nyalain lampunya!"
         }, status=200)
+    return Response({
+        'message': 'Bookmark dihapus', 
+        'bookmarked': False # <-- Info penting buat Flutter: "Matiin lampunya!"
+    }, status=200)
 
+def _client_timestamp(value, now):
+    if value in (None, ''):
+        return now
+    timestamp = parse_datetime(str(value))
+    if timestamp is None:
+        raise ValueError(f'timestamp tidak valid: {value!r}')
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, dt_timezone.utc)
+    # Jam HP yang kecepatan tidak boleh menang atas perubahan yang sudah ada di server
+    return min(timestamp, now)
+
+
+def _sync_operations(data):
+    """
+    data: {"operations": [{"court_id", "action": "add"|"remove", "timestamp"}, ...]}
+    Returns: {court_id: (action, timestamp)}, the latest operation per court
+    """
+    operations = data.get('operations')
+    if not isinstance(operations, list):
+        raise ValueError('operations harus berupa list')
+    if len(operations) > MAX_SYNC_OPERATIONS:
+        raise ValueError(f'Maksimal {MAX_SYNC_OPERATIONS} operasi per sync')
+
+    now = timezone.now()
+    latest = {}
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise ValueError('Setiap operasi harus berupa object')
+        try:
+            court_id = uuid.UUID(str(operation.get('court_id')))
+        except ValueError:
+            raise ValueError(f'court_id tidak valid: {operation.get("court_id")!r}')
+        action = operation.get('action')
+        if action not in SYNC_ACTIONS:
+            raise ValueError(f'action harus salah satu dari: {", ".join(SYNC_ACTIONS)}')
+        timestamp = _client_timestamp(operation.get('timestamp'), now)
+        # Timestamp sama: operasi yang belakangan di list yang menang
+        if court_id not in latest or timestamp >= latest[court_id][1]:
+            latest[court_id] = (action, timestamp)
+    return latest
+
+
+@csrf_exempt
+@api_view(['GET', 'POST'])
+@authentication_classes([CsrfExemptSessionAuthentication])
+@permission_classes([IsAuthenticated])
+def sync_bookmarks(request):
+    """
+    Bookmark sync for offline clients.
+    GET ?since=<sync_token>: {"changed": false} if nothing changed since that token, else the full set.
+    POST {"operations": [...]}: applies the latest operation per court in one
+    transaction (bulk insert / one delete) and returns the final set.
+    A remove older than the server's bookmark (re-added elsewhere since) is skipped.
+    """
+    user_id = request.user.pk
+    if request.method == 'GET':
+        token = sync_token(user_id)
+        if request.GET.get('since') == token:
+            return Response({'changed': False, 'sync_token': token})
+        bookmarks = get_bookmarked_ids(user_id)
+        return Response({'changed': True, 'sync_token': token, 'bookmarks': sorted(map(str, bookmarks))})
+
+    try:
+        operations = _sync_operations(request.data)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    skipped = []
+    with transaction.atomic():
+        existing = dict(
+            Bookmark.objects.filter(user_id=user_id, court_id__in=list(operations))
+            .values_list('court_id', 'created_at')
+        )
+        to_remove, to_add = [], []
+        for court_id, (action, timestamp) in operations.items():
+            if action == 'remove' and court_id in existing:
+                if existing[court_id] > timestamp:
+                    skipped.append({'court_id': str(court_id), 'reason': 'stale'})
+                else:
+                    to_remove.append(court_id)
+            elif action == 'add' and court_id not in existing:
+                to_add.append(court_id)
+
+        active = set(Court.objects.filter(pk__in=to_add, is_active=True).values_list('pk', flat=True))
+        managed = _managed_entry_ids([court_id for court_id in to_add if court_id not in active])
+        skipped.extend(
+            {'court_id': str(court_id), 'reason': 'not_bookmarkable' if court_id in managed else 'not_found'}
+            for court_id in to_add if court_id not in active
+        )
+        to_add = [court_id for court_id in to_add if court_id in active]
+
+        removed = Bookmark.objects.remove_many(user_id, to_remove)
+        # bulk_create tidak mengirim signal; cache diurus di bawah sekali saja
+        Bookmark.objects.bulk_create(
+            [Bookmark(user_id=user_id, court_id=court_id) for court_id in to_add], ignore_conflicts=True
+        )
+
+    if removed or to_add:
+        bookmarks_changed(user_id)
+    # Token dibaca sebelum set-nya: perubahan di antaranya paling-paling membuat sync berikutnya mengirim ulang set
+    token = sync_token(user_id)
+    bookmarks = get_bookmarked_ids(user_id)
+    return Response({
+        'changed': True,
+        'sync_token': token,
+        'bookmarks': sorted(map(str, bookmarks)),
+        'added': len(to_add),
+        'removed': removed,
+        'skipped': skipped,
+    })
+
+@require_GET
+def court_autocomplete(request):
+    """
+    Court name suggestions while typing: ?q=gor sen&limit=10
+    Every word must start a word of the name; answered from the full-text
+    prefix index and cached per query until courts change.
+    """
+    q = fulltext.normalize_query(request.GET.get('q', ''))
+    try:
+        limit = _parse_number(request.GET.get('limit'), int, 1, MAX_AUTOCOMPLETE) or DEFAULT_AUTOCOMPLETE
+    except ValueError:
+        return JsonResponse({'error': f'limit harus 1-{MAX_AUTOCOMPLETE}'}, status=400)
+
+    cache_key = search_cache_key({'autocomplete': q, 'limit': limit})
+    results = get_cached_search(cache_key)
+    if results is None:
+        results = [
+            {'id': str(entry_id), 'name': name, 'detail_url': detail_url(source, source_id)}
+            for entry_id, name, source, source_id in fulltext.autocomplete(q, limit)
+        ]
+        set_cached_search(cache_key, results)
+    return JsonResponse({'results': results})
+
+@versioned([PROVINCES_VERSION])
 @api_view(['GET'])
 def get_provinces(request):
     """Get all provinces"""
-    provinces = Province.objects.all()
-    serializer = ProvinceSerializer(provinces, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(constants_bundle.content()['provinces'], status=status.HTTP_200_OK)
 
-def court_detail_view(request, court_name):
-    # Decode nama dari URL
-    decoded_name = unquote(court_name)
-    
-    # Get court by name
-    court = get_object_or_404(Court, name=decoded_name)
-    
+
+@require_GET
+@condition(etag_func=lambda request: constants_bundle.version())
+def constants_version(request):
+    """Cheap check for the Flutter app: is its cached constants bundle still current?"""
+    version = constants_bundle.version()
+    response = JsonResponse({
+        'version': version,
+        'url': reverse('court_filter:constants_bundle', args=[version]),
+    })
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@require_GET
+def constants_latest(request):
+    response = redirect('court_filter:constants_bundle', version=constants_bundle.version())
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@require_GET
+def constants_bundle_view(request, version):
+    """The bundle under its content hash: never changes, so it may be cached for a year."""
+    current, body = constants_bundle.body()
+    if version != current:
+        return constants_latest(request)
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = f'"{current}"'
+    patch_cache_control(response, public=True, max_age=CONSTANTS_MAX_AGE, immutable=True)
+    return response
+
+@require_GET
+def export_data(request, kind):
+    """
+    Stream every court or bookmark as NDJSON (default) or CSV: ?format=csv
+    Admin only. Rows are encoded as they are read, so memory stays flat.
+    """
+    if not (request.user.is_authenticated and request.user.is_admin()):
+        return JsonResponse({'error': 'Hanya admin yang dapat mengekspor data'}, status=403)
+
+    if kind not in EXPORTS:
+        return JsonResponse({'error': 'Data yang bisa diekspor: courts, bookmarks'}, status=404)
+
+    fmt = request.GET.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Format harus salah satu dari: {", ".join(EXPORT_FORMATS)}'}, status=400)
+
+    response = StreamingHttpResponse(export_lines(kind, fmt), content_type=CONTENT_TYPES[fmt])
+    filename = f'{kind}-{timezone.now():%Y%m%d}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@versioned(court_detail_versions, per_user=True)
+def court_detail_view(request, slug):
+    court = get_object_or_404(Court, slug=slug)
+    return _render_court_detail(request, court)
+
+
+@versioned(court_detail_versions, per_user=True)
+def court_detail_by_id(request, court_id):
+    # Link dari hasil search (detail_url) memakai route ini
+    court = get_object_or_404(Court, pk=court_id)
+    return _render_court_detail(request, court)
+
+
+def court_detail_legacy(request, court_name):
+    """Old /detail/<name>/ links: permanent redirect to the court's slug URL."""
+    court = (
+        Court.objects.filter(name=unquote(court_name))
+        .order_by('created_at', 'pk').only('slug').first()
+    )
+    if court is None:
+        raise Http404('Court tidak ditemukan')
+    return redirect('court_filter:court_detail', slug=court.slug, permanent=True)
+
+
+def _render_court_detail(request, court):
     context = {
         'court': court,
         'is_authenticated': request.user.is_authenticated,
     }
-    
-    return render(request, 'court_filter/court_detail.html', context)
\ No newline at end of file
+    return render(request, 'court_filter/court_detail.html', context)
@@ -2,6 +2,8 @@
 ASGI config for court_finder project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Async views such as court_filter's ``geocode_api_async`` run on the event loop
+when served from here (e.g. ``uvicorn court_finder.asgi:application``).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from dotenv import load_dotenv
 from pathlib import Path
 import re
@@ -167,6 +168,41 @@ else:
     }
 
 
+# Cache
+# Shared by every gunicorn worker (geocoding results, search results, version counters).
+# Default: file-based cache, no server needed. Set REDIS_URL (and `pip install redis`) to use Redis.
+# The file-based cache has no atomic add/incr: version counters can skip a bump when two
+# workers write at once (readers only ever compare them for inequality, see
+# court_filter/versioning.py) and the cross-worker geocoding lock is best effort, so two
+# workers may both ask Nominatim for the same address. Redis makes both atomic.
+# Tests get a per-process LocMem cache so they never share state with .django_cache.
+REDIS_URL = os.getenv('REDIS_URL')
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'court-finder-tests',
+        }
+    }
+elif REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', BASE_DIR / '.django_cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
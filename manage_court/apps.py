@@ -1,2 +1,8 @@
 from django.apps import AppConfig
 
+
+class ManageCourtConfig(AppConfig):
+    name = 'manage_court'
+
+    def ready(self):
+        import manage_court.signals
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from court_filter.geocoding import NominatimClient, GeocoderUnavailable
+from court_filter.read_model import MANAGE_COURT, sync_courts, refresh_search
+from court_filter.utils import get_cached_geocode, store_geocode
+from manage_court.models import Court
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, '.geocode_courts_checkpoint.json')
+
+
+class RateLimiter:
+    """
+    Spaces calls at least 1/rate seconds apart across all threads
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Command(BaseCommand):
+    help = 'Geocode courts that have no latitude/longitude yet (resumable, rate limited for Nominatim)'
+
+    def add_arguments(self, parser):
+        # Kebijakan Nominatim: maksimal 1 request per detik
+        parser.add_argument('--rate', type=float, default=1.0,
+                            help='Max Nominatim requests per second (default: 1, the Nominatim usage policy limit)')
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Concurrent lookups, so network latency overlaps the rate limit wait (default: 2)')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Courts geocoded and saved per batch (default: 50)')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many courts')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                            help=f'Progress file used to resume (default: {DEFAULT_CHECKPOINT})')
+        parser.add_argument('--reset', action='store_true',
+                            help='Ignore the checkpoint and retry every court without coordinates')
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint']
+        checkpoint = {} if options['reset'] else self._load_checkpoint(checkpoint_path)
+        last_pk = checkpoint.get('last_pk', 0)
+        retry_ids = set(checkpoint.get('failed_ids', []))
+
+        missing = Court.objects.filter(Q(latitude__isnull=True) | Q(longitude__isnull=True))
+        # Lanjut dari checkpoint, plus yang gagal karena error (bukan "tidak ketemu") di run sebelumnya
+        pending = missing.filter(Q(pk__gt=last_pk) | Q(pk__in=retry_ids)).order_by('pk')
+        pending_ids = list(pending.values_list('pk', flat=True)[:options['limit']])
+        total = len(pending_ids)
+        if not total:
+            self.stdout.write(self.style.SUCCESS('No courts left to geocode.'))
+            return
+        self.stdout.write(f'Geocoding {total} courts (last checkpoint: pk {last_pk})...')
+
+        client = NominatimClient(max_concurrency=options['workers'])
+        limiter = RateLimiter(options['rate'])
+        lookup = async_to_sync(client.lookup)
+
+        def geocode(court):
+            address = self._full_address(court)
+            hit, coords = get_cached_geocode(address)
+            if hit:
+                return court, coords, 'cache'
+            limiter.wait()
+            try:
+                coords = lookup(address)
+            except GeocoderUnavailable as e:
+                return court, None, f'error: {e}'
+            store_geocode(address, coords)
+            return court, coords, 'nominatim'
+
+        stats = {'found': 0, 'not_found': 0, 'failed': 0, 'cached': 0, 'requests': 0}
+        failed_ids = set()
+        done = 0
+        start = time.monotonic()
+
+        queryset = Court.objects.select_related('province').only(
+            'pk', 'address', 'latitude', 'longitude', 'province__name'
+        ).order_by('pk')
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for offset in range(0, total, options['batch_size']):
+                batch_ids = pending_ids[offset:offset + options['batch_size']]
+                batch = list(queryset.filter(pk__in=batch_ids))
+                retry_ids.difference_update(batch_ids)
+
+                updated = []
+                for court, coords, source in executor.map(geocode, batch):
+                    if source == 'cache':
+                        stats['cached'] += 1
+                    elif source == 'nominatim':
+                        stats['requests'] += 1
+
+                    if source.startswith('error'):
+                        stats['failed'] += 1
+                        failed_ids.add(court.pk)
+                        self.stderr.write(f'  ✗ {court.pk} {court.address!r}: {source}')
+                    elif coords is None:
+                        stats['not_found'] += 1
+                    else:
+                        stats['found'] += 1
+                        court.latitude = Decimal(str(round(coords['latitude'], 6)))
+                        court.longitude = Decimal(str(round(coords['longitude'], 6)))
+                        updated.append(court)
+
+                Court.objects.bulk_update(updated, ['latitude', 'longitude'])
+                # bulk_update tidak mengirim post_save, jadi entry pencarian di-sync manual
+                refresh_search(*sync_courts(MANAGE_COURT, [court.pk for court in updated]))
+                done += len(batch_ids)
+                last_pk = max(last_pk, batch_ids[-1])
+                self._save_checkpoint(checkpoint_path, {
+                    'last_pk': last_pk,
+                    'failed_ids': sorted(failed_ids | retry_ids),
+                })
+
+                elapsed = time.monotonic() - start
+                self.stdout.write(
+                    f'  {done}/{total} courts, {stats["found"]} found, '
+                    f'{done / elapsed if elapsed else 0:.2f} courts/s'
+                )
+
+                if client.breaker.state == client.breaker.OPEN:
+                    self.stderr.write(self.style.ERROR(
+                        'Nominatim keeps failing, stopping. Run the command again later to resume.'
+                    ))
+                    break
+
+        self._report(stats, done, time.monotonic() - start)
+
+    @staticmethod
+    def _full_address(court):
+        address = court.address.strip()
+        province = court.province.name if court.province_id else ''
+        if province and province.casefold() not in address.casefold():
+            address = f'{address}, {province}'
+        return address
+
+    @staticmethod
+    def _load_checkpoint(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_checkpoint(path, data):
+        # Tulis ke file sementara dulu supaya checkpoint tidak pernah setengah jadi
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _report(self, stats, done, elapsed):
+        self.stdout.write('')
+        self.stdout.write(f'Processed:        {done} courts in {elapsed:.1f}s')
+        self.stdout.write(f'Found:            {stats["found"]}')
+        self.stdout.write(f'Not found:        {stats["not_found"]}')
+        self.stdout.write(f'Errors:           {stats["failed"]} (retried on the next run)')
+        self.stdout.write(f'Cache hits:       {stats["cached"]}')
+        self.stdout.write(f'Nominatim calls:  {stats["requests"]} '
+                          f'({stats["requests"] / elapsed if elapsed else 0:.2f} req/s)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Throughput: {done / elapsed if elapsed else 0:.2f} courts/s'
+        ))
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:37
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_ratings(apps, schema_editor):
+    # Sekali saja GROUP BY atas semua review; setelah ini dijaga per review oleh ratings.py
+    Court = apps.get_model('manage_court', 'Court')
+    Review = apps.get_model('manage_court', 'Review')
+    courts = {}
+    for court_id, rating, count in Review.objects.values_list('court_id', 'rating').annotate(n=Count('id')).order_by():
+        courts.setdefault(court_id, {})[rating] = count
+
+    batch = []
+    for court in Court.objects.filter(pk__in=list(courts)).only('pk').iterator(chunk_size=500):
+        histogram = courts[court.pk]
+        court.rating_count = sum(histogram.values())
+        court.rating_sum = sum(stars * count for stars, count in histogram.items())
+        court.rating_avg = court.rating_sum / court.rating_count
+        for stars in range(1, 6):
+            setattr(court, f'rating_{stars}_count', histogram.get(stars, 0))
+        batch.append(court)
+    Court.objects.bulk_update(batch, [
+        'rating_count', 'rating_sum', 'rating_avg',
+        *(f'rating_{stars}_count' for stars in range(1, 6)),
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_court', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='court',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='court',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='court',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='court',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='court',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='court',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='court',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='court',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='court',
+            index=models.Index(fields=['-rating_avg', '-rating_count'], name='court_rating_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_court', '0002_court_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['court', 'created_at', 'id'], name='review_court_feed_idx'),
+        ),
+    ]
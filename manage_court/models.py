@@ -83,14 +83,32 @@ class Court(models.Model):
         verbose_name="Province", 
         null=True, blank=True # Boleh dikosongi
     )
+
+    # Ringkasan review, di-update per review oleh manage_court/ratings.py (jangan diisi manual)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['-created_at'] 
-        indexes = [ models.Index(fields=['latitude', 'longitude']), ]
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['-rating_avg', '-rating_count'], name='court_rating_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating_histogram(self):
+        """{1: count, ..., 5: count}"""
+        return {stars: getattr(self, f'rating_{stars}_count') for stars in range(1, 6)}
+
 # MODEL 4: REVIEW
 class Review(models.Model):
     
@@ -115,6 +133,10 @@ class Review(models.Model):
     class Meta:
         unique_together = ('court', 'user') 
         ordering = ['-created_at'] 
+        indexes = [
+            # Feed review per court, keyset (created_at, id) terbaru dulu
+            models.Index(fields=['court', 'created_at', 'id'], name='review_court_feed_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user} @ {self.court.name}'
\ No newline at end of file
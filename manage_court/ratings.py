@@ -0,0 +1,43 @@
+"""
+Review aggregates stored on Court (rating_count, rating_sum, rating_avg and the
+rating_<n>_count histogram), so listings can show and sort by rating without a
+GROUP BY over reviews.
+
+Every review change is applied as one UPDATE with F() expressions, so
+concurrent reviews on the same court don't overwrite each other's counts.
+"""
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+from .models import Court
+
+HISTOGRAM_FIELDS = {stars: f'rating_{stars}_count' for stars in range(1, 6)}
+
+
+def apply_rating_change(court_id, removed=None, added=None):
+    """
+    Move one review's rating out of / into a court's aggregates.
+    removed: the rating taken out (None for a new review)
+    added: the rating put in (None for a deleted review)
+    """
+    count_delta = (added is not None) - (removed is not None)
+    sum_delta = (added or 0) - (removed or 0)
+    updates = {}
+    if removed != added:
+        if removed is not None:
+            updates[HISTOGRAM_FIELDS[removed]] = F(HISTOGRAM_FIELDS[removed]) - 1
+        if added is not None:
+            updates[HISTOGRAM_FIELDS[added]] = F(HISTOGRAM_FIELDS[added]) + 1
+    if not updates:
+        return
+    if count_delta:
+        updates['rating_count'] = F('rating_count') + count_delta
+    if sum_delta:
+        updates['rating_sum'] = F('rating_sum') + sum_delta
+    # F() di sisi kanan membaca nilai sebelum UPDATE ini
+    updates['rating_avg'] = Case(
+        When(rating_count=-count_delta, then=Value(0.0)),
+        default=Cast(F('rating_sum') + sum_delta, FloatField()) / (F('rating_count') + count_delta),
+        output_field=FloatField(),
+    )
+    Court.objects.filter(pk=court_id).update(**updates)
@@ -0,0 +1,35 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Review
+from .ratings import apply_rating_change
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, **kwargs):
+    # Review yang diedit: simpan rating & court lama supaya bisa dikeluarkan dari agregat
+    instance._previous_rating = None
+    if not instance._state.adding:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk).values_list('court_id', 'rating').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, **kwargs):
+    rating = int(instance.rating)
+    previous = getattr(instance, '_previous_rating', None)
+    if previous is None:
+        apply_rating_change(instance.court_id, added=rating)
+        return
+    court_id, previous_rating = previous
+    if court_id == instance.court_id:
+        apply_rating_change(court_id, removed=previous_rating, added=rating)
+    else:
+        apply_rating_change(court_id, removed=previous_rating)
+        apply_rating_change(instance.court_id, added=rating)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    apply_rating_change(instance.court_id, removed=int(instance.rating))
@@ -3,8 +3,16 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from .models import Court, Province, Facility
+from django.core.cache import cache
+from django.core.management import call_command
+from unittest.mock import patch, MagicMock
+from io import StringIO
+from .models import Court, Province, Facility, Review
+from court_filter.utils import get_cached_geocode
 import json
+import os
+import tempfile
+import requests
 
 # Dapatkan model User yang sedang aktif (dari app autentikasi)
 User = get_user_model()
@@ -301,4 +309,214 @@ class ManageCourtTests(TestCase):
         self.assertEqual(response.status_code, 400)
         data = response.json()
         self.assertEqual(data['status'], 'error')
-        self.assertIn('name', data['errors'])
\ No newline at end of file
+        self.assertIn('name', data['errors'])
+
+
+    def test_get_court_constants_not_modified(self):
+        """Tes get_court_constants menjawab 304 tanpa query sampai ada facility baru."""
+        cache.clear()
+        url = reverse('manage_court:get_court_constants')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Facility.objects.create(name='Kantin')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Kantin', [f['name'] for f in response.json()['facilities']])
+
+
+class ReviewRatingTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='password123', email='owner@test.com')
+        self.reviewers = [
+            User.objects.create_user(username=f'reviewer{i}', password='password123', email=f'r{i}@test.com')
+            for i in range(3)
+        ]
+        self.court = Court.objects.create(
+            owner=self.owner, name='Lapangan Rating', address='Alamat', court_type='futsal', price_per_hour=100000,
+        )
+        self.other_court = Court.objects.create(
+            owner=self.owner, name='Lapangan Lain', address='Alamat', court_type='futsal', price_per_hour=100000,
+        )
+
+    def _review(self, user, rating, court=None):
+        return Review.objects.create(court=court or self.court, user=user, rating=rating, comment='Oke')
+
+    def test_aggregates_follow_create_edit_delete(self):
+        """Tes rating_avg, rating_count, dan histogram ikut berubah saat review dibuat, diedit, dihapus."""
+        first = self._review(self.reviewers[0], 5)
+        self._review(self.reviewers[1], 3)
+        self.court.refresh_from_db()
+        self.assertEqual((self.court.rating_count, self.court.rating_avg), (2, 4.0))
+        self.assertEqual(self.court.rating_histogram, {1: 0, 2: 0, 3: 1, 4: 0, 5: 1})
+
+        first.rating = 1
+        first.save()
+        self.court.refresh_from_db()
+        self.assertEqual((self.court.rating_count, self.court.rating_avg), (2, 2.0))
+        self.assertEqual(self.court.rating_histogram, {1: 1, 2: 0, 3: 1, 4: 0, 5: 0})
+
+        first.court = self.other_court
+        first.save()
+        self.court.refresh_from_db()
+        self.other_court.refresh_from_db()
+        self.assertEqual((self.court.rating_count, self.court.rating_avg), (1, 3.0))
+        self.assertEqual((self.other_court.rating_count, self.other_court.rating_avg), (1, 1.0))
+
+        Review.objects.filter(court=self.court).delete()
+        self.court.refresh_from_db()
+        self.assertEqual((self.court.rating_count, self.court.rating_sum, self.court.rating_avg), (0, 0, 0.0))
+
+    def test_sort_by_rating_without_reviews_table(self):
+        """Tes urutan berdasarkan rating memakai kolom court saja (tanpa GROUP BY review)."""
+        self._review(self.reviewers[0], 2)
+        self._review(self.reviewers[1], 4, court=self.other_court)
+
+        queryset = Court.objects.order_by('-rating_avg', '-rating_count')
+        self.assertNotIn('review', str(queryset.query).lower())
+        self.assertEqual(list(queryset), [self.other_court, self.court])
+
+
+class ReviewFeedTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', password='password123', email='owner@test.com')
+        self.court = Court.objects.create(
+            owner=owner, name='Lapangan Ramai', address='Alamat', court_type='futsal', price_per_hour=100000,
+        )
+        for i in range(25):
+            user = User.objects.create_user(username=f'reviewer{i}', email=f'r{i}@test.com')
+            Review.objects.create(court=self.court, user=user, rating=i % 5 + 1, comment=f'Komentar {i}')
+        self.expected = [
+            str(pk) for pk in Review.objects.filter(court=self.court).order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+        self.url = reverse('manage_court:court_reviews', args=[self.court.pk])
+
+    def test_review_feed_pages_with_cursor(self):
+        """Tes feed review: halaman keyset terbaru dulu, jumlah query tetap (select_related user)."""
+        seen, cursor = [], None
+        while True:
+            params = {'cursor': cursor} if cursor else {}
+            with self.assertNumQueries(2):
+                data = self.client.get(self.url, params).json()
+            seen.extend(review['id'] for review in data['reviews'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(data['rating_count'], 25)
+
+    def test_review_feed_invalid_input(self):
+        """Tes cursor atau page_size yang tidak valid ditolak (400)."""
+        self.assertEqual(self.client.get(self.url, {'cursor': 'rusak'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'page_size': '0'}).status_code, 400)
+
+    def test_court_detail_renders_first_review_page(self):
+        """Tes halaman detail hanya merender satu halaman review dan link ke halaman berikutnya."""
+        response = self.client.get(reverse('manage_court:court_detail', args=[self.court.pk]))
+        self.assertEqual(len(response.context['reviews']), 10)
+        self.assertIsNotNone(response.context['next_cursor'])
+        self.assertContains(response, 'Older reviews')
+
+class GeocodeCourtsCommandTests(TestCase):
+    """Tes management command geocode_courts dengan Nominatim palsu."""
+
+    PLACES = {
+        'Jl. Pintu I Senayan, DKI Jakarta': ('-6.218', '106.802'),
+        'Jl. Braga, Bandung, Jawa Barat': ('-6.917', '107.609'),
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.jakarta = Province.objects.create(name='DKI Jakarta')
+        self.jabar = Province.objects.create(name='Jawa Barat')
+        self.senayan = Court.objects.create(
+            name='Senayan', address='Jl. Pintu I Senayan', court_type='futsal',
+            price_per_hour=100000, province=self.jakarta,
+        )
+        self.braga = Court.objects.create(
+            name='Braga', address='Jl. Braga, Bandung, Jawa Barat', court_type='tennis',
+            price_per_hour=100000, province=self.jabar,
+        )
+        self.unknown = Court.objects.create(
+            name='Entah', address='Alamat Tidak Dikenal', court_type='other', price_per_hour=0,
+        )
+        self.located = Court.objects.create(
+            name='Sudah Ada', address='Jl. Braga, Bandung, Jawa Barat', court_type='other',
+            price_per_hour=0, latitude='-6.9', longitude='107.6',
+        )
+
+        self.queries = []
+        self.fail = False
+        patcher = patch('court_filter.geocoding.requests.Session.get', new=self._nominatim)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.checkpoint = os.path.join(tmp_dir.name, 'checkpoint.json')
+
+    def _nominatim(self, url, params=None, **kwargs):
+        self.queries.append(params['q'])
+        if self.fail:
+            raise requests.exceptions.ConnectionError('Nominatim down')
+        place = self.PLACES.get(params['q'].rsplit(', Indonesia', 1)[0])
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        response.json.return_value = [{'lat': place[0], 'lon': place[1]}] if place else []
+        return response
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('geocode_courts', '--rate=1000', f'--checkpoint={self.checkpoint}',
+                     *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_geocode_missing_coordinates(self):
+        """Tes hanya court tanpa koordinat yang di-geocode, lalu disimpan."""
+        output = self._run('--batch-size=2')
+
+        self.senayan.refresh_from_db()
+        self.braga.refresh_from_db()
+        self.unknown.refresh_from_db()
+        self.assertEqual(str(self.senayan.latitude), '-6.218000')
+        self.assertEqual(str(self.braga.longitude), '107.609000')
+        self.assertIsNone(self.unknown.latitude)
+        # Provinsi ditambahkan ke alamat kalau belum ada
+        self.assertIn('Jl. Pintu I Senayan, DKI Jakarta, Indonesia', self.queries)
+        self.assertEqual(len(self.queries), 3)
+        self.assertIn('Throughput', output)
+        self.assertTrue(get_cached_geocode('Alamat Tidak Dikenal')[0])
+
+    def test_resume_from_checkpoint(self):
+        """Tes run kedua melanjutkan dari checkpoint dan tidak mengulang court yang tidak ketemu."""
+        self._run('--limit=1')
+        self.assertEqual(len(self.queries), 1)
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)['last_pk'], self.senayan.pk)
+
+        self._run()
+        self.assertEqual(len(self.queries), 3)
+
+        output = self._run()
+        self.assertIn('No courts left', output)
+        self.assertEqual(len(self.queries), 3)
+
+    def test_upstream_errors_are_retried(self):
+        """Tes court yang gagal karena error jaringan dicoba lagi di run berikutnya."""
+        self.fail = True
+        self._run()
+        with open(self.checkpoint) as f:
+            failed = json.load(f)['failed_ids']
+        self.assertEqual(failed, sorted([self.senayan.pk, self.braga.pk, self.unknown.pk]))
+
+        self.fail = False
+        self._run()
+        self.senayan.refresh_from_db()
+        self.assertIsNotNone(self.senayan.latitude)
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)['failed_ids'], [])
@@ -8,6 +8,7 @@ urlpatterns = [
     
     path('', views.show_manage_court, name='show_manage_court'),
     path('detail/<int:pk>/', views.court_detail, name='court_detail'),
+    path('detail/<int:pk>/reviews/', views.court_reviews, name='court_reviews'),
     path('add-ajax/', views.add_court_ajax, name='add_court_ajax'),
     path('delete/<int:pk>/', views.delete_court, name='delete_court'),
     path('get_court_data/<int:pk>/', views.get_court_data, name='get_court_data'), 
@@ -11,6 +11,13 @@ import json
 from django.http import JsonResponse
 import base64
 from django.core.files.base import ContentFile
+from court_filter.conditional import versioned
+from court_filter.pagination import InvalidCursor, keyset_page
+from court_filter.constants_bundle import constants_bundle
+from court_filter.versioning import model_version_name
+
+REVIEW_PAGE_SIZE = 10
+MAX_REVIEW_PAGE_SIZE = 50
 
 # Create your views here.
 
@@ -32,16 +39,71 @@ def show_manage_court(request):
 def court_detail(request, pk):
     court = get_object_or_404(Court, pk=pk)
 
-    reviews = Review.objects.filter(court=court).order_by('-created_at')
+    # Hanya satu halaman review (keyset), bukan semua review court
+    try:
+        reviews, next_cursor = _review_page(court, request.GET.get('cursor'))
+    except InvalidCursor:
+        reviews, next_cursor = _review_page(court)
 
     context = {
         'court': court,
         'reviews': reviews,
+        'next_cursor': next_cursor,
     }
 
     # Render halaman HTML yang baru kita buat
     return render(request, 'manage_court/court_detail.html', context)
 
+
+def _review_page(court, cursor=None, page_size=REVIEW_PAGE_SIZE):
+    """
+    Newest reviews first, keyset-paginated on (created_at, id) over the
+    (court, created_at, id) index, so a page costs the same on any court.
+    Returns: (reviews, next_cursor)
+    """
+    queryset = Review.objects.filter(court=court).select_related('user')
+    return keyset_page(queryset, ['created_at', 'id'], cursor, page_size, descending=True)
+
+
+def _review_json(review):
+    return {
+        'id': str(review.id),
+        'user': review.user.username,
+        'user_photo_url': review.user.photo.url if review.user.photo else None,
+        'rating': review.rating,
+        'comment': review.comment,
+        'photo_url': review.photo.url if review.photo else None,
+        'created_at': review.created_at.isoformat(),
+    }
+
+
+@require_GET
+def court_reviews(request, pk):
+    """
+    Review feed of one court as JSON: ?cursor=<next_cursor>&page_size=10
+    """
+    court = get_object_or_404(Court, pk=pk)
+    try:
+        page_size = min(int(request.GET.get('page_size', REVIEW_PAGE_SIZE)), MAX_REVIEW_PAGE_SIZE)
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'page_size harus bilangan bulat positif'}, status=400)
+
+    try:
+        reviews, next_cursor = _review_page(court, request.GET.get('cursor'), page_size)
+    except InvalidCursor as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    return JsonResponse({
+        'status': 'success',
+        'rating_avg': round(court.rating_avg, 2),
+        'rating_count': court.rating_count,
+        'rating_histogram': court.rating_histogram,
+        'reviews': [_review_json(review) for review in reviews],
+        'next_cursor': next_cursor,
+    })
+
 @login_required 
 @require_GET
 def get_court_data(request, pk):
@@ -158,6 +220,9 @@ def get_all_my_courts_json(request):
                 'latitude': float(court.latitude) if court.latitude is not None else None, 
                 'longitude': float(court.longitude) if court.longitude is not None else None, 
                 'photo_url': court.photo.url if court.photo else None,
+                'rating_avg': round(court.rating_avg, 2),
+                'rating_count': court.rating_count,
+                'rating_histogram': court.rating_histogram,
                 
                 'facilities': list(court.facilities.values_list('pk', flat=True)) 
             })
@@ -171,6 +236,7 @@ def get_all_my_courts_json(request):
     
 @csrf_exempt # Aman karena cuma GET data umum
 @require_GET
+@versioned([model_version_name(Province), model_version_name(Facility)])
 def get_court_constants(request):
     """
     Mengirimkan daftar pilihan untuk Dropdown/Checkbox di Flutter:
@@ -179,15 +245,12 @@ def get_court_constants(request):
     3. Sport Types (untuk Dropdown)
     """
     try:
-        # 1. Ambil semua Province (ID dan Nama)
-        provinces = list(Province.objects.values('pk', 'name').order_by('name'))
-        
-        # 2. Ambil semua Facility (ID dan Nama)
-        facilities = list(Facility.objects.values('pk', 'name').order_by('name'))
-        
-        # 3. Ambil Sport Types (dari choices di Model Court)
-        # Format di Django: [('futsal', 'Futsal'), ...] -> Kita ubah jadi list of dict
-        sport_types = [{'value': item[0], 'label': item[1]} for item in Court.SPORT_TYPES]
+        # Diambil dari bundle konstanta yang sudah jadi (lihat court_filter/constants_bundle.py),
+        # bukan query Province/Facility setiap request
+        constants = constants_bundle.content()
+        provinces = constants['manage_court']['provinces']
+        facilities = constants['manage_court']['facilities']
+        sport_types = constants['sport_types']
 
         return JsonResponse({
             'status': 'success',